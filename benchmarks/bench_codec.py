@@ -0,0 +1,64 @@
+"""Compare JSON backends on a large profile list.
+
+Decodes and encodes a list of brew profiles the size of several accounts'
+worth of responses with every backend installed::
+
+    python benchmarks/bench_codec.py --profiles 5000 --repeat 20
+"""
+import argparse
+import timeit
+
+from fellow_aiden import codec
+
+PROFILE = {
+    "id": "p0",
+    "profileType": 0,
+    "title": "Benchmark Profile",
+    "ratio": 16,
+    "bloomEnabled": True,
+    "bloomRatio": 2,
+    "bloomDuration": 30,
+    "bloomTemperature": 96,
+    "ssPulsesEnabled": True,
+    "ssPulsesNumber": 3,
+    "ssPulsesInterval": 23,
+    "ssPulseTemperatures": [96, 97, 98],
+    "batchPulsesEnabled": True,
+    "batchPulsesNumber": 2,
+    "batchPulsesInterval": 30,
+    "batchPulseTemperatures": [96, 97],
+    "createdAt": "2025-01-01T00:00:00.000Z",
+    "isDefaultProfile": False,
+}
+
+
+def build(count):
+    return [dict(PROFILE, id='p%d' % i, title='Benchmark Profile %d' % i) for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profiles', type=int, default=5000, help="Profiles in the list")
+    parser.add_argument('--repeat', type=int, default=20, help="Runs per measurement")
+    args = parser.parse_args()
+
+    profiles = build(args.profiles)
+    body = codec.dumpb(profiles)
+    print("%d profiles, %.1f KiB per body, best of %d runs" % (args.profiles, len(body) / 1024, args.repeat))
+    print("%-8s %12s %12s" % ("backend", "decode ms", "encode ms"))
+    baseline = None
+    for name in reversed(codec.available()):
+        codec.use(name)
+        assert codec.loads(body) == profiles
+        decode = min(timeit.repeat(lambda: codec.loads(body), number=1, repeat=args.repeat)) * 1000
+        encode = min(timeit.repeat(lambda: codec.dumpb(profiles), number=1, repeat=args.repeat)) * 1000
+        if baseline is None:
+            baseline = (decode, encode)
+            print("%-8s %12.2f %12.2f" % (name, decode, encode))
+        else:
+            print("%-8s %12.2f %12.2f   (%.1fx / %.1fx faster)"
+                  % (name, decode, encode, baseline[0] / decode, baseline[1] / encode))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,6 @@
 import os
 import logging
 import queue
-import json
 import time
 from urllib import response
 import requests
@@ -12,7 +11,7 @@ from streamlit import session_state as ss
 
 st.set_page_config(page_title="Fellow Aiden", layout="centered")
 
-from fellow_aiden import FellowAiden
+from fellow_aiden import FellowAiden, codec
 from fellow_aiden.profile import CoffeeProfile
 
 from pillar import Pillar
@@ -178,7 +177,7 @@ def infer_setting_from_context(device_config, context, value):
             }
         )
         alignment = completion.choices[0].message.content
-        alignment = json.loads(alignment)
+        alignment = codec.loads(alignment)
     except Exception as e:
         print("Failed to infer setting from context:", e)
         return False
@@ -224,11 +223,13 @@ def handle_requires_action(tool_request):
     Then we submit the outputs back to the run.
     """
     tool_outputs = []
+    # Setting changes from one run are sent to the brewer as a single update
+    queued_settings = []
     data = tool_request.data
 
     for tool in data.required_action.submit_tool_outputs.tool_calls:
         if tool.function.arguments:
-            function_arguments = json.loads(tool.function.arguments)
+            function_arguments = codec.loads(tool.function.arguments)
         else:
             function_arguments = {}
 
@@ -250,7 +251,7 @@ def handle_requires_action(tool_request):
                 profiles = aiden.get_profiles()
                 if not profiles:
                     profiles = "Couldn't get profiles"
-                tool_outputs.append({"tool_call_id": tool.id, "output": json.dumps(profiles)})
+                tool_outputs.append({"tool_call_id": tool.id, "output": codec.dumps(profiles)})
 
             case "create_profile_from_link":
                 logger.info("Calling create_profile_from_link function")
@@ -258,14 +259,14 @@ def handle_requires_action(tool_request):
                 link = function_arguments.get("link")
                 try:
                     new_profile = aiden.create_profile_from_link(link)
-                    tool_outputs.append({"tool_call_id": tool.id, "output": json.dumps(new_profile)})
+                    tool_outputs.append({"tool_call_id": tool.id, "output": codec.dumps(new_profile)})
                 except Exception as e:
                     logger.exception("Failed to create profile from link")
                     error_msg = {
                         "status": "error",
                         "message": f"Error creating profile from link: {str(e)}"
                     }
-                    tool_outputs.append({"tool_call_id": tool.id, "output": json.dumps(error_msg)})
+                    tool_outputs.append({"tool_call_id": tool.id, "output": codec.dumps(error_msg)})
 
             case "delete_profile_by_id":
                 logger.info("Calling delete_profile function")
@@ -273,14 +274,14 @@ def handle_requires_action(tool_request):
                 link = function_arguments.get("id")
                 try:
                     new_profile = aiden.delete_profile_by_id(link)
-                    tool_outputs.append({"tool_call_id": tool.id, "output": json.dumps(new_profile)})
+                    tool_outputs.append({"tool_call_id": tool.id, "output": codec.dumps(new_profile)})
                 except Exception as e:
                     logger.exception("Failed to delete profile by ID")
                     error_msg = {
                         "status": "error",
                         "message": f"Error deleting profile from link: {str(e)}"
                     }
-                    tool_outputs.append({"tool_call_id": tool.id, "output": json.dumps(error_msg)})
+                    tool_outputs.append({"tool_call_id": tool.id, "output": codec.dumps(error_msg)})
 
             case "scrape_website":
                 url = function_arguments.get("url")
@@ -290,7 +291,7 @@ def handle_requires_action(tool_request):
             case "provide_recipe":
                 coffee_description = function_arguments.get("coffee_description")
                 result = generate_recipe(coffee_description)
-                tool_outputs.append({"tool_call_id": tool.id, "output": json.dumps(result)})
+                tool_outputs.append({"tool_call_id": tool.id, "output": codec.dumps(result)})
 
             case "adjust_setting":
                 aiden = st.session_state.get("fellow_aiden")
@@ -300,11 +301,8 @@ def handle_requires_action(tool_request):
                 alignment = infer_setting_from_context(device_settings, context_setting, context_value)
                 if alignment:
                     try:
-                        adjustment = aiden.adjust_setting(alignment['setting'], alignment['value'])
-                        tool_outputs.append({
-                            "tool_call_id": tool.id,
-                            "output": "Successfully adjusted setting"
-                        })
+                        queued = aiden.queue_settings({alignment['setting']: alignment['value']})
+                        queued_settings.append((tool.id, queued))
                     except Exception as e:
                         logger.exception("Failed to adjust setting")
                         error_msg = {
@@ -318,7 +316,7 @@ def handle_requires_action(tool_request):
                         "status": "error",
                         "message": "Failed to infer setting from context"
                     }
-                    tool_outputs.append({"tool_call_id": tool.id, "output": json.dumps(error_msg)})
+                    tool_outputs.append({"tool_call_id": tool.id, "output": codec.dumps(error_msg)})
 
             case "save_recipe":
                 recipe_description = function_arguments.get("recipe_description")
@@ -330,7 +328,7 @@ def handle_requires_action(tool_request):
                 recipe['profileType'] = 0
                 aiden = st.session_state.get("fellow_aiden")
                 created_profile = aiden.create_profile(recipe)
-                tool_outputs.append({"tool_call_id": tool.id, "output": json.dumps(created_profile)})
+                tool_outputs.append({"tool_call_id": tool.id, "output": codec.dumps(created_profile)})
 
             case "get_device_config":
                 logger.info("Calling get_device_config function")
@@ -341,7 +339,7 @@ def handle_requires_action(tool_request):
                     # Return as JSON so the Assistant can parse it
                     tool_outputs.append({
                         "tool_call_id": tool.id,
-                        "output": json.dumps(device_config)
+                        "output": codec.dumps(device_config)
                     })
                 except Exception as e:
                     logger.exception("Failed to get device config")
@@ -349,7 +347,7 @@ def handle_requires_action(tool_request):
                         "status": "error",
                         "message": f"Error getting device config: {str(e)}"
                     }
-                    tool_outputs.append({"tool_call_id": tool.id, "output": json.dumps(error_msg)})
+                    tool_outputs.append({"tool_call_id": tool.id, "output": codec.dumps(error_msg)})
 
             case _:
                 logger.error(f"Unrecognized function name: {tool.function.name}. Tool: {tool}")
@@ -360,7 +358,22 @@ def handle_requires_action(tool_request):
                         "with the correct structure. Fix your request and try again."
                     )
                 }
-                tool_outputs.append({"tool_call_id": tool.id, "output": json.dumps(ret_val)})
+                tool_outputs.append({"tool_call_id": tool.id, "output": codec.dumps(ret_val)})
+
+    if queued_settings:
+        try:
+            st.session_state.get("fellow_aiden").flush_settings()
+        except Exception:
+            logger.exception("Failed to adjust settings")
+        for tool_call_id, queued in queued_settings:
+            if queued.exception() is None:
+                tool_outputs.append({"tool_call_id": tool_call_id, "output": "Successfully adjusted setting"})
+            else:
+                error_msg = {
+                    "status": "error",
+                    "message": f"Error adjusting device setting: {str(queued.exception())}"
+                }
+                tool_outputs.append({"tool_call_id": tool_call_id, "output": codec.dumps(error_msg)})
 
     st.toast("Function completed", icon=":material/function:")
     return tool_outputs, data.thread_id, data.id
@@ -451,11 +464,22 @@ def main():
 
 
     if derived and not ss['fellow_aiden']:
-        try:
-            ss["fellow_aiden"] = FellowAiden(email, password)
+        # Log in and prefetch in the background so the page renders right away
+        ss["fellow_aiden"] = FellowAiden(email, password, lazy=True)
+        ss["fellow_aiden_warmup"] = ss["fellow_aiden"].warmup()
+
+    # Only report the login once the background warmup has finished
+    warmup = ss.get("fellow_aiden_warmup")
+    if warmup is not None:
+        if not warmup.done():
+            st.info("Logging in to FellowAiden...")
+        elif warmup.exception() is not None:
+            st.error(f"Failed to init FellowAiden: {warmup.exception()}")
+            ss["fellow_aiden"] = None
+            ss["fellow_aiden_warmup"] = None
+        else:
             st.success("FellowAiden initialized!")
-        except Exception as e:
-            st.error(f"Failed to init FellowAiden: {e}")
+            ss["fellow_aiden_warmup"] = None
 
     if st.sidebar.button("Log in") and not ss['fellow_aiden']:
         try:
@@ -1,13 +1,15 @@
 import streamlit as st
-from fellow_aiden import FellowAiden
+from fellow_aiden import FellowAiden, codec
 from fellow_aiden.profile import CoffeeProfile
+from fellow_aiden.search import TitleIndex
 from openai import OpenAI
 from config_manager import ConfigManager
-import json
 import os
 from datetime import datetime
 from pathlib import Path
 
+MAX_PROFILES = FellowAiden.MAX_PROFILES
+
 SYSTEM = """
 Assume the role of a master coffee brewer. You focus exclusively on the pour over method and specialty coffee only. You often work with single origin coffees, but you also experiment with blends. Your recipes are executed by a robot, not a human, so maximum precision can be achieved. Temperatures are all maintained and stable in all steps. Always lead with the recipe, and only include explanations below that text, NOT inline. Below are the components of a recipe. 
 
@@ -208,8 +210,8 @@ def load_profile_backups():
     backup_file = get_backup_file_path()
     if backup_file.exists():
         try:
-            with open(backup_file, 'r') as f:
-                return json.load(f)
+            with open(backup_file, 'rb') as f:
+                return codec.loads(f.read())
         except Exception as e:
             st.warning(f"Could not load profile backups: {e}")
             return []
@@ -233,8 +235,8 @@ def save_profile_backup(profile):
     
     backup_file = get_backup_file_path()
     try:
-        with open(backup_file, 'w') as f:
-            json.dump(backups, f, indent=2)
+        with open(backup_file, 'wb') as f:
+            f.write(codec.dumpb(backups, indent=2))
         return True
     except Exception as e:
         st.error(f"Could not save profile backup: {e}")
@@ -419,15 +421,15 @@ def render_dashboard():
         profile_count = len(profiles)
         
         # Profile count with visual indicator
-        if profile_count >= 14:
-            st.markdown(f"🔴 **{profile_count}/14 Profiles** (Full)")
+        if profile_count >= MAX_PROFILES:
+            st.markdown(f"🔴 **{profile_count}/{MAX_PROFILES} Profiles** (Full)")
             st.error("⚠️ Profile storage is full. Consider deleting unused profiles.")
-        elif profile_count >= 12:
-            st.markdown(f"🟡 **{profile_count}/14 Profiles** (Nearly Full)")
-            st.warning("Getting close to the 14 profile limit.")
+        elif profile_count >= MAX_PROFILES - 2:
+            st.markdown(f"🟡 **{profile_count}/{MAX_PROFILES} Profiles** (Nearly Full)")
+            st.warning(f"Getting close to the {MAX_PROFILES} profile limit.")
         else:
-            st.markdown(f"🟢 **{profile_count}/14 Profiles**")
-            st.success(f"You have {14 - profile_count} profile slots available.")
+            st.markdown(f"🟢 **{profile_count}/{MAX_PROFILES} Profiles**")
+            st.success(f"You have {MAX_PROFILES - profile_count} profile slots available.")
         
         # Quick stats
         backups = load_profile_backups()
@@ -456,12 +458,12 @@ def render_profile_manager():
     profile_count = len(profiles)
     
     # Profile count header
-    if profile_count >= 14:
-        st.markdown(f"🔴 **{profile_count}/14 Profiles** (Full)")
-    elif profile_count >= 12:
-        st.markdown(f"🟡 **{profile_count}/14 Profiles** (Nearly Full)")
+    if profile_count >= MAX_PROFILES:
+        st.markdown(f"🔴 **{profile_count}/{MAX_PROFILES} Profiles** (Full)")
+    elif profile_count >= MAX_PROFILES - 2:
+        st.markdown(f"🟡 **{profile_count}/{MAX_PROFILES} Profiles** (Nearly Full)")
     else:
-        st.markdown(f"🟢 **{profile_count}/14 Profiles**")
+        st.markdown(f"🟢 **{profile_count}/{MAX_PROFILES} Profiles**")
     
     col1, col2 = st.columns([1, 2])
     
@@ -607,10 +609,19 @@ def render_backups():
         
         with col1:
             st.markdown("### Backup History")
-            st.write(f"Showing last {min(len(backups), 20)} backups:")
+            query = st.text_input("🔍 Search backups", key="backup_search")
+            if query:
+                index = TitleIndex()
+                for i, backup in enumerate(backups):
+                    index.add(i, backup['profile'].get('title', ''), backup)
+                shown = [backup for backup, score in index.search(query, limit=20, min_score=0.3)]
+                st.write(f"{len(shown)} backups matching '{query}':")
+            else:
+                shown = list(reversed(backups[-20:]))
+                st.write(f"Showing last {min(len(backups), 20)} backups:")
             
             selected_backup = None
-            for i, backup in enumerate(reversed(backups[-20:])):
+            for i, backup in enumerate(shown):
                 backup_date = datetime.fromisoformat(backup['backed_up_at']).strftime("%Y-%m-%d %H:%M")
                 profile_title = backup['profile'].get('title', 'Unknown')
                 
@@ -1,12 +1,32 @@
 """Fellow object to interact with Aiden brewer."""
-import json
+import base64
+import copy
 import logging
 import re
 import requests
 import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from difflib import SequenceMatcher
-from fellow_aiden.profile import CoffeeProfile
+from fellow_aiden import codec
+from fellow_aiden.breaker import CircuitBreaker
+from fellow_aiden.bulk import CREATED, FAILED, UNCHANGED, UPDATED, ProfileResult, profile_content
+from fellow_aiden.cache import ResourceCache, EXPIRED, STALE
+from fellow_aiden.exceptions import CircuitOpenError, DeadlineExceeded, FellowAidenError, OutboxConflict
+from fellow_aiden.linkcache import SharedProfileCache
+from fellow_aiden.outbox import (CREATE_PROFILE, CREATE_SCHEDULE, CREATES, DELETE_PROFILE, PATCH_PROFILE,
+                                 SETTINGS, TOGGLE_SCHEDULE, Outbox)
+from fellow_aiden.profile import CoffeeProfile, validate_profiles
+from fellow_aiden.ratelimit import RateLimiter, parse_retry_after
 from fellow_aiden.schedule import CoffeeSchedule
+from fellow_aiden.search import TitleIndex, normalize_title
+from fellow_aiden.session_store import SessionStore
+from fellow_aiden.singleflight import SingleFlight
+from fellow_aiden.state import BrewerState
+from fellow_aiden.stats import RequestStats
 from pydantic import ValidationError
 from urllib3.util import Retry
 from requests.adapters import HTTPAdapter
@@ -15,6 +35,17 @@ from requests.adapters import HTTPAdapter
 def similar(a, b):
     return SequenceMatcher(None, a, b).ratio()
 
+
+def token_expiry(token):
+    """Return the ``exp`` claim of a JWT access token, or None if unreadable."""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        claims = codec.loads(base64.urlsafe_b64decode(payload))
+        return float(claims['exp'])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
     
 class FellowAiden:
     
@@ -25,6 +56,7 @@ class FellowAiden:
     INTERVAL = 0.5
     BASE_URL = 'https://l8qtmnc692.execute-api.us-west-2.amazonaws.com/v1'
     API_AUTH = '/auth/login'
+    API_REFRESH = '/auth/refresh'
     API_DEVICES = '/devices'
     API_DEVICE = '/devices/{id}'
     API_SCHEDULES = '/devices/{id}/schedules'
@@ -48,26 +80,177 @@ class FellowAiden:
         'duration',
         'lastGBQuantity'
     ]
-    SESSION = requests.Session()
-    retries = Retry(
-        total=3,
-        status_forcelist=[408, 500, 501, 502, 503, 504],
-    )
-    SESSION.mount('https://', HTTPAdapter(max_retries=retries))
-    
+    # Renew the access token this many seconds before it expires
+    TOKEN_REFRESH_MARGIN = 60
+    # Connection pool defaults for each client's HTTPAdapter
+    POOL_CONNECTIONS = 10
+    POOL_MAXSIZE = 10
+    RETRIES = 3
+    RETRY_STATUSES = [408, 500, 501, 502, 503, 504]
+    # PATCH bodies here set absolute values, so resending one is harmless
+    RETRY_METHODS = ['GET', 'PUT', 'PATCH', 'DELETE']
+    RETRY_BACKOFF = 0.5
+    # Sent with every attempt of a POST, for servers that deduplicate on it
+    IDEMPOTENCY_HEADER = 'Idempotency-Key'
+    # (connect, read) seconds for every request
+    TIMEOUT = (5, 30)
+    # Profiles a brewer can hold
+    MAX_PROFILES = 14
+    # Concurrent writes in create_profiles() and upsert_profiles()
+    BULK_WORKERS = 4
+    # Seconds queue_settings() waits for more changes before sending
+    SETTINGS_DEBOUNCE = 0.25
+    # IDs handed out for creates waiting in the outbox
+    PROVISIONAL_PREFIX = 'queued-'
+    # Failures after which a write is queued in the outbox
+    UNREACHABLE_ERRORS = (requests.ConnectionError, requests.Timeout, CircuitOpenError)
+
+    def __init__(self, email, password, adapter=None, pool_connections=None,
+                 pool_maxsize=None, max_retries=None, keep_alive=True,
+                 cache_ttl=None, stale_while_revalidate=0, lazy=False,
+                 session_store=None, timeout=None, deadline=None,
+                 rate_limiter=None, brewer_id=None, link_cache=None,
+                 circuit_breaker=None, outbox=None):
+        """Start of self.
 
-    def __init__(self, email, password):
-        """Start of self."""
+        Each client owns its ``requests.Session``, so headers and tokens
+        never leak between accounts in the same process.
+
+        :param adapter: Optional ``HTTPAdapter`` (see :meth:`build_adapter`)
+                    to share one connection pool across several clients.
+        :param pool_connections: Number of host pools to cache.
+        :param pool_maxsize: Connections kept per host; size this to the
+                    number of threads using the client concurrently.
+        :param max_retries: Adapter-level retry count or ``urllib3.Retry``
+                    policy, on top of the dispatcher's retries. Defaults
+                    to none.
+        :param keep_alive: If False, close connections after each request.
+        :param cache_ttl: Seconds cached data stays fresh, as one number or
+                    a dict keyed by ``device``, ``profiles`` and
+                    ``schedules``. None caches until :meth:`refresh`.
+        :param stale_while_revalidate: Seconds past the TTL during which
+                    cached data is still served while it is refreshed in
+                    the background.
+        :param lazy: If True, skip logging in and device discovery here;
+                    they happen on first use or via :meth:`warmup`.
+        :param session_store: Optional :class:`SessionStore`. Tokens and
+                    cached data are saved to it, and a new client starts
+                    from the saved snapshot, revalidating it in the
+                    background instead of logging in again.
+        :param timeout: Seconds to wait per request, as ``(connect, read)``
+                    or one number for both. Defaults to TIMEOUT.
+        :param deadline: Overall seconds allowed for one call, covering
+                    retries, backoff and re-authentication. None for no
+                    limit. Adapter-level ``max_retries`` run inside a
+                    single attempt and can overrun it, so leave them off
+                    when using a deadline.
+        :param rate_limiter: :class:`RateLimiter` pacing this client's
+                    requests. Defaults to the limiter shared by every
+                    client of the same account in this process; False
+                    disables rate limiting.
+        :param brewer_id: Brewer to control on an account with several.
+                    Defaults to the first one Fellow's API lists; see
+                    :meth:`get_devices` and :meth:`for_device`.
+        :param link_cache: :class:`SharedProfileCache` for profiles read
+                    from shared brew links. Defaults to one in-memory
+                    cache for the process; False disables caching.
+        :param circuit_breaker: :class:`CircuitBreaker` that stops requests
+                    while Fellow's API is down. Defaults to the breaker
+                    shared by every client of BASE_URL in this process,
+                    whatever its account, so failures seen by one
+                    account open the circuit for all of them; pass a
+                    breaker of its own to isolate a client. False
+                    disables it.
+        :param outbox: Optional :class:`Outbox`. Writes made while Fellow's
+                    API is unreachable are saved to it instead of
+                    failing, and sent later; see :meth:`replay_outbox`.
+        """
         self._log = self._logger()
+        if adapter is None:
+            adapter = self.build_adapter(pool_connections, pool_maxsize, max_retries)
+        self._session = requests.Session()
+        self._session.mount('https://', adapter)
+        self._session.headers.update(self.HEADERS)
+        if not keep_alive:
+            self._session.headers['Connection'] = 'close'
         self._auth = False
         self._token = None
         self._refresh = None
+        self._token_expiry = None
+        self._token_lock = threading.RLock()
         self._email = email
         self._password = password
+        self._devices = None
         self._device_config = None
+        self._selected_brewer = brewer_id
         self._brewer_id = None
-        self.__auth()
+        self._profiles = None
+        self._schedules = None
+        # Lookup indexes over the cached lists, rebuilt when a list is replaced
+        self._indexed_profiles = None
+        self._profile_index = {}
+        self._title_index = {}
+        self._fuzzy_index = TitleIndex()
+        self._indexed_schedules = None
+        self._schedule_index = {}
+        self._cache_options = (cache_ttl, stale_while_revalidate)
+        self._cache = ResourceCache(cache_ttl, stale_while_revalidate)
+        self._revalidate_lock = threading.Lock()
+        self._revalidating = set()
+        self._device_lock = threading.Lock()
+        # Guards the cached lists and indexes; loads are coalesced per resource
+        self._state_lock = threading.RLock()
+        self._flights = SingleFlight()
+        # Device settings waiting for queue_settings()'s debounce window
+        self._settings_lock = threading.Lock()
+        self._pending_settings = {}
+        self._settings_future = None
+        self._settings_timer = None
+        self._timeout = timeout or self.TIMEOUT
+        self._deadline = deadline
+        # Per-thread overrides set by request_options()
+        self._local = threading.local()
+        if rate_limiter is None:
+            rate_limiter = RateLimiter.shared(email)
+        self._limiter = rate_limiter or None
+        self._stats = RequestStats()
+        self._request_hooks = [self._stats.record]
+        if link_cache is None:
+            link_cache = SharedProfileCache.default()
+        self._link_cache = None if link_cache is False else link_cache
+        if circuit_breaker is None:
+            circuit_breaker = CircuitBreaker.for_url(self.BASE_URL)
+        self._breaker = None if circuit_breaker is False else circuit_breaker
+        self._outbox = outbox
+        self._outbox_lock = threading.Lock()
+        self._session_store = session_store
+        restored = session_store is not None and self.__restore_session()
+        if not lazy and not restored:
+            self.__auth()
         
+    @classmethod
+    def build_adapter(cls, pool_connections=None, pool_maxsize=None, max_retries=None):
+        """Build an ``HTTPAdapter`` that can be shared between clients.
+
+        The adapter only holds the connection pool and retry policy, so it
+        is safe to mount on several sessions belonging to different accounts.
+        By default it does not retry at all: the client's request dispatcher
+        owns every retry, its backoff and the call's deadline. Retries set
+        here happen inside each of the dispatcher's attempts.
+
+        :param max_retries: Adapter-level retry count or ``urllib3.Retry``
+                    policy. Defaults to none.
+        """
+        if max_retries is None:
+            max_retries = Retry(total=0, read=False)
+        elif isinstance(max_retries, int):
+            max_retries = Retry(total=max_retries)
+        return HTTPAdapter(
+            pool_connections=pool_connections or cls.POOL_CONNECTIONS,
+            pool_maxsize=pool_maxsize or cls.POOL_MAXSIZE,
+            max_retries=max_retries,
+        )
+
     def _logger(self):
         """Create a logger to be used between processes.
 
@@ -83,85 +266,715 @@ class FellowAiden:
         return logger
         
     def __auth(self):
+        self.__login()
+        # Makes sense to populate the device as it's used in subsequent calls
+        self.__device()
+
+    def __login(self):
         self._log.debug("Authenticating user")
         auth = {"email": self._email, "password": self._password}
-        self.SESSION.headers.update(self.HEADERS)
-        login_url = self.BASE_URL + self.API_AUTH
-        response = self.SESSION.post(login_url, json=auth, headers=self.HEADERS)
-        parsed = json.loads(response.content)
+        response = self.__request('POST', self.API_AUTH, json=auth, authenticated=False)
+        parsed = self.__decode(response) or {}
         self._log.debug(parsed)
         if 'accessToken' not in parsed:
             raise Exception("Email or password incorrect.")
         self._log.debug("Authentication successful")
+        self.__set_tokens(parsed)
+
+    def __set_tokens(self, parsed):
         self._token = parsed['accessToken']
-        self._refresh = parsed['refreshToken']
-        self.SESSION.headers.update({'Authorization': 'Bearer ' + self._token})
+        self._refresh = parsed.get('refreshToken', self._refresh)
+        self._token_expiry = token_expiry(self._token)
+        self._session.headers.update({'Authorization': 'Bearer ' + self._token})
         self._auth = True
-        # Makes sense to populate the device as it's used in subsequent calls
-        self.__device()
-        
-    def __device(self):
-        self._log.debug("Fetching device for account")
-        device_url = self.BASE_URL + self.API_DEVICES
-        response = self.SESSION.get(device_url, params={'dataType': 'real'})
-        
-        # Check for unauthorized response and try to reauthenticate
-        if response.status_code == 401:
+        self.save_session()
+
+    def __restore_session(self):
+        """Start from the snapshot in the session store.
+
+        :returns: True when a snapshot with a token was restored.
+        """
+        state = self._session_store.load(self._email)
+        if not state or not state.get('token'):
+            return False
+        self._log.debug("Restoring saved session")
+        self._token = state['token']
+        self._refresh = state.get('refresh')
+        self._token_expiry = token_expiry(self._token)
+        self._session.headers.update({'Authorization': 'Bearer ' + self._token})
+        self._auth = True
+        device_config = state.get('device_config')
+        if device_config and self._selected_brewer in (None, device_config['id']):
+            # Snapshots hold the account's default brewer; others start empty
+            self._devices = state.get('devices') or [device_config]
+            self._device_config = device_config
+            self._brewer_id = device_config['id']
+            self._profiles = state.get('profiles')
+            self._schedules = state.get('schedules')
+            self._cache.restore(state.get('cache', {}))
+        for name, value in (('device', self._device_config),
+                            ('profiles', self._profiles),
+                            ('schedules', self._schedules)):
+            if value is not None:
+                self.__revalidate(name)
+        return True
+
+    def save_session(self):
+        """Write tokens and cached data to the session store, if any."""
+        if self._session_store is None or not self._auth:
+            return
+        with self._state_lock:
+            state = {
+                'token': self._token,
+                'refresh': self._refresh,
+                'devices': self._devices,
+                'device_config': self._device_config,
+                'profiles': self._profiles,
+                'schedules': self._schedules,
+                'cache': self._cache.snapshot(),
+            }
+        try:
+            self._session_store.save(self._email, state)
+        except OSError as err:
+            self._log.warning("Could not save session: %s" % err)
+
+    def __refresh_token(self):
+        """Trade the refresh token for a new access token.
+
+        :returns: True when the access token was renewed.
+        """
+        if not self._refresh:
+            return False
+        self._log.debug("Refreshing access token")
+        try:
+            response = self.__request('POST', self.API_REFRESH, json={'refreshToken': self._refresh},
+                                      authenticated=False)
+        except requests.RequestException as err:
+            self._log.warning("Token refresh failed: %s" % err)
+            return False
+        parsed = self.__decode(response) or {}
+        if response.status_code != 200 or 'accessToken' not in parsed:
+            self._log.warning("Token refresh rejected: %s" % parsed)
+            return False
+        self.__set_tokens(parsed)
+        self._log.debug("Access token refreshed")
+        return True
+
+    def __reauth(self, stale_token=None):
+        """Renew credentials after a 401, preferring the refresh token.
+
+        A full email/password login only happens when the refresh token
+        is missing or rejected. Concurrent callers rejected with the same
+        stale token share a single renewal.
+        """
+        stale_token = stale_token or self._token
+        with self._token_lock:
+            if self._token != stale_token:
+                return
             self._log.warning("Unauthorized response received. Attempting to reauthenticate...")
-            self.__auth()
-            # Retry the request with the new token
-            response = self.SESSION.get(device_url, params={'dataType': 'real'})
-            
-        parsed = json.loads(response.content)
+            if not self.__refresh_token():
+                self.__login()
+
+    def __ensure_token(self):
+        """Log in on first use and renew the access token just before it lapses."""
+        if not self._auth:
+            with self._token_lock:
+                if not self._auth:
+                    self.__login()
+            return
+        expiry = self._token_expiry
+        if expiry is None or expiry - time.time() > self.TOKEN_REFRESH_MARGIN:
+            return
+        with self._token_lock:
+            if self._token_expiry != expiry:
+                return
+            if not self.__refresh_token():
+                self.__login()
+
+    def add_request_hook(self, hook):
+        """Call ``hook(method, endpoint, status_code, elapsed)`` after every request.
+
+        ``endpoint`` is the path template (e.g. ``/devices/{id}/profiles``)
+        and ``status_code`` is None when the request raised.
+        """
+        self._request_hooks.append(hook)
+
+    def request_stats(self):
+        """Return count, errors and latency per endpoint since creation."""
+        return self._stats.snapshot()
+
+    @contextmanager
+    def request_options(self, timeout=None, deadline=None):
+        """Override timeouts for calls made inside the ``with`` block.
+
+        Applies to the calling thread only. The deadline covers every
+        request a call makes, including retries and re-authentication::
+
+            with aiden.request_options(timeout=(2, 5), deadline=10):
+                aiden.create_profile(profile)
+
+        :param timeout: ``(connect, read)`` seconds, or one number for both.
+        :param deadline: Overall seconds for the block.
+        """
+        previous = (getattr(self._local, 'timeout', None), getattr(self._local, 'deadline_at', None))
+        if timeout is not None:
+            self._local.timeout = timeout
+        if deadline is not None:
+            deadline_at = time.monotonic() + deadline
+            if previous[1] is not None:
+                deadline_at = min(deadline_at, previous[1])
+            self._local.deadline_at = deadline_at
+        try:
+            yield self
+        finally:
+            self._local.timeout, self._local.deadline_at = previous
+
+    def __timeouts(self, deadline_at):
+        """Return the ``(connect, read)`` timeout for the next attempt."""
+        timeout = getattr(self._local, 'timeout', None) or self._timeout
+        if not isinstance(timeout, tuple):
+            timeout = (timeout, timeout)
+        if deadline_at is None:
+            return timeout
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("Deadline exceeded before the request was sent")
+        return tuple(min(part, remaining) for part in timeout)
+
+    def __request(self, method, endpoint, params=None, json=None, data=None,
+                  headers=None, authenticated=True, **path):
+        """Send every Fellow API request.
+
+        Fills ``{id}`` in the endpoint with the brewer ID and other
+        placeholders from ``path``, attaches the bearer token, renews it
+        exactly once per token generation on a 401, paces attempts through
+        the rate limiter, retries 429s and transient statuses on idempotent
+        methods with exponential backoff or the server's ``Retry-After``,
+        and reports each attempt to the request hooks. While the circuit
+        breaker is open, nothing is sent and CircuitOpenError is raised.
+
+        :param json: Body to encode with :mod:`fellow_aiden.codec`.
+        :returns: The final ``requests.Response``.
+        """
+        if json is not None:
+            data = codec.dumpb(json)
+            headers = dict(headers or {}, **{'Content-Type': 'application/json'})
+        if '{id}' in endpoint:
+            path['id'] = self.__brewer()
+        url = self.BASE_URL + endpoint.format(**path)
+        send = getattr(self._session, method.lower())
+        # The outermost request of a call owns the client-wide deadline
+        owns_deadline = getattr(self._local, 'deadline_at', None) is None and self._deadline is not None
+        if owns_deadline:
+            self._local.deadline_at = time.monotonic() + self._deadline
+        try:
+            return self.__send(send, method, endpoint, url, params, data, headers, authenticated)
+        finally:
+            if owns_deadline:
+                self._local.deadline_at = None
+
+    def __send(self, send, method, endpoint, url, params, data, headers, authenticated):
+        deadline_at = getattr(self._local, 'deadline_at', None)
+        attempt = 0
+        reauthed = False
+        while True:
+            if self.degraded:
+                raise CircuitOpenError("%s %s not sent, Fellow's API is unavailable" % (method, endpoint))
+            request_headers = dict(headers or {})
+            token = None
+            if authenticated:
+                self.__ensure_token()
+                token = self._token
+                request_headers['Authorization'] = 'Bearer ' + token
+            timeout = self.__timeouts(deadline_at)
+            self.__throttle(method, endpoint, deadline_at)
+            started = time.monotonic()
+            status_code = None
+            try:
+                response = send(url, params=params, data=data,
+                                headers=request_headers, timeout=timeout)
+                status_code = response.status_code
+            except (requests.ConnectionError, requests.Timeout) as err:
+                self.__record_outcome(None)
+                if deadline_at is not None and time.monotonic() >= deadline_at:
+                    raise DeadlineExceeded("%s %s exceeded its deadline" % (method, endpoint)) from err
+                delay = self.RETRY_BACKOFF * (2 ** attempt)
+                if (method not in self.RETRY_METHODS or attempt >= self.RETRIES or self.degraded
+                        or (deadline_at is not None and time.monotonic() + delay >= deadline_at)):
+                    raise
+                self._log.debug("%s %s failed (%s), retrying in %.1fs" % (method, endpoint, err, delay))
+                time.sleep(delay)
+                attempt += 1
+                continue
+            finally:
+                self.__report(method, endpoint, status_code, time.monotonic() - started)
+            retry_after = None
+            if status_code == 429 or status_code in self.RETRY_STATUSES:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if self._limiter is not None:
+                self._limiter.feedback(status_code, retry_after)
+            self.__record_outcome(status_code)
+
+            if status_code == 401 and authenticated and not reauthed:
+                reauthed = True
+                self.__reauth(token)
+                continue
+            # A 429 was refused before processing, so any method may retry it
+            if ((status_code == 429 or (status_code in self.RETRY_STATUSES
+                                        and method in self.RETRY_METHODS))
+                    and attempt < self.RETRIES and not self.degraded):
+                delay = max(self.RETRY_BACKOFF * (2 ** attempt), retry_after or 0)
+                if deadline_at is not None and time.monotonic() + delay >= deadline_at:
+                    self._log.debug("%s %s returned %s, no time left to retry" % (method, endpoint, status_code))
+                    return response
+                self._log.debug("%s %s returned %s, retrying in %.1fs" % (method, endpoint, status_code, delay))
+                time.sleep(delay)
+                attempt += 1
+                continue
+            return response
+
+    @property
+    def degraded(self):
+        """True while the circuit breaker is open.
+
+        Requests fail fast with CircuitOpenError; reads are answered from
+        the last data fetched, which :meth:`get_state` marks as stale.
+        """
+        return self._breaker is not None and not self._breaker.allow()
+
+    def __record_outcome(self, status_code):
+        """Tell the circuit breaker how an attempt went; None for no response."""
+        if self._breaker is None or status_code == 429:
+            return
+        if status_code is None or status_code in self.RETRY_STATUSES or status_code >= 500:
+            self._breaker.record_failure(self.__probe)
+        else:
+            self._breaker.record_success()
+
+    def __probe(self):
+        """Return True once Fellow's API answers without a server error."""
+        response = self._session.get(self.BASE_URL + self.API_DEVICES, timeout=self._timeout)
+        return response.status_code < 500
+
+    def __throttle(self, method, endpoint, deadline_at):
+        """Wait for the rate limiter, without overrunning the deadline."""
+        if self._limiter is None:
+            return
+        max_wait = None
+        if deadline_at is not None:
+            max_wait = deadline_at - time.monotonic()
+        wait = self._limiter.reserve(max_wait)
+        if wait is None:
+            raise DeadlineExceeded("%s %s would exceed its deadline waiting for the rate limit" % (method, endpoint))
+        if wait:
+            self._log.debug("%s %s rate limited, waiting %.2fs" % (method, endpoint, wait))
+            time.sleep(wait)
+
+    def __create(self, endpoint, data=None, find=None, **path):
+        """POST a new resource, resending it only when that cannot duplicate it.
+
+        A dropped connection, timeout or transient status leaves it unknown
+        whether the resource was created. Before each resend, ``find``
+        looks for it in freshly fetched state; the resend only happens if
+        it is not there. Every attempt carries the same idempotency key.
+
+        :param find: Callable returning the resource if it already exists,
+                    or None. Without it, failures are not retried.
+        :returns: ``(response, None)``, or ``(None, resource)`` when an
+                  earlier attempt turned out to have succeeded.
+        """
+        headers = {self.IDEMPOTENCY_HEADER: uuid.uuid4().hex}
+        attempt = 0
+        while True:
+            try:
+                response = self.__request('POST', endpoint, json=data, headers=headers, **path)
+                if find is None or response.status_code not in self.RETRY_STATUSES or attempt >= self.RETRIES:
+                    return response, None
+                failure = "status %s" % response.status_code
+            except (requests.ConnectionError, requests.Timeout) as err:
+                if find is None or attempt >= self.RETRIES:
+                    raise
+                failure = err
+            delay = self.RETRY_BACKOFF * (2 ** attempt)
+            attempt += 1
+            self._log.debug("POST %s failed (%s), checking whether it was applied" % (endpoint, failure))
+            time.sleep(delay)
+            existing = find()
+            if existing is not None:
+                self._log.debug("POST %s had been applied, not resending" % endpoint)
+                return None, existing
+
+    def __report(self, method, endpoint, status_code, elapsed):
+        for hook in self._request_hooks:
+            try:
+                hook(method, endpoint, status_code, elapsed)
+            except Exception as err:
+                self._log.warning("Request hook failed: %s" % err)
+
+    @staticmethod
+    def __decode(response):
+        """Decode a JSON response body, returning None when there is none."""
+        if not response.content:
+            return None
+        try:
+            return codec.loads(response.content)
+        except ValueError:
+            return None
+
+    def __fetch(self, name, endpoint, params=None, cached=False):
+        """GET a cached resource, revalidating the cached copy if there is one.
+
+        :param cached: True when a cached value exists that a 304 or an
+                    identical body may confirm.
+        :returns: Parsed body, or None when the cached copy is still current.
+        """
+        headers = self._cache.conditional_headers(name) if cached else {}
+        response = self.__request('GET', endpoint, params=params, headers=headers)
+        if cached and self._cache.is_unchanged(name, response):
+            self._log.debug("Cached %s still current" % name)
+            return None
+        parsed = self.__decode(response)
         self._log.debug(parsed)
-        self._device_config = parsed[0]  # Assumes single brewer per account
-        self._brewer_id = self._device_config['id']
+        if response.status_code >= 400:
+            raise Exception("Error fetching %s: %s" % (name, parsed))
+        self._cache.store(name, response)
+        return parsed
 
-        self._profiles = None
-        self._schedules = None
+    def __revalidate(self, name):
+        """Refresh a stale resource in the background while it is served."""
+        loaders = {
+            'device': self.__device,
+            'profiles': self.__load_profiles,
+            'schedules': self.__load_schedules,
+        }
+        with self._revalidate_lock:
+            if name in self._revalidating:
+                return
+            self._revalidating.add(name)
+
+        def run():
+            try:
+                self._flights.do(name, loaders[name])
+            except Exception as err:
+                self._log.warning("Background refresh of %s failed: %s" % (name, err))
+            finally:
+                with self._revalidate_lock:
+                    self._revalidating.discard(name)
+
+        threading.Thread(target=run, name="%s-%s" % (self.NAME, name), daemon=True).start()
+
+    def __cached(self, name, value, loader, force=False):
+        """Serve a cached resource according to its TTL.
+
+        Concurrent misses share a single load, and every caller gets the
+        value that load produced. While the circuit breaker is open, the
+        cached value is served whatever its age.
+
+        :param force: Load even if the cached value is fresh.
+        """
+        state = self._cache.state(name)
+        if force or value is None or state == EXPIRED:
+            try:
+                return self._flights.do(name, loader)
+            except CircuitOpenError:
+                if value is None:
+                    raise
+                self._log.debug("Fellow's API is unavailable, serving cached %s" % name)
+                return value
+        if state == STALE and not self.degraded:
+            self.__revalidate(name)
+        return value
 
+    def __device(self):
+        self._log.debug("Fetching device for account")
+        parsed = self.__fetch('device', self.API_DEVICES, params={'dataType': 'real'},
+                              cached=self._device_config is not None)
+        if parsed is None:
+            return self._device_config
+        devices = {device['id']: device for device in parsed}
+        wanted = self._selected_brewer or self._brewer_id
+        if wanted in devices:
+            device_config = devices[wanted]
+        elif self._selected_brewer is not None:
+            raise Exception("Brewer %s is not on this account. Valid brewers: %s"
+                            % (self._selected_brewer, list(devices)))
+        elif parsed:
+            device_config = parsed[0]
+        else:
+            raise Exception("No brewers found on this account.")
+        with self._state_lock:
+            self._devices = parsed
+            self._device_config = device_config
+            if self._device_config['id'] != self._brewer_id:
+                self._profiles = None
+                self._schedules = None
+            self._brewer_id = self._device_config['id']
+            device_config = self._device_config
+        self.save_session()
 
         self._log.debug("Brewer ID: %s" % self._brewer_id)
         self._log.info("Device and profile information set")
+        return device_config
+
+    def __brewer(self):
+        """Return the brewer ID, discovering the device on first use."""
+        if self._brewer_id is None:
+            with self._device_lock:
+                if self._brewer_id is None:
+                    self._flights.do('device', self.__device)
+        return self._brewer_id
+
+    def warmup(self):
+        """Authenticate and prefetch device, profiles and schedules in the background.
+
+        Profiles and schedules are fetched in parallel once the device is
+        known. Useful with ``lazy=True`` so startup never blocks on the
+        network.
+
+        :returns: ``concurrent.futures.Future`` resolving to this client,
+                  or to the error raised while warming up.
+        """
+        future = Future()
+
+        def run():
+            try:
+                self.get_state()
+                future.set_result(self)
+            except Exception as err:
+                self._log.warning("Warmup failed: %s" % err)
+                future.set_exception(err)
+
+        threading.Thread(target=run, name="%s-warmup" % self.NAME, daemon=True).start()
+        return future
+
+    def __load_profiles(self):
+        self._log.debug("Fetching profiles")
+        parsed = self.__fetch('profiles', self.API_PROFILES, cached=self._profiles is not None)
+        with self._state_lock:
+            if parsed is not None:
+                self._profiles = parsed
+            profiles = self._profiles
+        if parsed is not None:
+            self.save_session()
+        return profiles
+
+    def __load_schedules(self):
+        self._log.debug("Fetching schedules")
+        parsed = self.__fetch('schedules', self.API_SCHEDULES, cached=self._schedules is not None)
+        with self._state_lock:
+            if parsed is not None:
+                self._schedules = parsed
+            schedules = self._schedules
+        if parsed is not None:
+            self.save_session()
+        return schedules
 
     @property
     def profiles(self):
-        if self._profiles is None:
-            self._log.debug("Fetching profiles")
-            profiles_url = self.BASE_URL + self.API_PROFILES.format(id=self._brewer_id)
-            response = self.SESSION.get(profiles_url)
-            # Check for unauthorized response and try to reauthenticate
-            if response.status_code == 401:
-                self._log.warning("Unauthorized response received. Attempting to reauthenticate...")
-                self.__auth()
-                # Retry the request with the new token
-                response = self.SESSION.get(profiles_url)
-
-            parsed = json.loads(response.content)
-            self._log.debug(parsed)
-            self._profiles = parsed
-        
-        return self._profiles
-    
+        return self.__cached('profiles', self._profiles, self.__load_profiles)
+
     @property
     def schedules(self):
-        if self._schedules is None:
-            self._log.debug("Fetching schedules")
-            schedules_url = self.BASE_URL + self.API_SCHEDULES.format(id=self._brewer_id)
-            response = self.SESSION.get(schedules_url)
-            # Check for unauthorized response and try to reauthenticate
-            if response.status_code == 401:
-                self._log.warning("Unauthorized response received. Attempting to reauthenticate...")
-                self.__auth()
-                # Retry the request with the new token
-                response = self.SESSION.get(schedules_url)
-
-            parsed = json.loads(response.content)
-            self._log.debug(parsed)
-            self._schedules = parsed
-        
-        return self._schedules
+        return self.__cached('schedules', self._schedules, self.__load_schedules)
+
+    def refresh(self):
+        """Drop cached state and refetch the device from Fellow's API.
+
+        Writes keep the cached profiles and schedules current on their own,
+        so this is only needed to pick up changes made elsewhere (app,
+        another client).
+        """
+        with self._state_lock:
+            self._cache.invalidate()
+            self._profiles = None
+            self._schedules = None
+        self._flights.do('device', self.__device)
+
+    def get_state(self):
+        """Return device config, profiles and schedules as one snapshot.
+
+        Whatever is missing or expired in the cache is fetched, all three
+        requests in parallel once the brewer is known.
+
+        :returns: :class:`BrewerState`
+        """
+        return self.__gather(force=False)
+
+    def refresh_all(self):
+        """Revalidate device config, profiles and schedules in parallel.
 
+        Unlike :meth:`refresh`, the cache is kept, so unchanged resources
+        cost a conditional request rather than a full download.
+
+        :returns: :class:`BrewerState`
+        """
+        return self.__gather(force=True)
+
+    def __gather(self, force):
+        resources = (
+            ('device', self.__device, lambda: self._device_config),
+            ('profiles', self.__load_profiles, lambda: self._profiles),
+            ('schedules', self.__load_schedules, lambda: self._schedules),
+        )
+        # A second pass only happens if the account's brewer changed mid-fetch
+        for _ in range(2):
+            discovered = self._brewer_id is None
+            brewer_id = self.__brewer()
+            with ThreadPoolExecutor(max_workers=len(resources)) as pool:
+                loads = []
+                for name, loader, current in resources:
+                    if name == 'device' and discovered:
+                        continue
+                    loads.append(pool.submit(self.__cached, name, current(), loader, force))
+                for load in loads:
+                    load.result()
+            with self._state_lock:
+                if (self._brewer_id == brewer_id
+                        and self._profiles is not None and self._schedules is not None):
+                    return BrewerState(
+                        device_config=self._device_config,
+                        profiles=tuple(self._profiles),
+                        schedules=tuple(self._schedules),
+                        fetched_at=time.time(),
+                        stale=self.degraded,
+                    )
+                # Lists loaded for the previous brewer must not be served
+                self._profiles = None
+                self._schedules = None
+        raise Exception("Brewer changed while its state was being fetched, try again.")
+
+    def __index_profiles(self):
+        """Rebuild the profile indexes if the cached list was replaced."""
+        with self._state_lock:
+            profiles = self._profiles
+            if profiles is not None and self._indexed_profiles is not profiles:
+                self._profile_index = {p['id']: p for p in profiles}
+                self._title_index = {}
+                for profile in profiles:
+                    self._title_index.setdefault(normalize_title(profile.get('title', '')), profile)
+                self._fuzzy_index = TitleIndex(profiles)
+                self._indexed_profiles = profiles
+
+    def __index_schedules(self):
+        """Rebuild the schedule index if the cached list was replaced."""
+        with self._state_lock:
+            schedules = self._schedules
+            if schedules is not None and self._indexed_schedules is not schedules:
+                self._schedule_index = {s['id']: s for s in schedules}
+                self._indexed_schedules = schedules
+
+    def __profile_by_id(self):
+        self.profiles  # Loads the list on first use
+        self.__index_profiles()
+        return self._profile_index
+
+    def __profile_by_title(self):
+        self.profiles  # Loads the list on first use
+        self.__index_profiles()
+        return self._title_index
+
+    def __schedule_by_id(self):
+        self.schedules  # Loads the list on first use
+        self.__index_schedules()
+        return self._schedule_index
+
+    # The helpers below never modify a cached list, item or index in place;
+    # they swap in copies under the state lock so readers holding the old
+    # ones never observe a half-applied change.
+
+    def __cache_profile(self, profile):
+        """Add a profile returned by the server to the cached list."""
+        with self._state_lock:
+            if self._profiles is None:
+                return
+            self.__index_profiles()
+            if profile['id'] in self._profile_index:
+                # Server handed out an id we already hold; cache is out of date
+                self._log.debug("Profile cache out of date, dropping it")
+                self._profiles = None
+                return
+            self._profiles = self._indexed_profiles = self._profiles + [profile]
+            self._cache.mark_modified('profiles')
+            self._profile_index = dict(self._profile_index)
+            self._profile_index[profile['id']] = profile
+            self._title_index = dict(self._title_index)
+            self._title_index.setdefault(normalize_title(profile.get('title', '')), profile)
+            self._fuzzy_index = TitleIndex(self._profiles)
+
+    def __patch_cached_profile(self, pid, data):
+        """Apply the fields sent in a PATCH to the cached profile."""
+        with self._state_lock:
+            if self._profiles is None:
+                return
+            self.__index_profiles()
+            profile = self._profile_index.get(pid)
+            if profile is None:
+                self._log.debug("Profile cache out of date, dropping it")
+                self._profiles = None
+                return
+            updated = dict(profile, **data)
+            self._profiles = self._indexed_profiles = [
+                updated if p is profile else p for p in self._profiles
+            ]
+            self._profile_index = dict(self._profile_index)
+            self._profile_index[pid] = updated
+            self._cache.mark_modified('profiles')
+            self._title_index = dict(self._title_index)
+            old_title = normalize_title(profile.get('title', ''))
+            if self._title_index.get(old_title) is profile:
+                # Hand the old title to the next profile that shares it
+                del self._title_index[old_title]
+                for other in self._profiles:
+                    if normalize_title(other.get('title', '')) == old_title:
+                        self._title_index[old_title] = other
+                        break
+            self._title_index.setdefault(normalize_title(updated.get('title', '')), updated)
+            self._fuzzy_index = TitleIndex(self._profiles)
+
+    def __uncache_profile(self, pid):
+        with self._state_lock:
+            if self._profiles is not None:
+                # Replacing the list lets the indexes rebuild on next lookup
+                self._profiles = [p for p in self._profiles if p['id'] != pid]
+                self._cache.mark_modified('profiles')
+
+    def __cache_schedule(self, schedule):
+        """Add a schedule returned by the server to the cached list."""
+        with self._state_lock:
+            if self._schedules is None:
+                return
+            self.__index_schedules()
+            if schedule['id'] in self._schedule_index:
+                self._log.debug("Schedule cache out of date, dropping it")
+                self._schedules = None
+                return
+            self._schedules = self._indexed_schedules = self._schedules + [schedule]
+            self._cache.mark_modified('schedules')
+            self._schedule_index[schedule['id']] = schedule
+
+    def __patch_cached_schedule(self, sid, data):
+        """Apply the fields sent in a PATCH to the cached schedule."""
+        with self._state_lock:
+            if self._schedules is None:
+                return
+            self.__index_schedules()
+            schedule = self._schedule_index.get(sid)
+            if schedule is None:
+                self._log.debug("Schedule cache out of date, dropping it")
+                self._schedules = None
+                return
+            updated = dict(schedule, **data)
+            self._schedules = self._indexed_schedules = [
+                updated if s is schedule else s for s in self._schedules
+            ]
+            self._schedule_index[sid] = updated
+            self._cache.mark_modified('schedules')
+
+    def __uncache_schedule(self, sid):
+        with self._state_lock:
+            if self._schedules is not None:
+                self._schedules = [s for s in self._schedules if s['id'] != sid]
+                self._cache.mark_modified('schedules')
 
     def __get_profile_ids(self):
         """Return a list of profile IDs."""
@@ -169,10 +982,7 @@ class FellowAiden:
     
     def __is_valid_profile_id(self, pid):
         """Check if a profile ID is valid."""
-        for profile in self.profiles:
-            if pid == profile['id']:
-                return True
-        return False
+        return pid in self.__profile_by_id()
     
     def __get_schedule_ids(self):
         """Return a list of schedule IDs."""
@@ -180,33 +990,57 @@ class FellowAiden:
     
     def __is_valid_schedule_id(self, sid):
         """Check if a schedule ID is valid."""
-        for schedule in self.schedules:
-            if sid == schedule['id']:
-                return True
-        return False
+        return sid in self.__schedule_by_id()
 
-    def parse_brewlink_url(self, link):
-        """Extract profile information from a shared brew link."""
-        self._log.debug("Parsing shared brew link")
+    @staticmethod
+    def brew_id_from_link(link):
+        """Return the brew id of a shared brew link or bare id."""
         pattern = r'(?:.*?/p/)?([a-zA-Z0-9]+)/?$'
         match = re.search(pattern, link)
         if not match:
             raise ValueError("Invalid profile URL or ID format")
-        brew_id = match.group(1)
+        return match.group(1)
+
+    def parse_brewlink_url(self, link):
+        """Extract profile information from a shared brew link.
+
+        Shared profiles do not change, so each brew id is fetched once and
+        then served from the link cache.
+        """
+        self._log.debug("Parsing shared brew link")
+        brew_id = self.brew_id_from_link(link)
         self._log.debug("Brew ID: %s" % brew_id)
-        shared_url = self.BASE_URL + self.API_SHARED_PROFILE.format(bid=brew_id)
-        response = self.SESSION.get(shared_url)
-        
-        # Check for unauthorized response and try to reauthenticate
-        if response.status_code == 401:
-            self._log.warning("Unauthorized response received. Attempting to reauthenticate...")
-            self.__auth()
-            # Retry the request with the new token
-            response = self.SESSION.get(shared_url)
-            
-        if response.status_code != 200:
+        if self._link_cache is None:
+            return self.__fetch_shared(brew_id)
+        parsed = self._link_cache.get(brew_id)
+        if parsed is None:
+            parsed = self._flights.do('shared:' + brew_id, self.__fetch_shared, brew_id)
+            self._link_cache.put(brew_id, parsed)
+            # Concurrent callers share the fetched dict; hand each a copy
+            parsed = copy.deepcopy(parsed)
+        return parsed
+
+    def parse_brewlink_urls(self, links, max_workers=None):
+        """Resolve several shared brew links concurrently.
+
+        :param max_workers: Requests in flight at once, defaults to BULK_WORKERS.
+        :returns: List in the order of ``links`` holding each profile, or
+                  the exception raised while resolving it.
+        """
+        def resolve(link):
+            try:
+                return self.parse_brewlink_url(link)
+            except Exception as err:
+                return err
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.BULK_WORKERS) as pool:
+            return list(pool.map(resolve, links))
+
+    def __fetch_shared(self, brew_id):
+        response = self.__request('GET', self.API_SHARED_PROFILE, bid=brew_id)
+        parsed = self.__decode(response)
+        if response.status_code != 200 or not isinstance(parsed, dict):
             raise ValueError(f"Failed to fetch profile (ID: {brew_id})")
-        parsed = json.loads(response.content)
         for field in self.SERVER_SIDE_PROFILE_FIELDS:
             parsed.pop(field, None)
         self._log.debug("Profile fetched: %s" % parsed)
@@ -217,15 +1051,13 @@ class FellowAiden:
 
         :param remote: If True, force a new request to Fellow's API
                     to refresh the device config. Otherwise,
-                    returns the cached config.
+                    returns the cached config, honoring its TTL.
         """
-        if remote:
-            self.__device()
-        return self._device_config
+        return self.__cached('device', self._device_config, self.__device, force=remote)
 
         
     def get_display_name(self):
-        return self._device_config.get('displayName', None)
+        return self.get_device_config().get('displayName', None)
         
     def get_profiles(self):
         return self.profiles
@@ -234,16 +1066,69 @@ class FellowAiden:
         return self.schedules
     
     def get_profile_by_title(self, title, fuzzy=False):
-        for profile in self.profiles:
-            if fuzzy:
-                if similar(profile['title'].lower(), title.lower()) > 0.65:
-                    return profile
-            if profile['title'].lower() == title.lower():
-                return profile
-        return None
+        """Return the profile with this title.
+
+        :param fuzzy: If True and no title matches exactly, return the
+                    closest title instead of the first one that is similar.
+        """
+        profile = self.__profile_by_title().get(normalize_title(title))
+        if profile is not None or not fuzzy:
+            return profile
+        return self._fuzzy_index.best(title)
+
+    def search_profiles(self, query, limit=5):
+        """Return up to ``limit`` profiles whose titles resemble ``query``, best first."""
+        self.__profile_by_title()
+        return [profile for profile, score in self._fuzzy_index.search(query, limit=limit)]
+
+    def get_profile_by_id(self, pid):
+        """Return the cached profile with this ID, or None."""
+        return self.__profile_by_id().get(pid)
         
     def get_brewer_id(self):
-        return self._brewer_id
+        return self.__brewer()
+
+    def get_devices(self, remote=False):
+        """Return the config of every brewer on the account.
+
+        :param remote: If True, refetch the list from Fellow's API.
+        """
+        self.get_device_config(remote)
+        return list(self._devices)
+
+    def for_device(self, brewer_id):
+        """Return a client for another brewer on the same account.
+
+        The new client starts from this one's tokens and device list, so
+        no login or discovery request is made, and shares its connection
+        pool, rate limiter, circuit breaker, outbox, timeouts and cache
+        settings. Its profile and
+        schedule caches are its own.
+
+        :param brewer_id: ID of a brewer listed by :meth:`get_devices`.
+        """
+        devices = {device['id']: device for device in self.get_devices()}
+        if brewer_id not in devices:
+            message = "Brewer %s is not on this account. Valid brewers: %s" % (brewer_id, list(devices))
+            raise Exception(message)
+        cache_ttl, stale_while_revalidate = self._cache_options
+        client = FellowAiden(
+            self._email, self._password,
+            adapter=self._session.get_adapter(self.BASE_URL),
+            keep_alive=self._session.headers.get('Connection') != 'close',
+            cache_ttl=cache_ttl, stale_while_revalidate=stale_while_revalidate,
+            lazy=True, timeout=self._timeout, deadline=self._deadline,
+            rate_limiter=self._limiter or False, brewer_id=brewer_id,
+            link_cache=False if self._link_cache is None else self._link_cache,
+            circuit_breaker=self._breaker or False, outbox=self._outbox,
+        )
+        with self._token_lock:
+            if self._auth:
+                client.__set_tokens({'accessToken': self._token, 'refreshToken': self._refresh})
+        client._devices = self._devices
+        client._device_config = devices[brewer_id]
+        client._brewer_id = brewer_id
+        return client
         
     def create_profile(self, data):
         self._log.debug("Checking brew profile: %s" % data)
@@ -256,27 +1141,141 @@ class FellowAiden:
         if 'id' in data.keys():
             raise Exception("Candidate profiles must be free of server derived fields.")
             return False
+
+        if self._profiles is not None:
+            self.__check_capacity(len(self._profiles), 1)
         
         self._log.debug("Brew profile passed checks")
-        profile_url = self.BASE_URL + self.API_PROFILES.format(id=self._brewer_id)
-        response = self.SESSION.post(profile_url, json=data)
-        
-        # Check for unauthorized response and try to reauthenticate
-        if response.status_code == 401:
-            self._log.warning("Unauthorized response received. Attempting to reauthenticate...")
-            self.__auth()
-            # Retry the request with the new token
-            response = self.SESSION.post(profile_url, json=data)
-            
-        parsed = json.loads(response.content)
-        if 'id' not in parsed:
-            raise Exception("Error in processing: %s" % parsed)
-        self.__device()  # Refreshed profiles this way
-        self._log.debug("Brew profile created: %s" % parsed)
-        return parsed
+        content = profile_content(data)
+
+        def send():
+            # Only a profile missing from this snapshot can be the one created.
+            # Without cached profiles to compare, a resend relies on the
+            # idempotency key alone
+            known = None if self._profiles is None else set(p['id'] for p in self._profiles)
+
+            def find():
+                if known is None:
+                    return None
+                profiles = self._flights.do('profiles', self.__load_profiles) or []
+                return next((p for p in profiles if p['id'] not in known and profile_content(p) == content), None)
+            response, existing = self.__create(self.API_PROFILES, data, find)
+            if existing is not None:
+                return existing
+            parsed = self.__decode(response) or {}
+            if 'id' not in parsed:
+                raise Exception("Error in processing: %s" % parsed)
+            self.__cache_profile(parsed)
+            self._log.debug("Brew profile created: %s" % parsed)
+            return parsed
+        return self.__write_behind(CREATE_PROFILE, None, data, send)
     
+    def create_profiles(self, profiles, max_workers=None):
+        """Create several profiles concurrently.
+
+        Every profile is validated, and the brewer's free slots counted,
+        before any request is sent. Profiles identical to one already on
+        the brewer, or earlier in the list, are skipped.
+
+        :param profiles: List of profile dicts without server-side fields.
+        :param max_workers: Requests in flight at once, defaults to BULK_WORKERS.
+        :returns: List of :class:`ProfileResult`, in input order.
+        """
+        self.__validate_profiles(profiles, allow_server_fields=False)
+        existing = list(self.profiles)
+        plan = []
+        for data in profiles:
+            match = next((p for p in existing if profile_content(p) == profile_content(data)), None)
+            if match is None:
+                plan.append((CREATED, None, data))
+                existing.append(data)
+            else:
+                plan.append((UNCHANGED, match, data))
+        self.__check_capacity(len(self.profiles), sum(action == CREATED for action, _, _ in plan))
+        return self.__write_profiles(plan, max_workers)
+
+    def upsert_profiles(self, profiles, max_workers=None):
+        """Create or update several profiles concurrently, matched by title.
+
+        A profile whose title is already on the brewer updates it, unless
+        nothing changed, in which case no request is sent; the others are
+        created. Validation and the slot count happen before any request.
+
+        :param profiles: List of profile dicts. Server-side fields, as in
+                    exported profiles, are ignored.
+        :param max_workers: Requests in flight at once, defaults to BULK_WORKERS.
+        :returns: List of :class:`ProfileResult`, in input order.
+        """
+        self.__validate_profiles(profiles, allow_server_fields=True)
+        by_title = self.__profile_by_title()
+        plan = []
+        for data in profiles:
+            data = {k: v for k, v in data.items() if k not in self.SERVER_SIDE_PROFILE_FIELDS}
+            match = by_title.get(normalize_title(data['title']))
+            if match is None:
+                plan.append((CREATED, None, data))
+            elif profile_content(match) == profile_content(data):
+                plan.append((UNCHANGED, match, data))
+            else:
+                plan.append((UPDATED, match, data))
+        self.__check_capacity(len(self.profiles), sum(action == CREATED for action, _, _ in plan))
+        return self.__write_profiles(plan, max_workers)
+
+    def __validate_profiles(self, profiles, allow_server_fields):
+        invalid = validate_profiles(profiles)
+        errors = []
+        titles = set()
+        for position, data in enumerate(profiles):
+            if position in invalid:
+                errors.append("#%d %s: %s" % (position, data.get('title'), invalid[position]))
+                continue
+            if not allow_server_fields and 'id' in data:
+                errors.append("#%d %s: candidate profiles must be free of server derived fields"
+                              % (position, data['title']))
+            title = normalize_title(data['title'])
+            if allow_server_fields and title in titles:
+                errors.append("#%d %s: title appears more than once" % (position, data['title']))
+            titles.add(title)
+        if errors:
+            raise Exception("Invalid profiles, nothing was sent:\n%s" % "\n".join(errors))
+
+    def __check_capacity(self, current, new):
+        if current + new > self.MAX_PROFILES:
+            raise Exception("Brewer holds %d of %d profiles; %d more do not fit."
+                            % (current, self.MAX_PROFILES, new))
+
+    def __write_profiles(self, plan, max_workers):
+        """Send the writes of a bulk plan concurrently and collect results."""
+        def write(action, match, data):
+            if action == CREATED:
+                return self.create_profile(dict(data))
+            self.update_profile(match['id'], dict(data))
+            return self.__profile_by_id().get(match['id'])
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.BULK_WORKERS) as pool:
+            writes = [
+                None if action == UNCHANGED else pool.submit(write, action, match, data)
+                for action, match, data in plan
+            ]
+        results = []
+        for (action, match, data), future in zip(plan, writes):
+            if future is None:
+                results.append(ProfileResult(data['title'], UNCHANGED, match))
+                continue
+            try:
+                results.append(ProfileResult(data['title'], action, future.result()))
+            except Exception as err:
+                self._log.warning("Could not write profile %s: %s" % (data['title'], err))
+                results.append(ProfileResult(data['title'], FAILED, error=err))
+        return results
+
     def update_profile(self, profile_id, data):
-        """Update an existing profile by ID."""
+        """Update an existing profile by ID.
+
+        Only fields that differ from the cached profile are sent; if none
+        do, no request is made. Call :meth:`refresh` first if the profile
+        may have been edited elsewhere.
+        """
         self._log.debug(f"Updating brew profile {profile_id}: {data}")
         
         # Validate the profile data
@@ -285,6 +1284,11 @@ class FellowAiden:
         except ValidationError as err:
             self._log.error("Brew profile format was invalid: %s" % err)
             return False
+
+        profile_id = self.__resolve_id(profile_id)
+        if self.__is_provisional(profile_id):
+            changes = {k: v for k, v in data.items() if k not in self.SERVER_SIDE_PROFILE_FIELDS}
+            return self.__enqueue(PATCH_PROFILE, profile_id, changes, True)
         
         # Check if profile exists
         if not self.__is_valid_profile_id(profile_id):
@@ -295,32 +1299,68 @@ class FellowAiden:
         for field in self.SERVER_SIDE_PROFILE_FIELDS:
             if field in data:
                 data.pop(field, None)
+
+        # Only send the fields that differ from the cached profile
+        current = self.__profile_by_id()[profile_id]
+        changes = {k: v for k, v in data.items() if k not in current or current[k] != v}
+        if not changes:
+            self._log.debug(f"Profile {profile_id} unchanged, nothing to send")
+            return True
         
-        # Use PATCH to update the profile
-        update_url = self.BASE_URL + self.API_PROFILE.format(id=self._brewer_id, pid=profile_id)
-        self._log.debug(f"Update URL: {update_url}")
-        response = self.SESSION.patch(update_url, json=data)
-        
-        # Check for unauthorized response and try to reauthenticate
-        if response.status_code == 401:
-            self._log.warning("Unauthorized response received. Attempting to reauthenticate...")
-            self.__auth()
-            # Retry the request with the new token
-            response = self.SESSION.patch(update_url, json=data)
-        
-        # Check response
-        if response.status_code >= 400:
-            parsed = json.loads(response.content)
-            raise Exception(f"Error updating profile: {parsed}")
-        
-        self.__device()  # Refresh profiles
-        self._log.info(f"Profile {profile_id} updated successfully")
-        return True
+        def send():
+            response = self.__request('PATCH', self.API_PROFILE, json=changes, pid=profile_id)
+            if response.status_code >= 400:
+                parsed = self.__decode(response)
+                raise Exception(f"Error updating profile: {parsed}")
+            self.__patch_cached_profile(profile_id, changes)
+            self._log.info(f"Profile {profile_id} updated successfully")
+            return True
+        return self.__write_behind(PATCH_PROFILE, profile_id, changes, send, True)
     
+    def patch_profile(self, profile_id, changes):
+        """Change some fields of an existing profile.
+
+        Only ``changes`` are sent, after checking the profile they produce
+        is valid.
+
+        :param changes: Dict of profile fields to set.
+        """
+        profile_id = self.__resolve_id(profile_id)
+        if self.__is_provisional(profile_id):
+            changes = {k: v for k, v in changes.items() if k not in self.SERVER_SIDE_PROFILE_FIELDS}
+            return self.__enqueue(PATCH_PROFILE, profile_id, changes, True)
+        profile = self.get_profile_by_id(profile_id)
+        if profile is None:
+            message = f"Profile with ID {profile_id} does not exist. Valid profiles: {self.__get_profile_ids()}"
+            raise Exception(message)
+        changes = {k: v for k, v in changes.items() if k not in self.SERVER_SIDE_PROFILE_FIELDS}
+        try:
+            CoffeeProfile.model_validate(dict(profile_content(profile), **changes))
+        except ValidationError as err:
+            self._log.error("Brew profile format was invalid: %s" % err)
+            return False
+        if not changes:
+            return True
+        self._log.debug(f"Patching brew profile {profile_id}: {changes}")
+
+        def send():
+            response = self.__request('PATCH', self.API_PROFILE, json=changes, pid=profile_id)
+            if response.status_code >= 400:
+                parsed = self.__decode(response)
+                raise Exception(f"Error updating profile: {parsed}")
+            self.__patch_cached_profile(profile_id, changes)
+            return True
+        return self.__write_behind(PATCH_PROFILE, profile_id, changes, send, True)
+
     def create_schedule(self, data):
         self._log.debug("Checking schedule: %s" % data)
+        provisional = isinstance(data, dict) and self.__is_provisional(data.get('profileId'))
+        if provisional:
+            data = dict(data, profileId=self.__resolve_id(data['profileId']))
+            provisional = self.__is_provisional(data['profileId'])
         try:
-            CoffeeSchedule.model_validate(data)
+            # A queued profile has no real ID yet, so check the rest of the schedule
+            CoffeeSchedule.model_validate(dict(data, profileId='p0') if provisional else data)
         except ValidationError as err:
             self._log.error("Brew schedule format was invalid: %s" % err)
             return False
@@ -330,25 +1370,34 @@ class FellowAiden:
             return False
     
         self._log.debug("Brew schedule passed checks")
-        schedule_url = self.BASE_URL + self.API_SCHEDULES.format(id=self._brewer_id)
-        response = self.SESSION.post(schedule_url, json=data)
-        
-        # Check for unauthorized response and try to reauthenticate
-        if response.status_code == 401:
-            self._log.warning("Unauthorized response received. Attempting to reauthenticate...")
-            self.__auth()
-            # Retry the request with the new token
-            response = self.SESSION.post(schedule_url, json=data)
-            
-        parsed = json.loads(response.content)
-        if 'id' not in parsed:
-            message = parsed.get('message', 'Unable to get error message.')
-            if 'Profile could not be found' in message:
-                message += "Valid profiles: %s" % self.__get_profile_ids()
-            raise Exception("Error in processing: %s" % message)
-        self.__device()  # Refreshed schedules this way
-        self._log.debug("Brew schedule created: %s" % parsed)
-        return parsed
+        content = {field: data.get(field) for field in CoffeeSchedule.model_fields}
+
+        def send():
+            # As in create_profile, only match schedules absent before the POST
+            known = None if self._schedules is None else set(s['id'] for s in self._schedules)
+
+            def find():
+                if known is None:
+                    return None
+                schedules = self._flights.do('schedules', self.__load_schedules) or []
+                return next((s for s in schedules if s['id'] not in known
+                             and {field: s.get(field) for field in CoffeeSchedule.model_fields} == content), None)
+            response, existing = self.__create(self.API_SCHEDULES, data, find)
+            if existing is not None:
+                return existing
+            parsed = self.__decode(response) or {}
+            if 'id' not in parsed:
+                message = parsed.get('message', 'Unable to get error message.')
+                if 'Profile could not be found' in message:
+                    message += "Valid profiles: %s" % self.__get_profile_ids()
+                raise Exception("Error in processing: %s" % message)
+            self.__cache_schedule(parsed)
+            self._log.debug("Brew schedule created: %s" % parsed)
+            return parsed
+        if provisional:
+            # Its profile is still queued, so the schedule must wait too
+            return self.__enqueue(CREATE_SCHEDULE, None, data)
+        return self.__write_behind(CREATE_SCHEDULE, None, data, send)
 
     def create_profile_from_link(self, link):
         """Create a profile from a shared brew link."""
@@ -359,18 +1408,9 @@ class FellowAiden:
     def generate_share_link(self, pid):
         """Generate a share link for a profile."""
         self._log.debug("Generating share link")
-        share_url = self.BASE_URL + self.API_PROFILE_SHARE.format(id=self._brewer_id, pid=pid)
-        self._log.debug("Share URL: %s" % share_url)
-        response = self.SESSION.post(share_url)
-        
-        # Check for unauthorized response and try to reauthenticate
-        if response.status_code == 401:
-            self._log.warning("Unauthorized response received. Attempting to reauthenticate...")
-            self.__auth()
-            # Retry the request with the new token
-            response = self.SESSION.post(share_url)
-            
-        parsed = json.loads(response.content)
+        # A share leaves nothing to look up, so it is resent with the same key
+        response, _ = self.__create(self.API_PROFILE_SHARE, find=lambda: None, pid=pid)
+        parsed = self.__decode(response) or {}
         if 'link' not in parsed:
             raise Exception("Error in processing: %s" % parsed)
         self._log.debug("Share link generated: %s" % parsed)
@@ -378,68 +1418,264 @@ class FellowAiden:
         
     def delete_profile_by_id(self, pid):
         self._log.debug("Deleting profile")
-        # Check is too slow with new lazy loading impelementation
-        # if not self.__is_valid_profile_id(pid):
-        #     message = "Profile does not exist. Valid profiles: %s" % (self.__get_profile_ids())
-        #     raise Exception(message)
-        delete_url = self.BASE_URL + self.API_PROFILE.format(id=self._brewer_id, pid=pid)
-        self._log.debug(delete_url)
-        response = self.SESSION.delete(delete_url)
-        
-        # Check for unauthorized response and try to reauthenticate
-        if response.status_code == 401:
-            self._log.warning("Unauthorized response received. Attempting to reauthenticate...")
-            self.__auth()
-            # Retry the request with the new token
-            response = self.SESSION.delete(delete_url)
-            
-        self._log.info("Profile deleted")
-        return True
+        pid = self.__resolve_id(pid)
+        if self.__is_provisional(pid):
+            return self.__enqueue(DELETE_PROFILE, pid, None, True)
+        if not self.__is_valid_profile_id(pid):
+            message = "Profile does not exist. Valid profiles: %s" % (self.__get_profile_ids())
+            raise Exception(message)
+
+        def send():
+            response = self.__request('DELETE', self.API_PROFILE, pid=pid)
+            if not response.ok:
+                raise Exception("Error deleting profile: %s" % self.__decode(response))
+            self.__uncache_profile(pid)
+            self._log.info("Profile deleted")
+            return True
+        return self.__write_behind(DELETE_PROFILE, pid, None, send, True)
     
     def delete_schedule_by_id(self, sid):
         self._log.debug("Deleting schedule")
         if not self.__is_valid_schedule_id(sid):
             message = "Schedule does not exist. Valid schedules: %s" % (self.__get_schedule_ids())
             raise Exception(message)
-        delete_url = self.BASE_URL + self.API_SCHEDULE.format(id=self._brewer_id, sid=sid)
-        self._log.debug(delete_url)
-        response = self.SESSION.delete(delete_url)
+        response = self.__request('DELETE', self.API_SCHEDULE, sid=sid)
+        if not response.ok:
+            raise Exception("Error deleting schedule: %s" % self.__decode(response))
+        self.__uncache_schedule(sid)
         self._log.info("Schedule deleted")
         return True
     
     def adjust_setting(self, setting, value):
-        patch_url = self.BASE_URL + self.API_DEVICE.format(id=self._brewer_id)
-        self._log.debug("Patch URL: %s" % patch_url)
-        data = json.dumps({setting: value})
-        response = self.SESSION.patch(patch_url, data=data)
-        
-        # Check for unauthorized response and try to reauthenticate
-        if response.status_code == 401:
-            self._log.warning("Unauthorized response received. Attempting to reauthenticate...")
-            self.__auth()
-            # Retry the request with the new token
-            response = self.SESSION.patch(patch_url, data=data)
-            
-        return response.content
+        self._log.debug("Adjusting setting %s: %s" % (setting, value))
+        data = codec.dumpb({setting: value})
+
+        def send():
+            response = self.__request('PATCH', self.API_DEVICE, data=data)
+            if response.ok:
+                self.__store_settings(self.__decode(response), {setting: value})
+            return response.content
+        return self.__write_behind(SETTINGS, None, {setting: value}, send)
+
+    def adjust_settings(self, settings):
+        """Change several device settings with one request.
+
+        Keys must be settings present in the device config. Settings
+        already queued with :meth:`queue_settings` are sent along.
+
+        :param settings: Dict of setting name to new value.
+        :returns: The updated device config.
+        """
+        future = self.queue_settings(settings)
+        self.flush_settings()
+        return future.result()
+
+    def queue_settings(self, settings):
+        """Queue device settings to be sent together after a short delay.
+
+        Changes queued within SETTINGS_DEBOUNCE seconds of each other are
+        merged, later values winning, and sent as one PATCH.
+
+        :param settings: Dict of setting name to new value.
+        :returns: ``concurrent.futures.Future`` resolving to the updated
+                  device config.
+        """
+        config = self.get_device_config()
+        unknown = [key for key in settings if key not in config]
+        if unknown:
+            raise Exception("Unknown device settings %s. Valid settings: %s" % (unknown, sorted(config)))
+        with self._settings_lock:
+            self._pending_settings.update(settings)
+            if self._settings_future is None:
+                self._settings_future = Future()
+                self._settings_timer = threading.Timer(self.SETTINGS_DEBOUNCE, self.__flush_settings_later)
+                self._settings_timer.daemon = True
+                self._settings_timer.start()
+            return self._settings_future
+
+    def flush_settings(self):
+        """Send queued settings now.
+
+        :returns: The updated device config, or None if nothing was queued.
+        """
+        with self._settings_lock:
+            pending, future = self._pending_settings, self._settings_future
+            self._pending_settings, self._settings_future = {}, None
+            if self._settings_timer is not None:
+                self._settings_timer.cancel()
+                self._settings_timer = None
+        if future is None:
+            return None
+        try:
+            future.set_result(self.__send_settings(pending))
+        except Exception as err:
+            future.set_exception(err)
+        return future.result()
+
+    def __flush_settings_later(self):
+        try:
+            self.flush_settings()
+        except Exception as err:
+            self._log.warning("Could not adjust settings: %s" % err)
+
+    def __send_settings(self, settings):
+        """PATCH the settings that differ from the cached config."""
+        config = self.get_device_config()
+        changes = {key: value for key, value in settings.items() if config.get(key) != value}
+        if not changes:
+            return config
+        return self.__write_behind(SETTINGS, None, changes, lambda: self.__patch_settings(changes),
+                                   dict(config, **changes))
+
+    def __patch_settings(self, changes):
+        self._log.debug("Adjusting settings: %s" % changes)
+        response = self.__request('PATCH', self.API_DEVICE, data=codec.dumpb(changes))
+        parsed = self.__decode(response)
+        if response.status_code >= 400:
+            raise Exception("Error adjusting settings: %s" % parsed)
+        return self.__store_settings(parsed, changes)
+
+    def __store_settings(self, parsed, changes):
+        """Bring the cached device config in line with settings just sent.
+
+        :param parsed: Decoded PATCH response; used if it is the config.
+        :returns: The updated config, or None if none was cached.
+        """
+        with self._state_lock:
+            if isinstance(parsed, dict) and parsed.get('id') == self._brewer_id:
+                config = parsed
+            elif self._device_config is not None:
+                config = dict(self._device_config, **changes)
+            else:
+                return None
+            self._device_config = config
+            if self._devices:
+                self._devices = [config if d['id'] == config['id'] else d for d in self._devices]
+            self._cache.mark_modified('device')
+        self.save_session()
+        return config
     
     def toggle_schedule(self, sid, enabled):
+        sid = self.__resolve_id(sid)
+        if self.__is_provisional(sid):
+            return self.__enqueue(TOGGLE_SCHEDULE, sid, {'enabled': enabled})
         if not self.__is_valid_schedule_id(sid):
             message = "Schedule does not exist. Valid schedules: %s" % (self.__get_schedule_ids())
             raise Exception(message)
-        patch_url = self.BASE_URL + self.API_SCHEDULE.format(id=self._brewer_id, sid=sid)
-        self._log.debug("Patch URL: %s" % patch_url)
-        data = json.dumps({'enabled': enabled})
-        response = self.SESSION.patch(patch_url, data=data)
-        
-        # Check for unauthorized response and try to reauthenticate
-        if response.status_code == 401:
-            self._log.warning("Unauthorized response received. Attempting to reauthenticate...")
-            self.__auth()
-            # Retry the request with the new token
-            response = self.SESSION.patch(patch_url, data=data)
-            
-        return response.content
-        
+        return self.__write_behind(TOGGLE_SCHEDULE, sid, {'enabled': enabled},
+                                   lambda: self.__toggle(sid, enabled).content)
+
+    def __toggle(self, sid, enabled):
+        data = codec.dumpb({'enabled': enabled})
+        response = self.__request('PATCH', self.API_SCHEDULE, data=data, sid=sid)
+        if not response.ok:
+            raise Exception("Error toggling schedule: %s" % self.__decode(response))
+        self.__patch_cached_schedule(sid, {'enabled': enabled})
+        return response
+
+    def replay_outbox(self):
+        """Send the writes queued in the outbox for this brewer, oldest first.
+
+        Stops quietly if Fellow's API is still unreachable. A write the
+        API rejects, e.g. an edit to a profile deleted elsewhere, raises
+        OutboxConflict; it and every later write stay queued until it is
+        dropped with :meth:`Outbox.remove` (``err.operation.seq``).
+
+        :returns: Number of writes sent.
+        """
+        if self._outbox is None:
+            return 0
+        brewer_id = self.__brewer()
+        sent = 0
+        with self._outbox_lock:
+            self._local.replaying = True
+            try:
+                while True:
+                    operation = self._outbox.peek(brewer_id)
+                    if operation is None:
+                        break
+                    try:
+                        result = self.__replay(operation)
+                    except self.UNREACHABLE_ERRORS as err:
+                        self._log.debug("Fellow's API still unreachable, %d writes sent: %s" % (sent, err))
+                        break
+                    except Exception as err:
+                        raise OutboxConflict(operation, err) from err
+                    if operation.kind in CREATES:
+                        self._outbox.resolve(brewer_id, operation.target, result['id'])
+                    self._outbox.remove(operation.seq)
+                    sent += 1
+            finally:
+                self._local.replaying = False
+        if sent:
+            self._log.info("Replayed %d queued writes" % sent)
+        return sent
+
+    def __replay(self, operation):
+        kind, target, payload = operation.kind, operation.target, operation.payload
+        # A create whose provisional ID was never resolved was cancelled; sending
+        # this would queue it again behind itself
+        for item_id in (None if kind in CREATES else target, (payload or {}).get('profileId')):
+            if self.__is_provisional(item_id) and self.__resolve_id(item_id) == item_id:
+                raise Exception("Queued %s refers to %s, whose create was never sent" % (kind, item_id))
+        if kind == CREATE_PROFILE:
+            result = self.create_profile(dict(payload))
+        elif kind == PATCH_PROFILE:
+            result = self.patch_profile(target, payload)
+        elif kind == DELETE_PROFILE:
+            result = self.delete_profile_by_id(target)
+        elif kind == CREATE_SCHEDULE:
+            result = self.create_schedule(dict(payload))
+        elif kind == TOGGLE_SCHEDULE:
+            self.__toggle(target, payload['enabled'])
+            result = True
+        else:
+            result = self.__send_settings(payload)
+        if result is False:
+            raise Exception("Queued %s failed validation" % kind)
+        return result
+
+    def __write_behind(self, kind, target, payload, send, queued=None):
+        """Send a write, or queue it in the outbox while Fellow's API is unreachable.
+
+        A write made while others are queued is queued behind them unless
+        they can all be sent first, so writes reach the brewer in order.
+
+        :param send: Callable performing the write.
+        :param queued: Value to return if the write is queued.
+        """
+        if self._outbox is None or getattr(self._local, 'replaying', False):
+            return send()
+        if self._outbox.peek(self.__brewer()) is not None:
+            try:
+                self.replay_outbox()
+            except OutboxConflict as err:
+                self._log.warning("Outbox is blocked: %s" % err)
+            if self._outbox.peek(self.__brewer()) is not None:
+                return self.__enqueue(kind, target, payload, queued)
+        try:
+            return send()
+        except self.UNREACHABLE_ERRORS as err:
+            self._log.warning("Fellow's API is unreachable (%s), queued %s" % (err, kind))
+            return self.__enqueue(kind, target, payload, queued)
+
+    def __enqueue(self, kind, target, payload, queued=None):
+        """Queue a write; creates get a provisional ID and return the new item."""
+        if kind in CREATES:
+            target = self.PROVISIONAL_PREFIX + uuid.uuid4().hex
+            queued = dict(payload, id=target)
+        self._outbox.add(self.__brewer(), kind, target, payload)
+        return queued
+
+    def __is_provisional(self, item_id):
+        return self._outbox is not None and str(item_id).startswith(self.PROVISIONAL_PREFIX)
+
+    def __resolve_id(self, item_id):
+        """Return the real ID of a queued create that has since been sent."""
+        if not self.__is_provisional(item_id):
+            return item_id
+        return self._outbox.real_id(self.__brewer(), item_id) or item_id
+
     def authenticate(self):
         """
         Public method to reauthenticate the user.
@@ -449,3 +1685,7 @@ class FellowAiden:
         """
         self._log.debug("Reauthenticating user via public method")
         self.__auth()
+
+
+from fellow_aiden.aio import AsyncFellowAiden  # noqa: E402
+from fellow_aiden.fleet import DeviceResult, FellowFleet  # noqa: E402
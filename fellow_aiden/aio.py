@@ -0,0 +1,672 @@
+"""Asyncio object to interact with Aiden brewer."""
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from fellow_aiden import FellowAiden, codec, token_expiry
+from fellow_aiden.exceptions import DeadlineExceeded
+from fellow_aiden.linkcache import SharedProfileCache
+from fellow_aiden.profile import CoffeeProfile
+from fellow_aiden.ratelimit import RateLimiter, parse_retry_after
+from fellow_aiden.schedule import CoffeeSchedule
+from fellow_aiden.search import TitleIndex, normalize_title
+from fellow_aiden.state import BrewerState
+from pydantic import ValidationError
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+
+class AsyncFellowAiden:
+
+    """Asyncio object to interact with Aiden brewer.
+
+    Mirrors :class:`FellowAiden`, but every network call is a coroutine
+    running on a shared ``httpx.AsyncClient`` with a bounded connection
+    pool, so one event loop can drive many brewers at once.
+    """
+
+    NAME = FellowAiden.NAME
+    LOG_LEVEL = FellowAiden.LOG_LEVEL
+    BASE_URL = FellowAiden.BASE_URL
+    API_AUTH = FellowAiden.API_AUTH
+    API_REFRESH = FellowAiden.API_REFRESH
+    API_DEVICES = FellowAiden.API_DEVICES
+    API_DEVICE = FellowAiden.API_DEVICE
+    API_SCHEDULES = FellowAiden.API_SCHEDULES
+    API_SCHEDULE = FellowAiden.API_SCHEDULE
+    API_PROFILES = FellowAiden.API_PROFILES
+    API_PROFILE = FellowAiden.API_PROFILE
+    API_PROFILE_SHARE = FellowAiden.API_PROFILE_SHARE
+    API_SHARED_PROFILE = FellowAiden.API_SHARED_PROFILE
+    HEADERS = FellowAiden.HEADERS
+    JSON_HEADERS = dict(HEADERS, **{'Content-Type': 'application/json'})
+    SERVER_SIDE_PROFILE_FIELDS = FellowAiden.SERVER_SIDE_PROFILE_FIELDS
+    TOKEN_REFRESH_MARGIN = FellowAiden.TOKEN_REFRESH_MARGIN
+    MAX_CONNECTIONS = 20
+    MAX_KEEPALIVE_CONNECTIONS = 10
+    RETRIES = 3
+    RETRY_STATUSES = [408, 500, 501, 502, 503, 504]
+    RETRY_METHODS = FellowAiden.RETRY_METHODS
+    RETRY_BACKOFF = 0.5
+
+    def __init__(self, email, password, client=None,
+                 max_connections=None, max_keepalive_connections=None,
+                 timeout=None, deadline=None, rate_limiter=None, brewer_id=None,
+                 link_cache=None):
+        """Set up the client; nothing is sent until the first call.
+
+        :param client: Optional ``httpx.AsyncClient`` to share between
+                    instances. When omitted, the instance owns a client
+                    bounded to ``max_connections`` connections.
+        :param timeout: Seconds to wait per request, as ``(connect, read)``
+                    or one number for both. Defaults to FellowAiden.TIMEOUT.
+        :param deadline: Overall seconds allowed for one request, covering
+                    retries and re-authentication.
+        :param rate_limiter: :class:`RateLimiter` pacing requests; defaults
+                    to the one shared by every client of the account, and
+                    False disables it.
+        :param brewer_id: Brewer to control on an account with several;
+                    defaults to the first one listed.
+        :param link_cache: :class:`SharedProfileCache` for shared brew
+                    links; defaults to the process-wide one, False disables it.
+        """
+        if httpx is None:
+            raise ImportError("AsyncFellowAiden requires httpx. Install it with: pip install fellow-aiden[async]")
+        self._log = FellowAiden._logger(self)
+        self._auth = False
+        self._token = None
+        self._refresh = None
+        self._token_expiry = None
+        self._email = email
+        self._password = password
+        self._devices = None
+        self._device_config = None
+        self._selected_brewer = brewer_id
+        self._brewer_id = None
+        self._profiles = None
+        self._schedules = None
+        self._timeout = self.__httpx_timeout(timeout or FellowAiden.TIMEOUT)
+        self._deadline = deadline
+        # (timeout, deadline_at) set by request_options for the running task
+        self._options = contextvars.ContextVar('%s-options' % self.NAME, default=(None, None))
+        if link_cache is None:
+            link_cache = SharedProfileCache.default()
+        self._link_cache = None if link_cache is False else link_cache
+        if rate_limiter is None:
+            rate_limiter = RateLimiter.shared(email)
+        self._limiter = rate_limiter or None
+        self._auth_lock = asyncio.Lock()
+        self._device_lock = asyncio.Lock()
+        # Concurrent cache misses wait on the coroutine already fetching
+        self._profiles_lock = asyncio.Lock()
+        self._schedules_lock = asyncio.Lock()
+        self._owns_client = client is None
+        if client is None:
+            limits = httpx.Limits(
+                max_connections=max_connections or self.MAX_CONNECTIONS,
+                max_keepalive_connections=max_keepalive_connections or self.MAX_KEEPALIVE_CONNECTIONS,
+            )
+            transport = httpx.AsyncHTTPTransport(retries=self.RETRIES, limits=limits)
+            client = httpx.AsyncClient(transport=transport)
+        self._client = client
+
+    async def __aenter__(self):
+        await self.authenticate()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the underlying HTTP client if this instance owns it."""
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def __login(self):
+        self._log.debug("Authenticating user")
+        auth = {"email": self._email, "password": self._password}
+        login_url = self.BASE_URL + self.API_AUTH
+        response = await self._client.post(login_url, content=codec.dumpb(auth), headers=self.JSON_HEADERS)
+        parsed = codec.loads(response.content)
+        self._log.debug(parsed)
+        if 'accessToken' not in parsed:
+            raise Exception("Email or password incorrect.")
+        self._log.debug("Authentication successful")
+        self.__set_tokens(parsed)
+
+    def __set_tokens(self, parsed):
+        self._token = parsed['accessToken']
+        self._refresh = parsed.get('refreshToken', self._refresh)
+        self._token_expiry = token_expiry(self._token)
+        self._auth = True
+
+    async def __refresh_token(self):
+        """Trade the refresh token for a new access token.
+
+        :returns: True when the access token was renewed.
+        """
+        if not self._refresh:
+            return False
+        self._log.debug("Refreshing access token")
+        refresh_url = self.BASE_URL + self.API_REFRESH
+        try:
+            response = await self._client.post(refresh_url, content=codec.dumpb({'refreshToken': self._refresh}),
+                                              headers=self.JSON_HEADERS)
+            parsed = codec.loads(response.content)
+        except (httpx.HTTPError, ValueError) as err:
+            self._log.warning("Token refresh failed: %s" % err)
+            return False
+        if response.status_code != 200 or 'accessToken' not in parsed:
+            self._log.warning("Token refresh rejected: %s" % parsed)
+            return False
+        self.__set_tokens(parsed)
+        self._log.debug("Access token refreshed")
+        return True
+
+    async def __renew(self):
+        if not await self.__refresh_token():
+            await self.__login()
+
+    async def __ensure_auth(self):
+        """Log in and discover the device on first use."""
+        if not self._auth:
+            async with self._auth_lock:
+                if not self._auth:
+                    await self.__login()
+        if self._brewer_id is None:
+            async with self._device_lock:
+                if self._brewer_id is None:
+                    await self.__device()
+
+    async def __reauth(self, token):
+        """Re-authenticate once, unless another task already did."""
+        async with self._auth_lock:
+            if self._token == token:
+                self._log.warning("Unauthorized response received. Attempting to reauthenticate...")
+                await self.__renew()
+
+    async def __ensure_token(self):
+        """Renew the access token just before it lapses."""
+        expiry = self._token_expiry
+        if expiry is None or expiry - time.time() > self.TOKEN_REFRESH_MARGIN:
+            return
+        async with self._auth_lock:
+            if self._token_expiry == expiry:
+                await self.__renew()
+
+    @staticmethod
+    def __httpx_timeout(timeout):
+        if not isinstance(timeout, tuple):
+            timeout = (timeout, timeout)
+        return httpx.Timeout(timeout[1], connect=timeout[0])
+
+    @contextmanager
+    def request_options(self, timeout=None, deadline=None):
+        """Override timeouts for calls made inside the ``with`` block.
+
+        Applies to the current task and the tasks it starts. The deadline
+        covers every request a call makes, including retries and
+        re-authentication::
+
+            with aiden.request_options(timeout=(2, 5), deadline=10):
+                await aiden.create_profile(profile)
+
+        :param timeout: ``(connect, read)`` seconds, or one number for both.
+        :param deadline: Overall seconds for the block.
+        """
+        previous_timeout, previous_deadline = self._options.get()
+        deadline_at = previous_deadline
+        if deadline is not None:
+            deadline_at = time.monotonic() + deadline
+            if previous_deadline is not None:
+                deadline_at = min(deadline_at, previous_deadline)
+        token = self._options.set((timeout or previous_timeout, deadline_at))
+        try:
+            yield self
+        finally:
+            self._options.reset(token)
+
+    async def __request(self, method, url, **kwargs):
+        """Send a request within the deadlines that apply to it, if any."""
+        if 'json' in kwargs:
+            kwargs['content'] = codec.dumpb(kwargs.pop('json'))
+        timeout, deadline_at = self._options.get()
+        kwargs['timeout'] = self._timeout if timeout is None else self.__httpx_timeout(timeout)
+        remaining = self._deadline
+        if deadline_at is not None:
+            left = deadline_at - time.monotonic()
+            remaining = left if remaining is None else min(remaining, left)
+        if remaining is None:
+            return await self.__send(method, url, **kwargs)
+        if remaining <= 0:
+            raise DeadlineExceeded("Deadline exceeded before %s %s was sent" % (method, url))
+        try:
+            return await asyncio.wait_for(self.__send(method, url, **kwargs), remaining)
+        except asyncio.TimeoutError as err:
+            raise DeadlineExceeded("%s %s exceeded its deadline" % (method, url)) from err
+
+    async def __send(self, method, url, **kwargs):
+        """Send a request, retrying transient statuses and 401s once."""
+        attempt = 0
+        reauthed = False
+        while True:
+            await self.__ensure_token()
+            token = self._token
+            headers = dict(self.HEADERS)
+            headers['Authorization'] = 'Bearer %s' % token
+            if 'content' in kwargs:
+                headers['Content-Type'] = 'application/json'
+            if self._limiter is not None:
+                await asyncio.sleep(self._limiter.reserve())
+            response = await self._client.request(method, url, headers=headers, **kwargs)
+            status_code = response.status_code
+            retry_after = None
+            if status_code == 429 or status_code in self.RETRY_STATUSES:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if self._limiter is not None:
+                self._limiter.feedback(status_code, retry_after)
+            if status_code == 401 and not reauthed:
+                reauthed = True
+                await self.__reauth(token)
+                continue
+            if ((status_code == 429 or (status_code in self.RETRY_STATUSES
+                                        and method in self.RETRY_METHODS))
+                    and attempt < self.RETRIES):
+                await asyncio.sleep(max(self.RETRY_BACKOFF * (2 ** attempt), retry_after or 0))
+                attempt += 1
+                continue
+            return response
+
+    async def __device(self):
+        self._log.debug("Fetching device for account")
+        device_url = self.BASE_URL + self.API_DEVICES
+        response = await self.__request('GET', device_url, params={'dataType': 'real'})
+        parsed = codec.loads(response.content)
+        self._log.debug(parsed)
+        devices = {device['id']: device for device in parsed}
+        if self._selected_brewer is not None and self._selected_brewer not in devices:
+            raise Exception("Brewer %s is not on this account. Valid brewers: %s"
+                            % (self._selected_brewer, list(devices)))
+        if not parsed:
+            raise Exception("No brewers found on this account.")
+        self._devices = parsed
+        self._device_config = devices.get(self._selected_brewer, parsed[0])
+        self._brewer_id = self._device_config['id']
+
+        self._profiles = None
+        self._schedules = None
+
+        self._log.debug("Brewer ID: %s" % self._brewer_id)
+        self._log.info("Device and profile information set")
+
+    async def __fetch_profiles(self):
+        await self.__ensure_auth()
+        if self._profiles is not None:
+            return self._profiles
+        async with self._profiles_lock:
+            if self._profiles is None:
+                self._log.debug("Fetching profiles")
+                profiles_url = self.BASE_URL + self.API_PROFILES.format(id=self._brewer_id)
+                response = await self.__request('GET', profiles_url)
+                parsed = codec.loads(response.content)
+                self._log.debug(parsed)
+                self._profiles = parsed
+            return self._profiles
+
+    async def __fetch_schedules(self):
+        await self.__ensure_auth()
+        if self._schedules is not None:
+            return self._schedules
+        async with self._schedules_lock:
+            if self._schedules is None:
+                self._log.debug("Fetching schedules")
+                schedules_url = self.BASE_URL + self.API_SCHEDULES.format(id=self._brewer_id)
+                response = await self.__request('GET', schedules_url)
+                parsed = codec.loads(response.content)
+                self._log.debug(parsed)
+                self._schedules = parsed
+            return self._schedules
+
+    @property
+    def profiles(self):
+        """Awaitable list of profiles, fetched on first use."""
+        return self.__fetch_profiles()
+
+    @property
+    def schedules(self):
+        """Awaitable list of schedules, fetched on first use."""
+        return self.__fetch_schedules()
+
+    # As in FellowAiden, cached lists and items are replaced, never changed
+    # in place, so a caller holding a list never sees it change.
+
+    def __cache_profile(self, profile):
+        """Add a profile returned by the server to the cached list."""
+        if self._profiles is None:
+            return
+        if any(p['id'] == profile['id'] for p in self._profiles):
+            self._profiles = None
+            return
+        self._profiles = self._profiles + [profile]
+
+    def __patch_cached_profile(self, pid, data):
+        """Apply the fields sent in a PATCH to the cached profile."""
+        if not any(p['id'] == pid for p in self._profiles or []):
+            self._profiles = None
+            return
+        self._profiles = [dict(p, **data) if p['id'] == pid else p for p in self._profiles]
+
+    def __uncache_profile(self, pid):
+        if self._profiles is not None:
+            self._profiles = [p for p in self._profiles if p['id'] != pid]
+
+    def __cache_schedule(self, schedule):
+        """Add a schedule returned by the server to the cached list."""
+        if self._schedules is None:
+            return
+        if any(s['id'] == schedule['id'] for s in self._schedules):
+            self._schedules = None
+            return
+        self._schedules = self._schedules + [schedule]
+
+    def __patch_cached_schedule(self, sid, data):
+        """Apply the fields sent in a PATCH to the cached schedule."""
+        if not any(s['id'] == sid for s in self._schedules or []):
+            self._schedules = None
+            return
+        self._schedules = [dict(s, **data) if s['id'] == sid else s for s in self._schedules]
+
+    def __uncache_schedule(self, sid):
+        if self._schedules is not None:
+            self._schedules = [s for s in self._schedules if s['id'] != sid]
+
+    async def refresh(self):
+        """Drop cached state and refetch the device from Fellow's API."""
+        await self.__ensure_auth()
+        await self.__device()
+
+    async def get_devices(self):
+        """Return the config of every brewer on the account."""
+        await self.__ensure_auth()
+        return list(self._devices)
+
+    async def get_state(self):
+        """Return device config, profiles and schedules as one snapshot.
+
+        Profiles and schedules are fetched concurrently once the device is
+        known.
+
+        :returns: :class:`BrewerState`
+        """
+        await self.__ensure_auth()
+        profiles, schedules = await asyncio.gather(self.__fetch_profiles(), self.__fetch_schedules())
+        return BrewerState(
+            device_config=self._device_config,
+            profiles=tuple(profiles),
+            schedules=tuple(schedules),
+            fetched_at=time.time(),
+        )
+
+    async def refresh_all(self):
+        """Refetch the device, then its profiles and schedules concurrently."""
+        await self.refresh()
+        return await self.get_state()
+
+    async def __get_profile_ids(self):
+        """Return a list of profile IDs."""
+        return ["%s (%s)" % (profile['id'], profile['title']) for profile in await self.profiles]
+
+    async def __is_valid_profile_id(self, pid):
+        """Check if a profile ID is valid."""
+        return any(pid == profile['id'] for profile in await self.profiles)
+
+    async def __get_schedule_ids(self):
+        """Return a list of schedule IDs."""
+        return ["%s" % (schedule['id']) for schedule in await self.schedules]
+
+    async def __is_valid_schedule_id(self, sid):
+        """Check if a schedule ID is valid."""
+        return any(sid == schedule['id'] for schedule in await self.schedules)
+
+    async def parse_brewlink_url(self, link):
+        """Extract profile information from a shared brew link."""
+        self._log.debug("Parsing shared brew link")
+        brew_id = FellowAiden.brew_id_from_link(link)
+        self._log.debug("Brew ID: %s" % brew_id)
+        if self._link_cache is not None:
+            cached = self._link_cache.get(brew_id)
+            if cached is not None:
+                return cached
+        await self.__ensure_auth()
+        shared_url = self.BASE_URL + self.API_SHARED_PROFILE.format(bid=brew_id)
+        response = await self.__request('GET', shared_url)
+        if response.status_code != 200:
+            raise ValueError(f"Failed to fetch profile (ID: {brew_id})")
+        parsed = codec.loads(response.content)
+        for field in self.SERVER_SIDE_PROFILE_FIELDS:
+            parsed.pop(field, None)
+        self._log.debug("Profile fetched: %s" % parsed)
+        if self._link_cache is not None:
+            self._link_cache.put(brew_id, parsed)
+        return parsed
+
+    async def get_device_config(self, remote=False):
+        """Return the current device config.
+
+        :param remote: If True, force a new request to Fellow's API
+                    to refresh the device config. Otherwise,
+                    returns the cached config.
+        """
+        await self.__ensure_auth()
+        if remote:
+            await self.__device()
+        return self._device_config
+
+    def get_display_name(self):
+        return self._device_config.get('displayName', None)
+
+    async def get_profiles(self):
+        return await self.profiles
+
+    async def get_schedules(self):
+        return await self.schedules
+
+    async def get_profile_by_title(self, title, fuzzy=False):
+        profiles = await self.profiles
+        for profile in profiles:
+            if normalize_title(profile['title']) == normalize_title(title):
+                return profile
+        if fuzzy:
+            return TitleIndex(profiles).best(title)
+        return None
+
+    def get_brewer_id(self):
+        return self._brewer_id
+
+    async def create_profile(self, data):
+        self._log.debug("Checking brew profile: %s" % data)
+        try:
+            CoffeeProfile.model_validate(data)
+        except ValidationError as err:
+            self._log.error("Brew profile format was invalid: %s" % err)
+            return False
+
+        if 'id' in data.keys():
+            raise Exception("Candidate profiles must be free of server derived fields.")
+
+        self._log.debug("Brew profile passed checks")
+        await self.__ensure_auth()
+        profile_url = self.BASE_URL + self.API_PROFILES.format(id=self._brewer_id)
+        response = await self.__request('POST', profile_url, json=data)
+        parsed = codec.loads(response.content)
+        if 'id' not in parsed:
+            raise Exception("Error in processing: %s" % parsed)
+        self.__cache_profile(parsed)
+        self._log.debug("Brew profile created: %s" % parsed)
+        return parsed
+
+    async def update_profile(self, profile_id, data):
+        """Update an existing profile by ID, sending only changed fields."""
+        self._log.debug(f"Updating brew profile {profile_id}: {data}")
+
+        try:
+            CoffeeProfile.model_validate(data)
+        except ValidationError as err:
+            self._log.error("Brew profile format was invalid: %s" % err)
+            return False
+
+        if not await self.__is_valid_profile_id(profile_id):
+            message = f"Profile with ID {profile_id} does not exist. Valid profiles: {await self.__get_profile_ids()}"
+            raise Exception(message)
+
+        for field in self.SERVER_SIDE_PROFILE_FIELDS:
+            if field in data:
+                data.pop(field, None)
+
+        current = next(p for p in await self.profiles if p['id'] == profile_id)
+        changes = {k: v for k, v in data.items() if k not in current or current[k] != v}
+        if not changes:
+            self._log.debug(f"Profile {profile_id} unchanged, nothing to send")
+            return True
+
+        update_url = self.BASE_URL + self.API_PROFILE.format(id=self._brewer_id, pid=profile_id)
+        self._log.debug(f"Update URL: {update_url}")
+        response = await self.__request('PATCH', update_url, json=changes)
+        if response.status_code >= 400:
+            parsed = codec.loads(response.content)
+            raise Exception(f"Error updating profile: {parsed}")
+
+        self.__patch_cached_profile(profile_id, changes)
+        self._log.info(f"Profile {profile_id} updated successfully")
+        return True
+
+    async def create_schedule(self, data):
+        self._log.debug("Checking schedule: %s" % data)
+        try:
+            CoffeeSchedule.model_validate(data)
+        except ValidationError as err:
+            self._log.error("Brew schedule format was invalid: %s" % err)
+            return False
+
+        if 'id' in data.keys():
+            raise Exception("Candidate schedules must be free of server derived fields.")
+
+        self._log.debug("Brew schedule passed checks")
+        await self.__ensure_auth()
+        schedule_url = self.BASE_URL + self.API_SCHEDULES.format(id=self._brewer_id)
+        response = await self.__request('POST', schedule_url, json=data)
+        parsed = codec.loads(response.content)
+        if 'id' not in parsed:
+            message = parsed.get('message', 'Unable to get error message.')
+            if 'Profile could not be found' in message:
+                message += "Valid profiles: %s" % await self.__get_profile_ids()
+            raise Exception("Error in processing: %s" % message)
+        self.__cache_schedule(parsed)
+        self._log.debug("Brew schedule created: %s" % parsed)
+        return parsed
+
+    async def create_profile_from_link(self, link):
+        """Create a profile from a shared brew link."""
+        self._log.debug("Creating profile from link")
+        data = await self.parse_brewlink_url(link)
+        return await self.create_profile(data)
+
+    async def generate_share_link(self, pid):
+        """Generate a share link for a profile."""
+        self._log.debug("Generating share link")
+        await self.__ensure_auth()
+        share_url = self.BASE_URL + self.API_PROFILE_SHARE.format(id=self._brewer_id, pid=pid)
+        self._log.debug("Share URL: %s" % share_url)
+        response = await self.__request('POST', share_url)
+        parsed = codec.loads(response.content)
+        if 'link' not in parsed:
+            raise Exception("Error in processing: %s" % parsed)
+        self._log.debug("Share link generated: %s" % parsed)
+        return parsed['link']
+
+    async def delete_profile_by_id(self, pid):
+        self._log.debug("Deleting profile")
+        await self.__ensure_auth()
+        delete_url = self.BASE_URL + self.API_PROFILE.format(id=self._brewer_id, pid=pid)
+        self._log.debug(delete_url)
+        response = await self.__request('DELETE', delete_url)
+        if response.is_success:
+            self.__uncache_profile(pid)
+        self._log.info("Profile deleted")
+        return True
+
+    async def delete_schedule_by_id(self, sid):
+        self._log.debug("Deleting schedule")
+        if not await self.__is_valid_schedule_id(sid):
+            message = "Schedule does not exist. Valid schedules: %s" % (await self.__get_schedule_ids())
+            raise Exception(message)
+        delete_url = self.BASE_URL + self.API_SCHEDULE.format(id=self._brewer_id, sid=sid)
+        self._log.debug(delete_url)
+        response = await self.__request('DELETE', delete_url)
+        if response.is_success:
+            self.__uncache_schedule(sid)
+        self._log.info("Schedule deleted")
+        return True
+
+    async def adjust_setting(self, setting, value):
+        await self.__ensure_auth()
+        patch_url = self.BASE_URL + self.API_DEVICE.format(id=self._brewer_id)
+        self._log.debug("Patch URL: %s" % patch_url)
+        data = codec.dumpb({setting: value})
+        response = await self.__request('PATCH', patch_url, content=data)
+        if response.is_success:
+            parsed = codec.loads(response.content) if response.content else None
+            self.__store_settings(parsed, {setting: value})
+        return response.content
+
+    async def adjust_settings(self, settings):
+        """Change several device settings with one request.
+
+        :param settings: Dict of setting name to new value; keys must be
+                    present in the device config.
+        :returns: The updated device config.
+        """
+        await self.__ensure_auth()
+        unknown = [key for key in settings if key not in self._device_config]
+        if unknown:
+            raise Exception("Unknown device settings %s. Valid settings: %s"
+                            % (unknown, sorted(self._device_config)))
+        changes = {key: value for key, value in settings.items() if self._device_config.get(key) != value}
+        if not changes:
+            return self._device_config
+        patch_url = self.BASE_URL + self.API_DEVICE.format(id=self._brewer_id)
+        response = await self.__request('PATCH', patch_url, content=codec.dumpb(changes))
+        parsed = codec.loads(response.content) if response.content else None
+        if response.status_code >= 400:
+            raise Exception("Error adjusting settings: %s" % parsed)
+        return self.__store_settings(parsed, changes)
+
+    def __store_settings(self, parsed, changes):
+        """Bring the cached device config in line with settings just sent."""
+        if isinstance(parsed, dict) and parsed.get('id') == self._brewer_id:
+            self._device_config = parsed
+        elif self._device_config is not None:
+            self._device_config = dict(self._device_config, **changes)
+        return self._device_config
+
+    async def toggle_schedule(self, sid, enabled):
+        if not await self.__is_valid_schedule_id(sid):
+            message = "Schedule does not exist. Valid schedules: %s" % (await self.__get_schedule_ids())
+            raise Exception(message)
+        patch_url = self.BASE_URL + self.API_SCHEDULE.format(id=self._brewer_id, sid=sid)
+        self._log.debug("Patch URL: %s" % patch_url)
+        data = codec.dumpb({'enabled': enabled})
+        response = await self.__request('PATCH', patch_url, content=data)
+        if response.is_success:
+            self.__patch_cached_schedule(sid, {'enabled': enabled})
+        return response.content
+
+    async def authenticate(self):
+        """Public coroutine to (re)authenticate the user."""
+        self._log.debug("Reauthenticating user via public method")
+        async with self._auth_lock:
+            await self.__login()
+        await self.__device()
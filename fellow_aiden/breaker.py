@@ -0,0 +1,118 @@
+"""Circuit breaker that stops requests to an API that is down."""
+import logging
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+
+
+class CircuitBreaker:
+
+    """Trip after repeated failures and probe for recovery in the background.
+
+    While closed, requests flow and consecutive failures (connection
+    errors, timeouts, 5xx responses) are counted. Reaching the threshold
+    opens the circuit: requests are refused immediately and a background
+    thread calls ``probe`` every ``reset_timeout`` seconds until it
+    succeeds, which closes the circuit again.
+
+    Breakers returned by :meth:`for_url` are shared by every client talking
+    to the same base URL in the process.
+    """
+
+    FAILURE_THRESHOLD = 5
+    RESET_TIMEOUT = 30
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, failure_threshold=None, reset_timeout=None):
+        """Create a closed breaker.
+
+        :param failure_threshold: Consecutive failures that open the circuit.
+        :param reset_timeout: Seconds between recovery probes while open.
+        """
+        self._threshold = failure_threshold or self.FAILURE_THRESHOLD
+        self._reset_timeout = reset_timeout or self.RESET_TIMEOUT
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probe = None
+        self._probing = False
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._closed.set()
+        self._log = logging.getLogger('FELLOW-AIDEN')
+
+    @classmethod
+    def for_url(cls, url):
+        """Return the process-wide breaker for a base URL, creating it once."""
+        with cls._shared_lock:
+            breaker = cls._shared.get(url)
+            if breaker is None:
+                breaker = cls._shared[url] = cls()
+            return breaker
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def opened_at(self):
+        """``time.time()`` when the circuit last opened, or None while closed."""
+        return self._opened_at
+
+    def allow(self):
+        """Return True if a request may be sent."""
+        return self._state == CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self, probe=None):
+        """Count a failure, opening the circuit at the threshold.
+
+        :param probe: Callable returning True once the API answers again;
+                    run in the background while the circuit is open.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._state == OPEN or self._failures < self._threshold:
+                return
+            self._state = OPEN
+            self._opened_at = time.time()
+            self._closed.clear()
+            self._probe = probe or self._probe
+            start = probe is not None and not self._probing
+            self._probing = self._probing or start
+        self._log.warning("Circuit opened after %d consecutive failures" % self._failures)
+        if start:
+            threading.Thread(target=self.__probe_until_closed, name='FELLOW-AIDEN-probe', daemon=True).start()
+
+    def close(self):
+        """Close the circuit, letting requests through again."""
+        with self._lock:
+            if self._state == OPEN:
+                self._log.info("Circuit closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._closed.set()
+
+    def __probe_until_closed(self):
+        while True:
+            # The wait ends early if close() is called from elsewhere
+            if not self._closed.wait(self._reset_timeout):
+                try:
+                    recovered = self._probe()
+                except Exception as err:
+                    self._log.debug("Recovery probe failed: %s" % err)
+                    recovered = False
+                if recovered:
+                    self.close()
+            with self._lock:
+                if self._state == CLOSED:
+                    self._probing = False
+                    return
@@ -0,0 +1,34 @@
+"""Helpers for writing many profiles at once."""
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from fellow_aiden.profile import CoffeeProfile
+
+CREATED = 'created'
+UPDATED = 'updated'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+
+
+def profile_content(profile):
+    """Return the user-editable fields of a profile.
+
+    Two profiles with equal content brew the same way, whatever their IDs,
+    timestamps or other server-side fields.
+    """
+    return {field: profile.get(field) for field in CoffeeProfile.model_fields}
+
+
+@dataclass(frozen=True)
+class ProfileResult:
+
+    """Outcome of writing one profile in a bulk call."""
+
+    title: str
+    action: str
+    profile: Optional[Dict[str, Any]] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self):
+        return self.action != FAILED
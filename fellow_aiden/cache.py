@@ -0,0 +1,141 @@
+"""TTL bookkeeping and conditional-request validators for cached resources."""
+import hashlib
+import time
+
+
+FRESH = 'fresh'
+STALE = 'stale'
+EXPIRED = 'expired'
+
+
+class CacheEntry:
+
+    """Validators and timestamp for one cached resource."""
+
+    __slots__ = ('etag', 'last_modified', 'digest', 'fetched_at')
+
+    def __init__(self, etag=None, last_modified=None, digest=None, fetched_at=None):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+
+class ResourceCache:
+
+    """Track freshness of cached API resources.
+
+    Values stay on the client; this only records when each resource was
+    fetched and the validators needed to revalidate it cheaply. A resource
+    is fresh for its TTL, then stale (served while a background refresh
+    runs) for ``stale_while_revalidate`` seconds, then expired.
+    """
+
+    RESOURCES = ('device', 'profiles', 'schedules')
+
+    def __init__(self, ttl=None, stale_while_revalidate=0):
+        """Create a cache with nothing fetched yet.
+
+        :param ttl: Seconds a resource stays fresh, either one number for
+                    every resource or a dict keyed by resource name
+                    (``device``, ``profiles``, ``schedules``). None keeps
+                    a resource until it is refreshed explicitly.
+        :param stale_while_revalidate: Seconds past the TTL during which
+                    the cached value is still served while it is refreshed
+                    in the background.
+        """
+        if isinstance(ttl, dict):
+            self._ttls = dict(ttl)
+        else:
+            self._ttls = {name: ttl for name in self.RESOURCES}
+        self._swr = stale_while_revalidate
+        self._entries = {}
+
+    def entry(self, name):
+        return self._entries.get(name)
+
+    def state(self, name):
+        """Return FRESH, STALE or EXPIRED for a cached resource."""
+        entry = self._entries.get(name)
+        ttl = self._ttls.get(name)
+        if entry is None or ttl is None:
+            return FRESH
+        age = entry.age()
+        if age < ttl:
+            return FRESH
+        if age < ttl + self._swr:
+            return STALE
+        return EXPIRED
+
+    def conditional_headers(self, name):
+        """Return If-None-Match / If-Modified-Since headers for a resource."""
+        entry = self._entries.get(name)
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def is_unchanged(self, name, response):
+        """Check whether a response repeats the cached representation.
+
+        Uses a 304 when the API honors the validators and falls back to
+        comparing a digest of the body when it does not. Either way the
+        entry's timestamp is renewed.
+        """
+        entry = self._entries.get(name)
+        if entry is None:
+            return False
+        if response.status_code == 304:
+            entry.fetched_at = time.time()
+            return True
+        if entry.digest is not None and entry.digest == self.digest(response.content):
+            entry.fetched_at = time.time()
+            return True
+        return False
+
+    def store(self, name, response):
+        """Record validators from a fresh 200 response."""
+        self._entries[name] = CacheEntry(
+            etag=response.headers.get('ETag'),
+            last_modified=response.headers.get('Last-Modified'),
+            digest=self.digest(response.content),
+        )
+
+    def mark_modified(self, name):
+        """Forget validators after the cached value was changed locally.
+
+        The timestamp is kept, so the resource stays fresh, but the next
+        fetch downloads the full body instead of trusting an old ETag.
+        """
+        entry = self._entries.get(name)
+        if entry is not None:
+            entry.etag = entry.last_modified = entry.digest = None
+
+    def invalidate(self, name=None):
+        """Drop one resource's entry, or every entry when name is None."""
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def snapshot(self):
+        """Return the entries as plain dicts, for persisting."""
+        return {
+            name: {slot: getattr(entry, slot) for slot in CacheEntry.__slots__}
+            for name, entry in self._entries.items()
+        }
+
+    def restore(self, snapshot):
+        """Load entries produced by :meth:`snapshot`."""
+        for name, fields in snapshot.items():
+            self._entries[name] = CacheEntry(**fields)
+
+    @staticmethod
+    def digest(content):
+        return hashlib.sha1(content).hexdigest()
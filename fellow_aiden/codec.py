@@ -0,0 +1,131 @@
+"""JSON encoding and decoding through the fastest library installed.
+
+orjson is used when it is installed, then msgspec, then the standard
+library. Every backend decodes the ``bytes`` of a response body as they
+are, without decoding them to ``str`` first, and encodes straight to the
+``bytes`` sent as a request body::
+
+    from fellow_aiden import codec
+    profiles = codec.loads(response.content)
+    body = codec.dumpb({'enabled': True})
+
+Decoding errors are always raised as ``ValueError``, whichever backend
+is in use.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class _Stdlib:
+
+    name = 'json'
+
+    @staticmethod
+    def loads(data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    @staticmethod
+    def dumpb(obj, indent=None):
+        separators = None if indent else (',', ':')
+        return json.dumps(obj, indent=indent, separators=separators, ensure_ascii=False).encode('utf-8')
+
+
+class _Orjson:
+
+    name = 'orjson'
+
+    @staticmethod
+    def loads(data):
+        return orjson.loads(data)
+
+    @staticmethod
+    def dumpb(obj, indent=None):
+        # orjson only indents by two spaces
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+
+
+class _Msgspec:
+
+    name = 'msgspec'
+
+    def __init__(self):
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, data):
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as err:
+            raise ValueError(str(err)) from err
+
+    def dumpb(self, obj, indent=None):
+        encoded = self._encoder.encode(obj)
+        if indent:
+            encoded = msgspec.json.format(encoded, indent=indent)
+        return encoded
+
+
+def available():
+    """Return the names of the installed backends, fastest first."""
+    names = []
+    if orjson is not None:
+        names.append(_Orjson.name)
+    if msgspec is not None:
+        names.append(_Msgspec.name)
+    names.append(_Stdlib.name)
+    return names
+
+
+def _make(name):
+    if name not in available():
+        raise Exception("JSON backend %s is not installed. Available backends: %s" % (name, available()))
+    return {_Orjson.name: _Orjson, _Msgspec.name: _Msgspec, _Stdlib.name: _Stdlib}[name]()
+
+
+_backend = _make(available()[0])
+
+
+def use(name):
+    """Switch every caller to another backend, e.g. ``'json'`` to compare.
+
+    :param name: One of :func:`available`.
+    """
+    global _backend
+    _backend = _make(name)
+
+
+def backend():
+    """Return the name of the backend in use."""
+    return _backend.name
+
+
+def loads(data):
+    """Decode JSON from ``bytes``, ``bytearray``, ``memoryview`` or ``str``."""
+    return _backend.loads(data)
+
+
+def dumpb(obj, indent=None):
+    """Encode to UTF-8 JSON ``bytes``.
+
+    :param indent: Pretty-print with this indent; orjson always uses 2.
+    """
+    return _backend.dumpb(obj, indent)
+
+
+def dumps(obj, indent=None):
+    """Encode to a JSON ``str``, for APIs that need text."""
+    return _backend.dumpb(obj, indent).decode('utf-8')
@@ -0,0 +1,21 @@
+"""Exceptions raised by the Fellow Aiden clients."""
+
+
+class FellowAidenError(Exception):
+    """Base class for errors raised by this library."""
+
+
+class DeadlineExceeded(FellowAidenError, TimeoutError):
+    """A call ran out of time, including its retries and re-authentication."""
+
+
+class CircuitOpenError(FellowAidenError, ConnectionError):
+    """Fellow's API is considered down, so the request was not sent."""
+
+
+class OutboxConflict(FellowAidenError):
+    """A queued write was rejected on replay; it and later writes stay queued."""
+
+    def __init__(self, operation, error):
+        super().__init__("Queued %s of %s was rejected: %s" % (operation.kind, operation.target, error))
+        self.operation = operation
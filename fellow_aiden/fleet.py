@@ -0,0 +1,173 @@
+"""Run operations across many Aiden brewers and accounts at once."""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from fellow_aiden import FellowAiden, reconcile
+
+
+@dataclass(frozen=True)
+class DeviceResult:
+
+    """Outcome of one fleet operation on one brewer."""
+
+    brewer_id: str
+    value: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class FellowFleet:
+
+    """Manage brewers across one or more Fellow accounts.
+
+    Every brewer gets its own :class:`FellowAiden` client; clients of the
+    same account share tokens at start, a connection pool and a rate
+    limiter. Operations fan out over a bounded worker pool and return a
+    :class:`DeviceResult` per brewer, so one failing brewer never hides the
+    results of the others::
+
+        with FellowFleet(max_workers=8) as fleet:
+            fleet.add_account(EMAIL, PASSWORD)
+            results = fleet.create_profile(profile)
+            failed = {bid: r.error for bid, r in results.items() if not r.ok}
+    """
+
+    MAX_WORKERS = 8
+
+    def __init__(self, max_workers=None, adapter=None):
+        """Create an empty fleet.
+
+        :param max_workers: Operations run concurrently across the fleet.
+        :param adapter: ``HTTPAdapter`` shared by every client the fleet
+                    creates. Defaults to one sized for ``max_workers``.
+        """
+        self._max_workers = max_workers or self.MAX_WORKERS
+        if adapter is None:
+            adapter = FellowAiden.build_adapter(pool_maxsize=self._max_workers)
+        self._adapter = adapter
+        self._pool = ThreadPoolExecutor(max_workers=self._max_workers,
+                                        thread_name_prefix='%s-fleet' % FellowAiden.NAME)
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._log = logging.getLogger(FellowAiden.NAME)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Wait for running operations and stop the worker pool."""
+        self._pool.shutdown(wait=True)
+
+    @property
+    def brewer_ids(self):
+        with self._lock:
+            return list(self._clients)
+
+    def client(self, brewer_id):
+        """Return the client controlling a brewer."""
+        with self._lock:
+            if brewer_id not in self._clients:
+                raise Exception("Brewer %s is not in the fleet. Valid brewers: %s"
+                                % (brewer_id, list(self._clients)))
+            return self._clients[brewer_id]
+
+    def add_client(self, client):
+        """Add every brewer on a client's account.
+
+        :returns: IDs of the brewers added.
+        """
+        clients = {client.get_brewer_id(): client}
+        for device in client.get_devices():
+            if device['id'] not in clients:
+                clients[device['id']] = client.for_device(device['id'])
+        with self._lock:
+            self._clients.update(clients)
+        return list(clients)
+
+    def add_account(self, email, password, **kwargs):
+        """Log in to an account and add all of its brewers.
+
+        :param kwargs: Passed to :class:`FellowAiden`.
+        :returns: IDs of the brewers added.
+        """
+        kwargs.setdefault('adapter', self._adapter)
+        return self.add_client(FellowAiden(email, password, **kwargs))
+
+    def remove(self, brewer_id):
+        with self._lock:
+            self._clients.pop(brewer_id, None)
+
+    def run(self, operation, brewer_ids=None):
+        """Call ``operation(client)`` for each brewer concurrently.
+
+        :param operation: Callable taking a :class:`FellowAiden`.
+        :param brewer_ids: Brewers to run on; defaults to the whole fleet.
+        :returns: Dict of brewer ID to :class:`DeviceResult`, in the order
+                  the brewers were given.
+        """
+        if brewer_ids is None:
+            brewer_ids = self.brewer_ids
+        tasks = {}
+        for brewer_id in brewer_ids:
+            try:
+                tasks[brewer_id] = self._pool.submit(operation, self.client(brewer_id))
+            except Exception as err:
+                tasks[brewer_id] = err
+        results = {}
+        for brewer_id, task in tasks.items():
+            if isinstance(task, Exception):
+                results[brewer_id] = DeviceResult(brewer_id, error=task)
+                continue
+            try:
+                results[brewer_id] = DeviceResult(brewer_id, value=task.result())
+            except Exception as err:
+                self._log.warning("Fleet operation failed on %s: %s" % (brewer_id, err))
+                results[brewer_id] = DeviceResult(brewer_id, error=err)
+        return results
+
+    def get_states(self, brewer_ids=None):
+        """Return a :class:`BrewerState` per brewer."""
+        return self.run(lambda client: client.get_state(), brewer_ids)
+
+    def get_profiles(self, brewer_ids=None):
+        return self.run(lambda client: client.get_profiles(), brewer_ids)
+
+    def create_profile(self, data, brewer_ids=None):
+        """Create the same profile on every brewer."""
+        def create(client):
+            created = client.create_profile(dict(data))
+            if created is False:
+                # The client logs why and returns False when validation fails
+                raise Exception("Brew profile format was invalid: %s" % data)
+            return created
+        return self.run(create, brewer_ids)
+
+    def upsert_profiles(self, profiles, brewer_ids=None):
+        """Bring every brewer's profiles in line with ``profiles``, by title."""
+        return self.run(lambda client: client.upsert_profiles(profiles), brewer_ids)
+
+    def reconcile(self, profiles=None, schedules=None, prune=False, brewer_ids=None):
+        """Plan and apply a desired state on every brewer.
+
+        See :mod:`fellow_aiden.reconcile`. Each brewer's value is the list
+        of :class:`~fellow_aiden.reconcile.ChangeResult` for its plan.
+        """
+        def sync(client):
+            return reconcile.apply(client, reconcile.plan(client, profiles, schedules, prune))
+        return self.run(sync, brewer_ids)
+
+    def adjust_setting(self, setting, value, brewer_ids=None):
+        return self.run(lambda client: client.adjust_setting(setting, value), brewer_ids)
+
+    def adjust_settings(self, settings, brewer_ids=None):
+        """Apply the same settings to every brewer, one request each."""
+        return self.run(lambda client: client.adjust_settings(settings), brewer_ids)
@@ -0,0 +1,108 @@
+"""LRU cache of shared brew-link profiles, optionally backed by disk."""
+import copy
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+class SharedProfileCache:
+
+    """Remember profiles fetched from shared brew links.
+
+    A shared profile never changes for a given brew id, so entries need no
+    expiry; the least recently used ones are dropped once ``maxsize`` is
+    reached. With a ``path``, every entry is also written there as one
+    JSON file per brew id and read back after a restart.
+
+    Entries are copied on the way in and out, so callers may modify what
+    they get.
+    """
+
+    MAXSIZE = 128
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, maxsize=None, path=None):
+        """Create an empty cache.
+
+        :param maxsize: Entries kept in memory.
+        :param path: Optional directory for the on-disk layer.
+        """
+        self._maxsize = maxsize or self.MAXSIZE
+        self._path = os.path.abspath(os.path.expanduser(path)) if path else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._log = logging.getLogger('FELLOW-AIDEN')
+
+    @classmethod
+    def default(cls):
+        """Return the in-memory cache shared by every client in the process."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __file(self, brew_id):
+        return os.path.join(self._path, '%s.json' % brew_id)
+
+    def get(self, brew_id):
+        """Return a copy of the cached profile for a brew id, or None."""
+        with self._lock:
+            payload = self._entries.get(brew_id)
+            if payload is not None:
+                self._entries.move_to_end(brew_id)
+                return copy.deepcopy(payload)
+        if self._path is None:
+            return None
+        try:
+            with open(self.__file(brew_id), 'r') as handle:
+                payload = json.load(handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as err:
+            self._log.warning("Could not read shared profile %s: %s" % (brew_id, err))
+            return None
+        self.__remember(brew_id, payload)
+        return copy.deepcopy(payload)
+
+    def put(self, brew_id, payload):
+        """Cache the profile behind a brew id."""
+        payload = copy.deepcopy(payload)
+        self.__remember(brew_id, payload)
+        if self._path is None:
+            return
+        tmp_path = None
+        try:
+            os.makedirs(self._path, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self._path, prefix='.shared-')
+            with os.fdopen(fd, 'w') as handle:
+                json.dump(payload, handle)
+            os.replace(tmp_path, self.__file(brew_id))
+        except OSError as err:
+            self._log.warning("Could not write shared profile %s: %s" % (brew_id, err))
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def __remember(self, brew_id, payload):
+        with self._lock:
+            self._entries[brew_id] = payload
+            self._entries.move_to_end(brew_id)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Forget every entry, on disk as well."""
+        with self._lock:
+            self._entries.clear()
+        if self._path is not None and os.path.isdir(self._path):
+            for name in os.listdir(self._path):
+                if name.endswith('.json'):
+                    os.unlink(os.path.join(self._path, name))
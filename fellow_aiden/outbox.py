@@ -0,0 +1,196 @@
+"""Durable queue of writes made while Fellow's API is unreachable."""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+CREATE_PROFILE = 'create_profile'
+PATCH_PROFILE = 'patch_profile'
+DELETE_PROFILE = 'delete_profile'
+CREATE_SCHEDULE = 'create_schedule'
+TOGGLE_SCHEDULE = 'toggle_schedule'
+SETTINGS = 'settings'
+
+CREATES = (CREATE_PROFILE, CREATE_SCHEDULE)
+# Kinds a new operation is folded into when one is queued for the same target
+MERGES_INTO = {
+    PATCH_PROFILE: (CREATE_PROFILE, PATCH_PROFILE),
+    TOGGLE_SCHEDULE: (CREATE_SCHEDULE, TOGGLE_SCHEDULE),
+    SETTINGS: (SETTINGS,),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS operations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    brewer_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    target TEXT,
+    payload TEXT,
+    queued_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resolved (
+    brewer_id TEXT NOT NULL,
+    provisional_id TEXT NOT NULL,
+    real_id TEXT NOT NULL,
+    PRIMARY KEY (brewer_id, provisional_id)
+);
+"""
+
+
+@dataclass(frozen=True)
+class Operation:
+
+    """One queued write."""
+
+    seq: int
+    brewer_id: str
+    kind: str
+    target: Optional[str]
+    payload: Optional[Dict[str, Any]]
+    queued_at: float
+
+
+class Outbox:
+
+    """Keep writes in a SQLite file until they can be sent.
+
+    Operations are kept per brewer in the order they were made. Queuing
+    one folds it into an earlier operation on the same target where that
+    gives the same end result: edits to a profile are merged into one
+    PATCH (or into its queued creation), a delete drops the edits and
+    schedules queued against the profile before it, and device settings
+    are merged into one change.
+
+    A queued create gets a provisional ID (see
+    :attr:`FellowAiden.PROVISIONAL_PREFIX`). Later operations may target
+    it; once the create is sent they are pointed at the real ID.
+
+    Writes are delivered at least once: if the process dies between
+    sending an operation and removing it, it is sent again on replay.
+    """
+
+    def __init__(self, path):
+        """Open the queue stored at ``path``.
+
+        :param path: SQLite file holding the queue, created if missing.
+        """
+        self._path = os.path.abspath(os.path.expanduser(path))
+        directory = os.path.dirname(self._path)
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self._path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._log = logging.getLogger('FELLOW-AIDEN')
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM operations").fetchone()[0]
+
+    @staticmethod
+    def __operation(row):
+        seq, brewer_id, kind, target, payload, queued_at = row
+        return Operation(seq, brewer_id, kind, target, json.loads(payload) if payload else None, queued_at)
+
+    def __find(self, brewer_id, target, kinds):
+        marks = ','.join('?' * len(kinds))
+        row = self._db.execute(
+            "SELECT * FROM operations WHERE brewer_id = ? AND target IS ? AND kind IN (%s) "
+            "ORDER BY seq DESC LIMIT 1" % marks, (brewer_id, target) + tuple(kinds)).fetchone()
+        return None if row is None else self.__operation(row)
+
+    def __schedules_for(self, brewer_id, profile_id):
+        """Return (seq, payload) of the queued schedule creates that use a profile."""
+        rows = self._db.execute("SELECT seq, payload FROM operations WHERE brewer_id = ? AND kind = ?",
+                                (brewer_id, CREATE_SCHEDULE)).fetchall()
+        operations = [(seq, json.loads(payload)) for seq, payload in rows]
+        return [(seq, data) for seq, data in operations if data.get('profileId') == profile_id]
+
+    def add(self, brewer_id, kind, target=None, payload=None):
+        """Queue an operation, folding it into an earlier one where possible.
+
+        :param kind: One of the operation constants in this module.
+        :param target: ID of the profile or schedule; the provisional ID
+                    for creates; None for settings.
+        :param payload: JSON-serializable dict of fields.
+        """
+        with self._lock, self._db:
+            if kind in MERGES_INTO:
+                earlier = self.__find(brewer_id, target, MERGES_INTO[kind])
+                if earlier is not None:
+                    merged = dict(earlier.payload or {}, **(payload or {}))
+                    self._db.execute("UPDATE operations SET payload = ? WHERE seq = ?",
+                                     (json.dumps(merged), earlier.seq))
+                    self._log.debug("Merged queued %s into #%d" % (kind, earlier.seq))
+                    return
+            if kind == DELETE_PROFILE:
+                self._db.execute("DELETE FROM operations WHERE brewer_id = ? AND target = ? AND kind = ?",
+                                 (brewer_id, target, PATCH_PROFILE))
+                for seq, _ in self.__schedules_for(brewer_id, target):
+                    self._db.execute("DELETE FROM operations WHERE seq = ?", (seq,))
+                created = self.__find(brewer_id, target, (CREATE_PROFILE,))
+                if created is not None:
+                    # Never sent, so there is nothing to delete
+                    self._db.execute("DELETE FROM operations WHERE seq = ?", (created.seq,))
+                    return
+            self._db.execute(
+                "INSERT INTO operations (brewer_id, kind, target, payload, queued_at) VALUES (?, ?, ?, ?, ?)",
+                (brewer_id, kind, target, None if payload is None else json.dumps(payload), time.time()))
+
+    def pending(self, brewer_id=None):
+        """Return queued operations, oldest first.
+
+        :param brewer_id: Only those for this brewer.
+        """
+        with self._lock:
+            if brewer_id is None:
+                rows = self._db.execute("SELECT * FROM operations ORDER BY seq").fetchall()
+            else:
+                rows = self._db.execute("SELECT * FROM operations WHERE brewer_id = ? ORDER BY seq",
+                                        (brewer_id,)).fetchall()
+        return [self.__operation(row) for row in rows]
+
+    def peek(self, brewer_id):
+        """Return the oldest operation for a brewer, or None."""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM operations WHERE brewer_id = ? ORDER BY seq LIMIT 1",
+                                   (brewer_id,)).fetchone()
+        return None if row is None else self.__operation(row)
+
+    def remove(self, seq):
+        """Drop an operation, once sent or to resolve a conflict."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM operations WHERE seq = ?", (seq,))
+
+    def resolve(self, brewer_id, provisional_id, real_id):
+        """Record the real ID a queued create received and retarget later operations."""
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO resolved VALUES (?, ?, ?)",
+                             (brewer_id, provisional_id, real_id))
+            self._db.execute("UPDATE operations SET target = ? WHERE brewer_id = ? AND target = ?",
+                             (real_id, brewer_id, provisional_id))
+            for seq, data in self.__schedules_for(brewer_id, provisional_id):
+                data['profileId'] = real_id
+                self._db.execute("UPDATE operations SET payload = ? WHERE seq = ?", (json.dumps(data), seq))
+
+    def real_id(self, brewer_id, provisional_id):
+        """Return the ID a provisional ID was resolved to, or None if it is still queued."""
+        with self._lock:
+            row = self._db.execute("SELECT real_id FROM resolved WHERE brewer_id = ? AND provisional_id = ?",
+                                   (brewer_id, provisional_id)).fetchone()
+        return None if row is None else row[0]
+
+    def clear(self, brewer_id=None):
+        """Drop every queued operation, or those of one brewer."""
+        with self._lock, self._db:
+            if brewer_id is None:
+                self._db.execute("DELETE FROM operations")
+            else:
+                self._db.execute("DELETE FROM operations WHERE brewer_id = ?", (brewer_id,))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -1,5 +1,5 @@
 """Model to validate the coffee profile data"""
-from pydantic import BaseModel, field_validator, ValidationError
+from pydantic import BaseModel, TypeAdapter, field_validator, ValidationError
 from typing import List
 import re
 
@@ -11,9 +11,20 @@ PULSES_NUMBER_ENUM = list(range(1, 11))                          # 1 to 10
 PULSES_INTERVAL_ENUM = list(range(5, 61))                        # 5 to 60
 PULSE_TEMPERATURE_ENUM = [50 + 0.5 * i for i in range(99)]       # 50, 50.5, 51, 51.5 ... 99
 
+# Hashed lookups for the float steps; integer fields are plain range checks
+RATIO_VALUES = frozenset(RATIO_ENUM)
+BLOOM_RATIO_VALUES = frozenset(BLOOM_RATIO_ENUM)
+BLOOM_TEMPERATURE_VALUES = frozenset(BLOOM_TEMPERATURE_ENUM)
+PULSE_TEMPERATURE_VALUES = frozenset(PULSE_TEMPERATURE_ENUM)
+
 # allows A–Z, a–z, 0–9, and the specials !@#$%&*-+?/.,:)(
 TITLE_REGEX = re.compile(r'[A-Za-z0-9 !@#$%&*\-+?/.,:)(]+')
 
+
+def _out_of_range(name, value, low, high, step):
+    return ValueError(f"{name} must be from {low} to {high} in steps of {step}. Got {value}")
+
+
 class CoffeeProfile(BaseModel):
     profileType: int
     title: str
@@ -43,72 +54,97 @@ class CoffeeProfile(BaseModel):
     @field_validator('ratio')
     @classmethod
     def validate_ratio(cls, v):
-        if v not in RATIO_ENUM:
-            raise ValueError(f"ratio must be one of {RATIO_ENUM}. Got {v}")
+        if v not in RATIO_VALUES:
+            raise _out_of_range('ratio', v, 14, 20, 0.5)
         return v
     
     @field_validator('bloomRatio')
     @classmethod
     def validate_bloom_ratio(cls, v):
-        if v not in BLOOM_RATIO_ENUM:
-            raise ValueError(f"bloomRatio must be one of {BLOOM_RATIO_ENUM}. Got {v}")
+        if v not in BLOOM_RATIO_VALUES:
+            raise _out_of_range('bloomRatio', v, 1, 3, 0.5)
         return v
     
     @field_validator('bloomDuration')
     @classmethod
     def validate_bloom_duration(cls, v):
-        if v not in BLOOM_DURATION_ENUM:
-            raise ValueError(f"bloomDuration must be one of {BLOOM_DURATION_ENUM}. Got {v}")
+        if not 1 <= v <= 120:
+            raise _out_of_range('bloomDuration', v, 1, 120, 1)
         return v
     
     @field_validator('bloomTemperature')
     @classmethod
     def validate_bloom_temperature(cls, v):
-        if v not in BLOOM_TEMPERATURE_ENUM:
-            raise ValueError(f"bloomTemperature must be one of {BLOOM_TEMPERATURE_ENUM}. Got {v}")
+        if v not in BLOOM_TEMPERATURE_VALUES:
+            raise _out_of_range('bloomTemperature', v, 50, 99, 0.5)
         return v
     
     @field_validator('ssPulsesNumber')
     @classmethod
     def validate_ss_pulses_number(cls, v):
-        if v not in PULSES_NUMBER_ENUM:
-            raise ValueError(f"ssPulsesNumber must be one of {PULSES_NUMBER_ENUM}. Got {v}")
+        if not 1 <= v <= 10:
+            raise _out_of_range('ssPulsesNumber', v, 1, 10, 1)
         return v
     
     @field_validator('ssPulsesInterval')
     @classmethod
     def validate_ss_pulses_interval(cls, v):
-        if v not in PULSES_INTERVAL_ENUM:
-            raise ValueError(f"ssPulsesInterval must be one of {PULSES_INTERVAL_ENUM}. Got {v}")
+        if not 5 <= v <= 60:
+            raise _out_of_range('ssPulsesInterval', v, 5, 60, 1)
         return v
     
     @field_validator('ssPulseTemperatures')
     @classmethod
     def validate_ss_pulse_temperature(cls, v):
         for t in v:
-            if t not in PULSE_TEMPERATURE_ENUM:
-                raise ValueError(f"Each ssPulseTemperature must be one of {PULSE_TEMPERATURE_ENUM}. Got: {t}")
+            if t not in PULSE_TEMPERATURE_VALUES:
+                raise _out_of_range('Each ssPulseTemperature', t, 50, 99, 0.5)
         return v
     
     @field_validator('batchPulsesNumber')
     @classmethod
     def validate_batch_pulses_number(cls, v):
-        if v not in PULSES_NUMBER_ENUM:
-            raise ValueError(f"batchPulsesNumber must be one of {PULSES_NUMBER_ENUM}. Got {v}")
+        if not 1 <= v <= 10:
+            raise _out_of_range('batchPulsesNumber', v, 1, 10, 1)
         return v
     
     @field_validator('batchPulsesInterval')
     @classmethod
     def validate_batch_pulses_interval(cls, v):
-        if v not in PULSES_INTERVAL_ENUM:
-            raise ValueError(f"batchPulsesInterval must be one of {PULSES_INTERVAL_ENUM}. Got {v}")
+        if not 5 <= v <= 60:
+            raise _out_of_range('batchPulsesInterval', v, 5, 60, 1)
         return v
     
     @field_validator('batchPulseTemperatures')
     @classmethod
     def validate_batch_pulse_temperature(cls, v):
         for t in v:
-            if t not in PULSE_TEMPERATURE_ENUM:
-                raise ValueError(f"Each batchPulseTemperature must be one of {PULSE_TEMPERATURE_ENUM}. Got: {t}")
+            if t not in PULSE_TEMPERATURE_VALUES:
+                raise _out_of_range('Each batchPulseTemperature', t, 50, 99, 0.5)
         return v
-    
+
+
+PROFILE_LIST = TypeAdapter(List[CoffeeProfile])
+
+
+def errors_by_position(err):
+    """Group the messages of a list's ValidationError by list position."""
+    errors = {}
+    for error in err.errors():
+        position, field = error['loc'][0] if error['loc'] else None, error['loc'][1:]
+        where = '.'.join(str(part) for part in field)
+        errors.setdefault(position, []).append(f"{where}: {error['msg']}" if where else error['msg'])
+    return {position: '; '.join(messages) for position, messages in errors.items()}
+
+
+def validate_profiles(profiles):
+    """Validate a list of profiles in one pass.
+
+    :returns: Dict of position in ``profiles`` to its error message; empty
+              when every profile is valid.
+    """
+    try:
+        PROFILE_LIST.validate_python(profiles)
+    except ValidationError as err:
+        return errors_by_position(err)
+    return {}
@@ -0,0 +1,131 @@
+"""Adaptive token-bucket rate limiting shared by every client of an account."""
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+def parse_retry_after(value):
+    """Return the seconds to wait from a ``Retry-After`` header, or None.
+
+    Accepts both forms allowed by RFC 9110: delay seconds and an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class RateLimiter:
+
+    """Token bucket whose rate adapts to throttling signals from the API.
+
+    Each request takes one token. The bucket refills at the current rate,
+    which is cut multiplicatively after a 429 or 5xx and grows back
+    additively with every successful response, up to the configured
+    maximum. A ``Retry-After`` pauses the whole bucket until it elapses.
+
+    Limiters returned by :meth:`shared` are kept per account for the life
+    of the process, so every client logged into the same account, on any
+    thread, draws from one budget.
+    """
+
+    RATE = 5.0
+    BURST = 10
+    MIN_RATE = 0.2
+    # Multiplicative decrease on throttling, additive increase on success
+    DECREASE = 0.5
+    INCREASE = 0.1
+    # Concurrent failures within this many seconds only cut the rate once
+    DECREASE_INTERVAL = 1.0
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, rate=None, burst=None, min_rate=None):
+        """Create a full bucket.
+
+        :param rate: Maximum sustained requests per second.
+        :param burst: Requests that may be sent back to back when idle.
+        :param min_rate: Floor the adaptive rate never drops below.
+        """
+        self._max_rate = rate or self.RATE
+        self._min_rate = min(min_rate or self.MIN_RATE, self._max_rate)
+        self._burst = burst or self.BURST
+        self._rate = self._max_rate
+        self._tokens = float(self._burst)
+        # Time the token count refers to; in the future while paused
+        self._updated = time.monotonic()
+        self._decreased_at = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, account):
+        """Return the process-wide limiter for an account, creating it once."""
+        with cls._shared_lock:
+            limiter = cls._shared.get(account)
+            if limiter is None:
+                limiter = cls._shared[account] = cls()
+            return limiter
+
+    @property
+    def rate(self):
+        """Current requests per second after adaptation."""
+        return self._rate
+
+    def __refill(self, now):
+        if now > self._updated:
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+    def reserve(self, max_wait=None):
+        """Take a token and return how long to wait before using it.
+
+        Does not block, so it serves threads and coroutines alike.
+
+        :param max_wait: Give up, without taking a token, if the wait would
+                    be longer than this many seconds.
+        :returns: Seconds to wait, or None if ``max_wait`` was exceeded.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.__refill(now)
+            wait = max(0.0, self._updated - now) + max(0.0, (1 - self._tokens) / self._rate)
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+    def acquire(self, max_wait=None):
+        """Block until a token is available; returns False past ``max_wait``."""
+        wait = self.reserve(max_wait)
+        if wait is None:
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+
+    def feedback(self, status_code, retry_after=None):
+        """Adapt the rate to a response.
+
+        :param status_code: Response status, or None if the request failed
+                    before one arrived.
+        :param retry_after: Seconds from the response's ``Retry-After``.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if retry_after:
+                self.__refill(now)
+                self._tokens = min(self._tokens, 0.0)
+                self._updated = max(self._updated, now + retry_after)
+            if status_code is not None and (status_code == 429 or status_code >= 500):
+                if self._decreased_at is None or now - self._decreased_at >= self.DECREASE_INTERVAL:
+                    self._rate = max(self._min_rate, self._rate * self.DECREASE)
+                    self._decreased_at = now
+            elif status_code is not None and status_code < 400:
+                self._rate = min(self._max_rate, self._rate + self.INCREASE)
@@ -0,0 +1,267 @@
+"""Bring a brewer's profiles and schedules in line with a desired set.
+
+:func:`plan` compares the desired profiles and schedules with what is on
+the brewer, matching profiles by content and then by title, and lists the
+fewest changes that close the gap. :func:`apply` sends them::
+
+    changes = reconcile.plan(aiden, profiles=desired, prune=True)
+    print(changes)
+    results = reconcile.apply(aiden, changes)
+
+Desired schedules may name their profile with ``profileTitle`` instead of
+``profileId``, since profile IDs differ between brewers.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from fellow_aiden.bulk import profile_content
+from fellow_aiden.profile import validate_profiles
+from fellow_aiden.schedule import validate_schedules
+from fellow_aiden.search import normalize_title
+
+PROFILE = 'profile'
+SCHEDULE = 'schedule'
+CREATE = 'create'
+PATCH = 'patch'
+DELETE = 'delete'
+TOGGLE = 'toggle'
+
+SCHEDULE_FIELDS = ('days', 'secondFromStartOfTheDay', 'enabled', 'amountOfWater', 'profileId', 'profileTitle')
+WORKERS = 4
+
+
+@dataclass(frozen=True)
+class Change:
+
+    """One request needed to reach the desired state."""
+
+    resource: str
+    action: str
+    label: str
+    target_id: Optional[str] = None
+    fields: Optional[Dict[str, Any]] = None
+
+    def __str__(self):
+        symbol = {CREATE: '+', PATCH: '~', DELETE: '-', TOGGLE: '~'}[self.action]
+        text = "%s %s %s" % (symbol, self.resource, self.label)
+        if self.action in (PATCH, TOGGLE):
+            text += ": " + ", ".join("%s=%r" % item for item in sorted(self.fields.items()))
+        return text
+
+
+@dataclass(frozen=True)
+class ChangeResult:
+
+    """Outcome of applying one :class:`Change`."""
+
+    change: Change
+    value: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class Plan:
+
+    """Ordered list of changes produced by :func:`plan`."""
+
+    def __init__(self, changes):
+        self.changes = list(changes)
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __bool__(self):
+        return bool(self.changes)
+
+    def __str__(self):
+        if not self.changes:
+            return "No changes."
+        return "\n".join(str(change) for change in self.changes)
+
+    def counts(self):
+        """Return the number of changes per action."""
+        counts = {}
+        for change in self.changes:
+            counts[change.action] = counts.get(change.action, 0) + 1
+        return counts
+
+    def select(self, resource=None, actions=()):
+        return [change for change in self.changes
+                if (resource is None or change.resource == resource)
+                and (not actions or change.action in actions)]
+
+
+def _schedule_label(schedule, profile_ref):
+    hours, seconds = divmod(schedule['secondFromStartOfTheDay'], 3600)
+    days = ''.join(day[0] if on else '-' for day, on in zip('SMTWTFS', schedule['days']))
+    return "%02d:%02d %s %dml %s" % (hours, seconds // 60, days, schedule['amountOfWater'], profile_ref)
+
+
+def _validate(profiles, schedules):
+    profiles = profiles or []
+    errors = ["profile #%d %s: %s" % (position, profiles[position].get('title'), message)
+              for position, message in sorted(validate_profiles(profiles).items())]
+    candidates = []
+    for data in schedules or []:
+        candidate = dict(data)
+        if candidate.get('profileTitle'):
+            # Resolved to a real ID when the plan is applied
+            candidate['profileId'] = 'p0'
+        candidates.append(candidate)
+    errors += ["schedule #%d: %s" % (position, message)
+               for position, message in sorted(validate_schedules(candidates).items())]
+    if errors:
+        raise Exception("Invalid desired state, nothing was planned:\n%s" % "\n".join(errors))
+
+
+def _plan_profiles(actual, desired, prune):
+    remaining = {profile['id']: profile for profile in actual}
+    changes = []
+    pending = []
+    # Identical content needs nothing, wherever the profile sits
+    for data in desired:
+        content = profile_content(data)
+        match = next((p for p in remaining.values() if profile_content(p) == content), None)
+        if match is None:
+            pending.append(data)
+        else:
+            del remaining[match['id']]
+    for data in pending:
+        content = profile_content(data)
+        title = normalize_title(data['title'])
+        match = next((p for p in remaining.values() if normalize_title(p.get('title', '')) == title), None)
+        if match is None:
+            changes.append(Change(PROFILE, CREATE, repr(data['title']), fields=content))
+            continue
+        del remaining[match['id']]
+        current = profile_content(match)
+        changed = {key: value for key, value in content.items() if current.get(key) != value}
+        changes.append(Change(PROFILE, PATCH, repr(match['title']), match['id'], changed))
+    if prune:
+        for profile in remaining.values():
+            changes.append(Change(PROFILE, DELETE, repr(profile.get('title')), profile['id']))
+    return changes
+
+
+def _plan_schedules(actual, desired, profiles, prune):
+    titles = {profile['id']: profile.get('title', '') for profile in profiles}
+
+    def profile_ref(schedule):
+        if schedule.get('profileTitle'):
+            return normalize_title(schedule['profileTitle'])
+        return normalize_title(titles.get(schedule['profileId'], schedule['profileId']))
+
+    def key(schedule):
+        return (tuple(schedule['days']), schedule['secondFromStartOfTheDay'],
+                schedule['amountOfWater'], profile_ref(schedule))
+
+    remaining = list(actual)
+    changes = []
+    for data in desired:
+        match = next((s for s in remaining if key(s) == key(data)), None)
+        label = _schedule_label(data, profile_ref(data))
+        if match is None:
+            fields = {field: data[field] for field in SCHEDULE_FIELDS if field in data}
+            changes.append(Change(SCHEDULE, CREATE, label, fields=fields))
+            continue
+        remaining.remove(match)
+        if match.get('enabled') != data['enabled']:
+            changes.append(Change(SCHEDULE, TOGGLE, label, match['id'], {'enabled': data['enabled']}))
+    if prune:
+        for schedule in remaining:
+            changes.append(Change(SCHEDULE, DELETE, _schedule_label(schedule, profile_ref(schedule)),
+                                  schedule['id']))
+    return changes
+
+
+def plan(client, profiles=None, schedules=None, prune=False):
+    """Work out the changes that make the brewer match the desired state.
+
+    Nothing is sent. Everything is validated, and the brewer's profile
+    slots counted, before the plan is returned.
+
+    :param client: :class:`FellowAiden` for the brewer.
+    :param profiles: Desired profiles, or None to leave profiles alone.
+    :param schedules: Desired schedules, or None to leave schedules alone.
+    :param prune: Delete profiles and schedules that are not desired.
+    :returns: :class:`Plan`
+    """
+    _validate(profiles, schedules)
+    actual_profiles = client.get_profiles()
+    changes = []
+    if profiles is not None:
+        changes += _plan_profiles(actual_profiles, profiles, prune)
+        creates = sum(c.action == CREATE for c in changes)
+        deletes = sum(c.action == DELETE for c in changes)
+        if len(actual_profiles) - deletes + creates > client.MAX_PROFILES:
+            raise Exception("Desired state needs %d profiles; the brewer holds %d."
+                            % (len(actual_profiles) - deletes + creates, client.MAX_PROFILES))
+    if schedules is not None:
+        changes += _plan_schedules(client.get_schedules(), schedules, actual_profiles, prune)
+    return Plan(changes)
+
+
+def _apply_change(client, change):
+    result = _send_change(client, change)
+    if result is False:
+        # The client logs why and returns False when a write fails validation
+        raise Exception("%s was rejected by validation" % change)
+    return result
+
+
+def _send_change(client, change):
+    if change.resource == PROFILE:
+        if change.action == CREATE:
+            return client.create_profile(dict(change.fields))
+        if change.action == PATCH:
+            return client.patch_profile(change.target_id, change.fields)
+        return client.delete_profile_by_id(change.target_id)
+    if change.action == CREATE:
+        data = dict(change.fields)
+        title = data.pop('profileTitle', None)
+        if title is not None:
+            profile = client.get_profile_by_title(title)
+            if profile is None:
+                raise Exception("Schedule refers to missing profile %r" % title)
+            data['profileId'] = profile['id']
+        return client.create_schedule(data)
+    if change.action == TOGGLE:
+        return client.toggle_schedule(change.target_id, change.fields['enabled'])
+    return client.delete_schedule_by_id(change.target_id)
+
+
+def apply(client, changes, max_workers=None):
+    """Send the changes of a plan, concurrently where order does not matter.
+
+    Schedules are deleted before profiles, freeing profiles they use and
+    making room for new ones; profiles are written before the schedules
+    that may refer to them. A failed change is reported without stopping
+    the others.
+
+    :param changes: :class:`Plan` from :func:`plan`.
+    :param max_workers: Requests in flight at once.
+    :returns: List of :class:`ChangeResult`, in plan order.
+    """
+    stages = [
+        changes.select(SCHEDULE, (DELETE,)),
+        changes.select(PROFILE, (DELETE,)),
+        changes.select(PROFILE, (CREATE, PATCH)),
+        changes.select(SCHEDULE, (CREATE, TOGGLE)),
+    ]
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=max_workers or WORKERS) as pool:
+        for stage in stages:
+            futures = [(change, pool.submit(_apply_change, client, change)) for change in stage]
+            for change, future in futures:
+                try:
+                    outcomes[id(change)] = ChangeResult(change, value=future.result())
+                except Exception as err:
+                    outcomes[id(change)] = ChangeResult(change, error=err)
+    return [outcomes[id(change)] for change in changes]
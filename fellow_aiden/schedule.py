@@ -1,5 +1,6 @@
 """Model to validate the coffee schedule data"""
-from pydantic import BaseModel, field_validator, ValidationError
+from fellow_aiden.profile import errors_by_position
+from pydantic import BaseModel, TypeAdapter, field_validator, ValidationError
 from typing import List
 import re
 
@@ -41,4 +42,20 @@ class CoffeeSchedule(BaseModel):
     def validate_profile_id(cls, v):
         if not PROFILE_ID_REGEX.match(v):
             raise ValueError("profileId must be either 'p' followed by a number or 'plocal' followed by a number.")
-        return v
\ No newline at end of file
+        return v
+
+
+SCHEDULE_LIST = TypeAdapter(List[CoffeeSchedule])
+
+
+def validate_schedules(schedules):
+    """Validate a list of schedules in one pass.
+
+    :returns: Dict of position in ``schedules`` to its error message;
+              empty when every schedule is valid.
+    """
+    try:
+        SCHEDULE_LIST.validate_python(schedules)
+    except ValidationError as err:
+        return errors_by_position(err)
+    return {}
@@ -0,0 +1,116 @@
+"""Trigram index for fast, ranked fuzzy title lookups."""
+from difflib import SequenceMatcher
+
+
+def normalize_title(title):
+    """Key used to match profile titles regardless of case and padding."""
+    return title.strip().lower()
+
+
+def trigrams(text):
+    """Return the set of character trigrams of a normalized title."""
+    padded = '  %s ' % text
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleIndex:
+
+    """Trigram index over titles that returns the best matches first.
+
+    Titles are normalized and split into trigrams once, when added. A query
+    only scores items sharing at least one trigram with it, and only the
+    strongest trigram candidates are re-ranked with ``SequenceMatcher``, so
+    lookups stay fast on large catalogs while scores keep the same scale
+    as :func:`fellow_aiden.similar`.
+    """
+
+    MIN_SCORE = 0.65
+    # Trigram candidates re-ranked with SequenceMatcher per query
+    CANDIDATES = 25
+
+    def __init__(self, items=None, title_key='title', id_key='id'):
+        """Build the index.
+
+        :param items: Optional iterable of dicts to index.
+        :param title_key: Dict key holding the title.
+        :param id_key: Dict key holding a unique identifier. Items without
+                    one are keyed by their position in ``items``.
+        """
+        self._title_key = title_key
+        self._id_key = id_key
+        self._items = {}
+        self._titles = {}
+        self._grams = {}
+        self._postings = {}
+        for position, item in enumerate(items or []):
+            self.add(item.get(id_key, position), item.get(title_key, ''), item)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item_id):
+        return item_id in self._items
+
+    def add(self, item_id, title, item):
+        """Index ``item`` under ``title``, replacing any previous entry."""
+        if item_id in self._items:
+            self.remove(item_id)
+        normalized = normalize_title(title)
+        grams = trigrams(normalized)
+        self._items[item_id] = item
+        self._titles[item_id] = normalized
+        self._grams[item_id] = len(grams)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(item_id)
+
+    def remove(self, item_id):
+        """Drop an item from the index if present."""
+        if item_id not in self._items:
+            return
+        for gram in trigrams(self._titles[item_id]):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(item_id)
+                if not postings:
+                    del self._postings[gram]
+        del self._items[item_id]
+        del self._titles[item_id]
+        del self._grams[item_id]
+
+    def search(self, query, limit=5, min_score=None):
+        """Return up to ``limit`` ``(item, score)`` pairs, best match first.
+
+        :param query: Title to look for.
+        :param limit: Maximum number of matches to return.
+        :param min_score: Minimum similarity ratio, defaults to MIN_SCORE.
+        """
+        if min_score is None:
+            min_score = self.MIN_SCORE
+        normalized = normalize_title(query)
+        grams = trigrams(normalized)
+        shared = {}
+        for gram in grams:
+            for item_id in self._postings.get(gram, ()):
+                shared[item_id] = shared.get(item_id, 0) + 1
+        # Dice coefficient over trigrams picks the candidates worth ranking
+        candidates = sorted(
+            shared,
+            key=lambda item_id: 2.0 * shared[item_id] / (len(grams) + self._grams[item_id]),
+            reverse=True,
+        )[:max(self.CANDIDATES, limit)]
+        matcher = SequenceMatcher(None, b=normalized)
+        scored = []
+        for item_id in candidates:
+            matcher.set_seq1(self._titles[item_id])
+            if matcher.real_quick_ratio() < min_score or matcher.quick_ratio() < min_score:
+                continue
+            score = matcher.ratio()
+            if score >= min_score:
+                scored.append((score, item_id))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+        return [(self._items[item_id], score) for score, item_id in scored[:limit]]
+
+    def best(self, query, min_score=None):
+        """Return the single best matching item, or None."""
+        matches = self.search(query, limit=1, min_score=min_score)
+        return matches[0][0] if matches else None
@@ -0,0 +1,89 @@
+"""On-disk store of client session state for fast warm restarts."""
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+
+from fellow_aiden import codec
+
+
+class SessionStore:
+
+    """Persist tokens and cached API data between processes.
+
+    State is kept per account in a single JSON file that is only readable
+    and writable by its owner (mode 0600). Writes go through a temporary
+    file and an atomic rename so a crash never leaves a torn snapshot.
+    """
+
+    FILE_MODE = 0o600
+
+    def __init__(self, path, max_age=None):
+        """Open a store backed by ``path``.
+
+        :param path: File holding the snapshots.
+        :param max_age: Ignore snapshots older than this many seconds.
+        """
+        self._path = os.path.abspath(os.path.expanduser(path))
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._log = logging.getLogger('FELLOW-AIDEN')
+
+    def __read(self):
+        try:
+            mode = stat.S_IMODE(os.stat(self._path).st_mode)
+            if mode & (stat.S_IRWXG | stat.S_IRWXO):
+                self._log.warning("Session store %s is accessible by other users; ignoring it" % self._path)
+                return {}
+            with open(self._path, 'rb') as handle:
+                return codec.loads(handle.read())
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as err:
+            self._log.warning("Could not read session store %s: %s" % (self._path, err))
+            return {}
+
+    def __write(self, data):
+        directory = os.path.dirname(self._path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.fellow-session-')
+        try:
+            os.fchmod(fd, self.FILE_MODE)
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(codec.dumpb(data))
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def load(self, account):
+        """Return the saved state for an account, or None."""
+        with self._lock:
+            state = self.__read().get(account)
+        if not state:
+            return None
+        if self._max_age is not None and time.time() - state.get('saved_at', 0) > self._max_age:
+            return None
+        return state
+
+    def save(self, account, state):
+        """Write the state for an account, replacing any previous snapshot."""
+        state = dict(state, saved_at=time.time())
+        with self._lock:
+            data = self.__read()
+            data[account] = state
+            self.__write(data)
+
+    def clear(self, account=None):
+        """Forget one account's snapshot, or delete the whole store."""
+        with self._lock:
+            if account is None:
+                if os.path.exists(self._path):
+                    os.unlink(self._path)
+                return
+            data = self.__read()
+            if data.pop(account, None) is not None:
+                self.__write(data)
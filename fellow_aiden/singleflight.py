@@ -0,0 +1,46 @@
+"""Coalesce concurrent calls that would load the same resource."""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+
+    """Run at most one call per key at a time and share its outcome.
+
+    The first thread to ask for a key runs the loader; threads arriving
+    while it is in flight wait for it and receive the same result, or the
+    same exception, instead of issuing their own request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """Call ``fn(*args, **kwargs)`` unless a call for ``key`` is already running.
+
+        :returns: The result of the call that ran.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Future()
+        if not leader:
+            return flight.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as err:
+            flight.set_exception(err)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    def in_flight(self, key):
+        """Return True while a call for ``key`` is running."""
+        with self._lock:
+            return key in self._flights
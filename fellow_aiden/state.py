@@ -0,0 +1,31 @@
+"""Point-in-time snapshot of a brewer's device, profiles and schedules."""
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+
+@dataclass(frozen=True)
+class BrewerState:
+
+    """Device config, profiles and schedules read together.
+
+    Returned by :meth:`FellowAiden.get_state` and
+    :meth:`FellowAiden.refresh_all`. The lists are tuples and the snapshot
+    cannot be reassigned, so it can be handed to other threads as is;
+    later cache updates on the client never change it. ``stale`` is True
+    when Fellow's API was unavailable and the snapshot was read from the
+    client's cache instead.
+    """
+
+    device_config: Dict[str, Any]
+    profiles: Tuple[Dict[str, Any], ...]
+    schedules: Tuple[Dict[str, Any], ...]
+    fetched_at: float
+    stale: bool = False
+
+    @property
+    def brewer_id(self):
+        return self.device_config['id']
+
+    @property
+    def display_name(self):
+        return self.device_config.get('displayName')
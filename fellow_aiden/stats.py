@@ -0,0 +1,40 @@
+"""Per-endpoint request counters and latency."""
+import threading
+
+
+class RequestStats:
+
+    """Aggregate count, errors and latency per endpoint.
+
+    Endpoints are keyed by method and path template (for example
+    ``GET /devices/{id}/profiles``) so every brewer shares one row.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {}
+
+    def record(self, method, endpoint, status_code, elapsed):
+        """Hook signature used by the dispatcher; see ``add_request_hook``."""
+        key = '%s %s' % (method, endpoint)
+        failed = status_code is None or status_code >= 400
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                row = self._rows[key] = {'count': 0, 'errors': 0, 'total_time': 0.0, 'max_time': 0.0}
+            row['count'] += 1
+            row['errors'] += failed
+            row['total_time'] += elapsed
+            row['max_time'] = max(row['max_time'], elapsed)
+
+    def snapshot(self):
+        """Return a copy of the rows with the mean latency filled in."""
+        with self._lock:
+            rows = {key: dict(row) for key, row in self._rows.items()}
+        for row in rows.values():
+            row['mean_time'] = row['total_time'] / row['count']
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._rows.clear()
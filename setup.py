@@ -34,6 +34,12 @@ setup(
     zip_safe=False,
     keywords=['coffee', 'coffee brewer', 'fellow', 'coffee tech'],
     extras_require={
+        'async': [
+            'httpx>=0.27'
+        ],
+        'fast': [
+            'orjson>=3.8'
+        ],
         'dev': [
             'pytest>=6.2',
             'black>=21.9b0'
@@ -0,0 +1,131 @@
+import unittest
+import asyncio
+import json
+import time
+from fellow_aiden import AsyncFellowAiden
+from fellow_aiden.aio import httpx
+from fellow_aiden.exceptions import DeadlineExceeded
+
+
+PROFILE = {
+    "profileType": 0,
+    "title": "Test Profile",
+    "ratio": 16,
+    "bloomEnabled": True,
+    "bloomRatio": 2,
+    "bloomDuration": 30,
+    "bloomTemperature": 96,
+    "ssPulsesEnabled": True,
+    "ssPulsesNumber": 3,
+    "ssPulsesInterval": 23,
+    "ssPulseTemperatures": [96, 97, 98],
+    "batchPulsesEnabled": True,
+    "batchPulsesNumber": 2,
+    "batchPulsesInterval": 30,
+    "batchPulseTemperatures": [96, 97]
+}
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncFellowAiden(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.logins = 0
+        self.expire_next = False
+        self.patches = []
+        self.timeouts = []
+
+        def handler(request):
+            path = request.url.path.replace('/v1', '', 1)
+            self.calls.append((request.method, path))
+            self.timeouts.append(request.extensions.get('timeout'))
+            if path == '/auth/login':
+                self.logins += 1
+                return httpx.Response(200, json={
+                    'accessToken': 'token-%d' % self.logins,
+                    'refreshToken': 'refresh'
+                })
+            if self.expire_next:
+                self.expire_next = False
+                return httpx.Response(401, json={'message': 'Unauthorized'})
+            if path == '/devices':
+                return httpx.Response(200, json=[{'id': 'b1', 'displayName': 'Test Brewer'}])
+            if path == '/devices/b1/profiles' and request.method == 'GET':
+                return httpx.Response(200, json=[dict(PROFILE, id='p0')])
+            if path == '/devices/b1/schedules':
+                return httpx.Response(200, json=[])
+            if path == '/devices/b1/profiles' and request.method == 'POST':
+                return httpx.Response(200, json=dict(json.loads(request.content), id='p1'))
+            if path == '/devices/b1' and request.method == 'PATCH':
+                self.patches.append(json.loads(request.content))
+                return httpx.Response(200, json={})
+            return httpx.Response(404, json={'message': 'Not found'})
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        self.aiden = AsyncFellowAiden("test@example.com", "password", client=client)
+
+    async def test_get_state(self):
+        state = await self.aiden.get_state()
+        self.assertEqual(state.brewer_id, 'b1')
+        self.assertEqual(state.profiles[0]['id'], 'p0')
+        self.assertEqual(state.schedules, ())
+
+    async def test_profiles_lazy_auth(self):
+        profiles = await self.aiden.profiles
+        self.assertEqual(profiles[0]['id'], 'p0')
+        self.assertEqual(self.aiden.get_display_name(), 'Test Brewer')
+        self.assertEqual(self.logins, 1)
+
+    async def test_create_profile_validates(self):
+        self.assertFalse(await self.aiden.create_profile({'title': 'Bad'}))
+        self.assertEqual(self.calls, [])
+        created = await self.aiden.create_profile(dict(PROFILE))
+        self.assertEqual(created['id'], 'p1')
+
+    async def test_single_setting_updates_cached_config(self):
+        await self.aiden.get_device_config()
+        await self.aiden.adjust_setting('language', 'de')
+        self.assertEqual((await self.aiden.get_device_config())['language'], 'de')
+        await self.aiden.adjust_settings({'language': 'en'})
+        self.assertEqual(self.patches, [{'language': 'de'}, {'language': 'en'}])
+
+    async def test_cached_lists_replaced_not_changed(self):
+        profiles = await self.aiden.get_profiles()
+        await self.aiden.create_profile(dict(PROFILE))
+        self.assertEqual([p['id'] for p in profiles], ['p0'])
+        self.assertEqual([p['id'] for p in await self.aiden.get_profiles()], ['p0', 'p1'])
+
+    async def test_request_options_timeout(self):
+        await self.aiden.get_device_config()
+        with self.aiden.request_options(timeout=(1, 2)):
+            await self.aiden.get_profiles()
+        await self.aiden.get_schedules()
+        self.assertEqual(self.timeouts[-2]['connect'], 1)
+        self.assertEqual(self.timeouts[-2]['read'], 2)
+        self.assertNotEqual(self.timeouts[-1]['read'], 2)
+
+    async def test_request_options_deadline(self):
+        async def hang(request):
+            await asyncio.sleep(5)
+
+        aiden = AsyncFellowAiden("test@example.com", "password", rate_limiter=False,
+                                 client=httpx.AsyncClient(transport=httpx.MockTransport(hang)))
+        aiden._auth = True
+        aiden._brewer_id = 'b1'
+        started = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            with aiden.request_options(deadline=0.2):
+                await aiden.get_profiles()
+        self.assertLess(time.monotonic() - started, 1)
+
+    async def test_reauth_on_401(self):
+        await self.aiden.get_device_config()
+        self.expire_next = True
+        profiles = await self.aiden.get_profiles()
+        self.assertEqual(len(profiles), 1)
+        self.assertEqual(self.logins, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import json
+import threading
+import requests
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden
+from fellow_aiden.breaker import CircuitBreaker, CLOSED, OPEN
+from fellow_aiden.exceptions import CircuitOpenError
+
+
+PROFILES = [{'id': 'p0', 'title': 'Morning'}]
+
+
+def make_response(status_code, body, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = headers or {}
+    return response
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3)
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_probe_closes_circuit(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        recovered = threading.Event()
+        calls = []
+
+        def probe():
+            calls.append(1)
+            if len(calls) < 2:
+                return False
+            recovered.set()
+            return True
+        breaker.record_failure(probe)
+        self.assertTrue(recovered.wait(2))
+        for _ in range(200):
+            if breaker.allow():
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(len(calls), 2)
+
+    def test_shared_per_url(self):
+        self.assertIs(CircuitBreaker.for_url('https://a.example'), CircuitBreaker.for_url('https://a.example'))
+        self.assertIsNot(CircuitBreaker.for_url('https://a.example'), CircuitBreaker.for_url('https://b.example'))
+
+
+class TestDegradedMode(unittest.TestCase):
+
+    def setUp(self):
+        # A long reset timeout keeps the background probe asleep during the test
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=3600)
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False,
+                                        cache_ttl=0, circuit_breaker=self.breaker)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+
+    def tearDown(self):
+        # Ends the probe thread so it never reaches the real API
+        self.breaker.close()
+
+    @patch('fellow_aiden.time.sleep')
+    @patch('fellow_aiden.requests.Session.get')
+    def test_open_circuit_stops_retries(self, mock_get, mock_sleep):
+        mock_get.side_effect = requests.ConnectionError("down")
+        with self.assertRaises(requests.ConnectionError):
+            self.fellow_aiden.get_profiles()
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertTrue(self.fellow_aiden.degraded)
+
+        with self.assertRaises(CircuitOpenError):
+            self.fellow_aiden.get_profiles()
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('fellow_aiden.time.sleep')
+    @patch('fellow_aiden.requests.Session.get')
+    def test_reads_served_from_cache_while_open(self, mock_get, mock_sleep):
+        mock_get.return_value = make_response(200, PROFILES)
+        self.assertEqual(self.fellow_aiden.get_profiles(), PROFILES)
+        self.fellow_aiden._device_config = {'id': 'test_brewer_id'}
+        self.fellow_aiden._schedules = []
+
+        mock_get.side_effect = requests.ConnectionError("down")
+        with self.assertRaises(requests.ConnectionError):
+            self.fellow_aiden.get_device_config(remote=True)
+        calls = mock_get.call_count
+
+        self.assertEqual(self.fellow_aiden.get_profiles(), PROFILES)
+        state = self.fellow_aiden.refresh_all()
+        self.assertTrue(state.stale)
+        self.assertEqual(state.profiles, tuple(PROFILES))
+        self.assertEqual(mock_get.call_count, calls)
+
+    @patch('fellow_aiden.requests.Session.get')
+    @patch('fellow_aiden.requests.Session.patch')
+    def test_writes_fail_fast_while_open(self, mock_patch, mock_get):
+        # A cached schedule lets the ID check pass, so only the write can be refused
+        self.fellow_aiden._schedules = [{'id': 's0', 'enabled': False}]
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        with self.assertRaises(CircuitOpenError) as raised:
+            self.fellow_aiden.toggle_schedule('s0', True)
+        self.assertTrue(str(raised.exception).startswith('PATCH'))
+        mock_get.assert_not_called()
+        mock_patch.assert_not_called()
+        self.assertFalse(self.fellow_aiden.schedules[0]['enabled'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import json
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden
+from fellow_aiden.bulk import CREATED, FAILED, UNCHANGED, UPDATED
+
+
+PROFILE = {
+    "profileType": 0,
+    "title": "Test Profile",
+    "ratio": 16,
+    "bloomEnabled": True,
+    "bloomRatio": 2,
+    "bloomDuration": 30,
+    "bloomTemperature": 96,
+    "ssPulsesEnabled": True,
+    "ssPulsesNumber": 3,
+    "ssPulsesInterval": 23,
+    "ssPulseTemperatures": [96, 97, 98],
+    "batchPulsesEnabled": True,
+    "batchPulsesNumber": 2,
+    "batchPulsesInterval": 30,
+    "batchPulseTemperatures": [96, 97]
+}
+
+
+def make_response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = {}
+    return response
+
+
+def created(url, data=None, **kwargs):
+    body = json.loads(data)
+    if body['title'] == 'Broken':
+        return make_response(400, {'message': 'Bad request'})
+    return make_response(200, dict(body, id='new-' + body['title']))
+
+
+class TestBulkProfiles(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+        self.fellow_aiden._profiles = [dict(PROFILE, id='p0', title='Existing', lastUsedTime=1)]
+
+    @patch('fellow_aiden.requests.Session.post')
+    def test_create_profiles(self, mock_post):
+        mock_post.side_effect = created
+        results = self.fellow_aiden.create_profiles([
+            dict(PROFILE, title='One'),
+            dict(PROFILE, title='Existing'),
+            dict(PROFILE, title='Broken'),
+        ])
+        self.assertEqual([r.action for r in results], [CREATED, UNCHANGED, FAILED])
+        self.assertEqual(results[0].profile['id'], 'new-One')
+        self.assertEqual(results[1].profile['id'], 'p0')
+        self.assertFalse(results[2].ok)
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(len(self.fellow_aiden.get_profiles()), 2)
+
+    @patch('fellow_aiden.requests.Session.post')
+    def test_nothing_sent_when_invalid_or_full(self, mock_post):
+        with self.assertRaises(Exception):
+            self.fellow_aiden.create_profiles([dict(PROFILE, title='One'), dict(PROFILE, ratio=99)])
+        with self.assertRaises(Exception):
+            self.fellow_aiden.create_profiles([dict(PROFILE, title='P%d' % i) for i in range(14)])
+        mock_post.assert_not_called()
+
+    @patch('fellow_aiden.requests.Session.patch')
+    @patch('fellow_aiden.requests.Session.post')
+    def test_upsert_profiles(self, mock_post, mock_patch):
+        mock_post.side_effect = created
+        mock_patch.return_value = make_response(200, {})
+        results = self.fellow_aiden.upsert_profiles([
+            dict(PROFILE, title='Existing ', ratio=17),
+            dict(PROFILE, title='Fresh'),
+        ])
+        self.assertEqual([r.action for r in results], [UPDATED, CREATED])
+        self.assertEqual(results[0].profile['ratio'], 17)
+        mock_patch.assert_called_once()
+
+        results = self.fellow_aiden.upsert_profiles([dict(PROFILE, id='x', title='Fresh', lastUsedTime=5)])
+        self.assertEqual(results[0].action, UNCHANGED)
+        self.assertEqual(mock_post.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
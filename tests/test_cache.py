@@ -0,0 +1,143 @@
+import unittest
+import json
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden
+from fellow_aiden.cache import ResourceCache, FRESH, STALE, EXPIRED
+
+
+PROFILE = {
+    "profileType": 0,
+    "title": "Test Profile",
+    "ratio": 16,
+    "bloomEnabled": True,
+    "bloomRatio": 2,
+    "bloomDuration": 30,
+    "bloomTemperature": 96,
+    "ssPulsesEnabled": True,
+    "ssPulsesNumber": 3,
+    "ssPulsesInterval": 23,
+    "ssPulseTemperatures": [96, 97, 98],
+    "batchPulsesEnabled": True,
+    "batchPulsesNumber": 2,
+    "batchPulsesInterval": 30,
+    "batchPulseTemperatures": [96, 97]
+}
+
+
+def make_response(status_code, body, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = headers or {}
+    return response
+
+
+class TestIncrementalCache(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+        self.fellow_aiden._profiles = [dict(PROFILE, id='p0')]
+        self.fellow_aiden._schedules = [{'id': 's0', 'enabled': True, 'profileId': 'p0'}]
+
+    @patch('fellow_aiden.requests.Session.get')
+    @patch('fellow_aiden.requests.Session.post')
+    def test_create_profile_appends(self, mock_post, mock_get):
+        mock_post.return_value = make_response(200, dict(PROFILE, title='New', id='p1'))
+        self.fellow_aiden.create_profile(dict(PROFILE, title='New'))
+        self.assertEqual([p['id'] for p in self.fellow_aiden.get_profiles()], ['p0', 'p1'])
+        mock_get.assert_not_called()
+
+    @patch('fellow_aiden.requests.Session.get')
+    @patch('fellow_aiden.requests.Session.patch')
+    def test_update_profile_patches_cache(self, mock_patch, mock_get):
+        mock_patch.return_value = make_response(200, {})
+        self.fellow_aiden.update_profile('p0', dict(PROFILE, ratio=17))
+        self.assertEqual(self.fellow_aiden.get_profiles()[0]['ratio'], 17)
+        mock_get.assert_not_called()
+
+    @patch('fellow_aiden.requests.Session.patch')
+    def test_update_profile_sends_only_changes(self, mock_patch):
+        mock_patch.return_value = make_response(200, {})
+        self.fellow_aiden.update_profile('p0', dict(PROFILE, id='p0', ratio=17, bloomDuration=40))
+        self.assertEqual(json.loads(mock_patch.call_args[1]['data']), {'ratio': 17, 'bloomDuration': 40})
+
+        self.assertTrue(self.fellow_aiden.update_profile('p0', dict(PROFILE, ratio=17, bloomDuration=40)))
+        mock_patch.assert_called_once()
+
+    @patch('fellow_aiden.requests.Session.delete')
+    def test_deletes_drop_cached_entries(self, mock_delete):
+        mock_delete.return_value = make_response(200, {})
+        self.fellow_aiden.delete_schedule_by_id('s0')
+        self.fellow_aiden.delete_profile_by_id('p0')
+        self.assertEqual(self.fellow_aiden.get_profiles(), [])
+        self.assertEqual(self.fellow_aiden.get_schedules(), [])
+
+    @patch('fellow_aiden.requests.Session.patch')
+    def test_title_index_follows_updates(self, mock_patch):
+        mock_patch.return_value = make_response(200, {})
+        self.assertEqual(self.fellow_aiden.get_profile_by_title(' test profile')['id'], 'p0')
+        self.fellow_aiden.update_profile('p0', dict(PROFILE, title='Renamed'))
+        self.assertIsNone(self.fellow_aiden.get_profile_by_title('Test Profile'))
+        self.assertEqual(self.fellow_aiden.get_profile_by_title('RENAMED')['id'], 'p0')
+        self.assertEqual(self.fellow_aiden.get_profile_by_id('p0')['title'], 'Renamed')
+
+    @patch('fellow_aiden.requests.Session.delete')
+    def test_delete_unknown_profile_raises(self, mock_delete):
+        with self.assertRaises(Exception):
+            self.fellow_aiden.delete_profile_by_id('p9')
+        mock_delete.assert_not_called()
+
+    @patch('fellow_aiden.requests.Session.post')
+    def test_id_collision_drops_cache(self, mock_post):
+        mock_post.return_value = make_response(200, dict(PROFILE, id='p0'))
+        self.fellow_aiden.create_profile(dict(PROFILE))
+        self.assertIsNone(self.fellow_aiden._profiles)
+
+
+class TestResourceCache(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False,
+                                        cache_ttl={'profiles': 60}, stale_while_revalidate=30)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+
+    @patch('fellow_aiden.cache.time.time')
+    def test_states(self, mock_time):
+        mock_time.return_value = 1000
+        cache = ResourceCache({'profiles': 60}, stale_while_revalidate=30)
+        cache.store('profiles', make_response(200, []))
+        self.assertEqual(cache.state('profiles'), FRESH)
+        self.assertEqual(cache.state('schedules'), FRESH)
+        mock_time.return_value = 1070
+        self.assertEqual(cache.state('profiles'), STALE)
+        mock_time.return_value = 1100
+        self.assertEqual(cache.state('profiles'), EXPIRED)
+
+    @patch('fellow_aiden.requests.Session.get')
+    def test_conditional_revalidation(self, mock_get):
+        mock_get.return_value = make_response(200, [dict(PROFILE, id='p0')], {'ETag': '"v1"'})
+        profiles = self.fellow_aiden.profiles
+        self.fellow_aiden._cache.entry('profiles').fetched_at -= 120
+
+        mock_get.return_value = make_response(304, None)
+        self.assertIs(self.fellow_aiden.profiles, profiles)
+        self.assertEqual(mock_get.call_args[1]['headers']['If-None-Match'], '"v1"')
+        self.assertEqual(self.fellow_aiden._cache.state('profiles'), FRESH)
+
+    @patch('fellow_aiden.requests.Session.get')
+    def test_identical_body_keeps_cached_list(self, mock_get):
+        mock_get.return_value = make_response(200, [dict(PROFILE, id='p0')])
+        profiles = self.fellow_aiden.profiles
+        self.fellow_aiden._cache.entry('profiles').fetched_at -= 120
+        self.assertIs(self.fellow_aiden.profiles, profiles)
+        self.assertEqual(mock_get.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
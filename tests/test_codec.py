@@ -0,0 +1,39 @@
+import unittest
+import json
+from fellow_aiden import codec
+
+
+class TestCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.default = codec.backend()
+
+    def tearDown(self):
+        codec.use(self.default)
+
+    def test_backends_agree(self):
+        data = [{'id': 'p0', 'title': 'Café', 'ratio': 16.5, 'temps': [96, 97], 'bloomEnabled': True, 'note': None}]
+        body = json.dumps(data).encode('utf-8')
+        for name in codec.available():
+            codec.use(name)
+            self.assertEqual(codec.loads(body), data, name)
+            self.assertEqual(codec.loads(memoryview(body)), data, name)
+            self.assertEqual(codec.loads(body.decode('utf-8')), data, name)
+            self.assertEqual(json.loads(codec.dumpb(data)), data, name)
+            self.assertEqual(json.loads(codec.dumps(data, indent=2)), data, name)
+            self.assertIsInstance(codec.dumps(data), str)
+
+    def test_invalid_json_raises_value_error(self):
+        for name in codec.available():
+            codec.use(name)
+            with self.assertRaises(ValueError):
+                codec.loads(b'{"id": ')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(Exception):
+            codec.use('yaml')
+        self.assertEqual(codec.backend(), self.default)
+
+
+if __name__ == '__main__':
+    unittest.main()
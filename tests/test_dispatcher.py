@@ -0,0 +1,169 @@
+import unittest
+import json
+import socket
+import threading
+import time
+from unittest.mock import patch, MagicMock
+import requests
+from fellow_aiden import FellowAiden, DeadlineExceeded
+
+
+def make_response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = {}
+    return response
+
+
+class HungServer:
+
+    """Accept TCP connections and never answer, counting them."""
+
+    def __init__(self):
+        self.connections = []
+        self._socket = socket.socket()
+        self._socket.bind(('127.0.0.1', 0))
+        self._socket.listen(32)
+        self.url = 'https://127.0.0.1:%d' % self._socket.getsockname()[1]
+        threading.Thread(target=self.__accept, daemon=True).start()
+
+    def __accept(self):
+        while True:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+            self.connections.append(connection)
+
+    def close(self):
+        self._socket.close()
+        for connection in self.connections:
+            connection.close()
+
+
+class TestDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+        self.fellow_aiden._schedules = [{'id': 's0', 'enabled': True}]
+
+    @patch('fellow_aiden.requests.Session.delete')
+    @patch('fellow_aiden.requests.Session.post')
+    def test_reauth_once_on_401(self, mock_post, mock_delete):
+        mock_post.return_value = make_response(200, {'accessToken': 'new_token'})
+        mock_delete.side_effect = [make_response(401, {}), make_response(200, {})]
+        self.fellow_aiden._refresh = 'test_refresh_token'
+
+        self.fellow_aiden.delete_schedule_by_id('s0')
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(mock_delete.call_args[1]['headers']['Authorization'], 'Bearer new_token')
+        self.assertEqual(self.fellow_aiden.get_schedules(), [])
+
+    @patch('fellow_aiden.time.sleep')
+    @patch('fellow_aiden.requests.Session.get')
+    def test_retries_transient_status_on_get(self, mock_get, mock_sleep):
+        mock_get.side_effect = [make_response(503, {}), make_response(200, [{'id': 'p0', 'title': 'A'}])]
+        self.assertEqual(self.fellow_aiden.get_profiles()[0]['id'], 'p0')
+        self.assertEqual(mock_get.call_count, 2)
+        mock_sleep.assert_called_once_with(FellowAiden.RETRY_BACKOFF)
+        self.assertEqual(mock_get.call_args[1]['timeout'], FellowAiden.TIMEOUT)
+
+    @patch('fellow_aiden.time.sleep')
+    @patch('fellow_aiden.requests.Session.post')
+    def test_no_status_retry_for_post(self, mock_post, mock_sleep):
+        mock_post.return_value = make_response(503, {'message': 'Service Unavailable'})
+        response = self.fellow_aiden._FellowAiden__request('POST', FellowAiden.API_PROFILE_SHARE, pid='p0')
+        self.assertEqual(response.status_code, 503)
+        mock_post.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch('fellow_aiden.requests.Session.patch')
+    def test_hooks_and_stats(self, mock_patch):
+        calls = []
+        self.fellow_aiden.add_request_hook(lambda *args: calls.append(args))
+        mock_patch.return_value = make_response(200, {})
+        self.fellow_aiden.toggle_schedule('s0', False)
+
+        self.assertEqual(calls[0][:3], ('PATCH', FellowAiden.API_SCHEDULE, 200))
+        row = self.fellow_aiden.request_stats()['PATCH ' + FellowAiden.API_SCHEDULE]
+        self.assertEqual((row['count'], row['errors']), (1, 0))
+        self.assertFalse(self.fellow_aiden.get_schedules()[0]['enabled'])
+
+
+class TestDeadlines(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False,
+                                        timeout=(2, 10), deadline=60)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+
+    @patch('fellow_aiden.requests.Session.get')
+    def test_timeouts_capped_by_deadline(self, mock_get):
+        mock_get.return_value = make_response(200, [])
+        self.fellow_aiden.get_profiles()
+        self.assertEqual(mock_get.call_args[1]['timeout'], (2, 10))
+        self.fellow_aiden._profiles = None
+        with self.fellow_aiden.request_options(timeout=30, deadline=3):
+            self.fellow_aiden.get_profiles()
+        connect, read = mock_get.call_args[1]['timeout']
+        self.assertLessEqual(read, 3)
+        self.assertLessEqual(connect, 3)
+
+    @patch('fellow_aiden.time.sleep')
+    @patch('fellow_aiden.requests.Session.get')
+    def test_no_retry_past_deadline(self, mock_get, mock_sleep):
+        mock_get.return_value = make_response(503, {})
+        with self.fellow_aiden.request_options(deadline=0.2):
+            with self.assertRaises(Exception):
+                self.fellow_aiden.get_profiles()
+        mock_get.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    @patch('fellow_aiden.time.monotonic')
+    @patch('fellow_aiden.requests.Session.get')
+    def test_timeout_past_deadline_raises(self, mock_get, mock_monotonic):
+        mock_monotonic.side_effect = [0, 0, 0, 61, 61]
+        mock_get.side_effect = requests.ReadTimeout()
+        with self.assertRaises(DeadlineExceeded):
+            self.fellow_aiden.get_profiles()
+
+
+class TestRealConnections(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HungServer()
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False,
+                                        circuit_breaker=False, timeout=(0.2, 0.2))
+        self.fellow_aiden.BASE_URL = self.server.url
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+
+    def tearDown(self):
+        self.server.close()
+
+    @patch('fellow_aiden.time.sleep')
+    def test_one_connection_per_attempt(self, mock_sleep):
+        with self.assertRaises(requests.Timeout):
+            self.fellow_aiden.get_profiles()
+        # The adapter does not retry underneath the dispatcher
+        self.assertEqual(len(self.server.connections), FellowAiden.RETRIES + 1)
+
+    def test_deadline_holds_against_hung_server(self):
+        started = time.monotonic()
+        with self.fellow_aiden.request_options(timeout=0.3, deadline=1):
+            with self.assertRaises((DeadlineExceeded, requests.Timeout)):
+                self.fellow_aiden.get_profiles()
+        self.assertLess(time.monotonic() - started, 1.5)
+        self.assertLessEqual(len(self.server.connections), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
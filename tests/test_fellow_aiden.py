@@ -8,7 +8,7 @@ class TestFellowAiden(unittest.TestCase):
     def setUp(self):
         self.email = "test@example.com"
         self.password = "password"
-        self.fellow_aiden = FellowAiden(self.email, self.password)
+        self.fellow_aiden = FellowAiden(self.email, self.password, circuit_breaker=False)
 
     @patch('fellow_aiden.requests.Session.post')
     def test_authentication_success(self, mock_post):
@@ -0,0 +1,95 @@
+import unittest
+import json
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden, FellowFleet
+
+
+DEVICES = [{'id': 'b1', 'displayName': 'Kitchen'}, {'id': 'b2', 'displayName': 'Office'}]
+
+
+def make_response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = {}
+    return response
+
+
+def route(url, **kwargs):
+    if url.endswith('/devices'):
+        return make_response(200, DEVICES)
+    if '/devices/b2/' in url:
+        return make_response(500, {'message': 'Internal error'})
+    return make_response(200, [{'id': 'p0', 'title': 'Morning'}])
+
+
+class TestMultipleDevices(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+
+    @patch('fellow_aiden.requests.Session.get')
+    def test_select_brewer(self, mock_get):
+        mock_get.side_effect = route
+        self.assertEqual(self.fellow_aiden.get_brewer_id(), 'b1')
+        self.assertEqual([d['id'] for d in self.fellow_aiden.get_devices()], ['b1', 'b2'])
+
+        other = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False, brewer_id='b2')
+        other._auth = True
+        other._token = 'test_access_token'
+        self.assertEqual(other.get_display_name(), 'Office')
+
+    @patch('fellow_aiden.requests.Session.post')
+    @patch('fellow_aiden.requests.Session.get')
+    def test_for_device_reuses_session_state(self, mock_get, mock_post):
+        mock_get.side_effect = route
+        office = self.fellow_aiden.for_device('b2')
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(office.get_brewer_id(), 'b2')
+        self.assertEqual(office._token, 'test_access_token')
+        self.assertIs(office._session.get_adapter(FellowAiden.BASE_URL),
+                      self.fellow_aiden._session.get_adapter(FellowAiden.BASE_URL))
+        mock_post.assert_not_called()
+        with self.assertRaises(Exception):
+            self.fellow_aiden.for_device('b3')
+
+
+class TestFleet(unittest.TestCase):
+
+    @patch('fellow_aiden.time.sleep')
+    @patch('fellow_aiden.requests.Session.get')
+    def test_results_per_device(self, mock_get, mock_sleep):
+        mock_get.side_effect = route
+        client = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        client._auth = True
+        client._token = 'test_access_token'
+
+        with FellowFleet(max_workers=2) as fleet:
+            self.assertEqual(fleet.add_client(client), ['b1', 'b2'])
+            results = fleet.get_profiles(['b1', 'b2', 'b3'])
+        self.assertEqual(results['b1'].value, [{'id': 'p0', 'title': 'Morning'}])
+        self.assertTrue(results['b1'].ok)
+        self.assertFalse(results['b2'].ok)
+        self.assertFalse(results['b3'].ok)
+
+    @patch('fellow_aiden.requests.Session.post')
+    @patch('fellow_aiden.requests.Session.get')
+    def test_invalid_profile_is_an_error(self, mock_get, mock_post):
+        mock_get.side_effect = route
+        client = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        client._auth = True
+        client._token = 'test_access_token'
+
+        with FellowFleet(max_workers=2) as fleet:
+            fleet.add_client(client)
+            results = fleet.create_profile({'title': 'Bad'})
+        self.assertFalse(results['b1'].ok)
+        self.assertFalse(results['b2'].ok)
+        mock_post.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
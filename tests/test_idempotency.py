@@ -0,0 +1,100 @@
+import unittest
+import json
+import requests
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden
+
+
+PROFILE = {
+    "profileType": 0,
+    "title": "Test Profile",
+    "ratio": 16,
+    "bloomEnabled": True,
+    "bloomRatio": 2,
+    "bloomDuration": 30,
+    "bloomTemperature": 96,
+    "ssPulsesEnabled": True,
+    "ssPulsesNumber": 3,
+    "ssPulsesInterval": 23,
+    "ssPulseTemperatures": [96, 97, 98],
+    "batchPulsesEnabled": True,
+    "batchPulsesNumber": 2,
+    "batchPulsesInterval": 30,
+    "batchPulseTemperatures": [96, 97]
+}
+
+
+def make_response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = {}
+    return response
+
+
+class TestIdempotentWrites(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+        self.fellow_aiden._profiles = [dict(PROFILE, id='p0')]
+
+    @patch('fellow_aiden.time.sleep')
+    @patch('fellow_aiden.requests.Session.get')
+    @patch('fellow_aiden.requests.Session.post')
+    def test_landed_write_not_resent(self, mock_post, mock_get, mock_sleep):
+        # The first POST created the profile but the connection dropped
+        mock_post.side_effect = requests.ConnectionError('connection reset')
+        mock_get.return_value = make_response(200, [dict(PROFILE, id='p0'), dict(PROFILE, id='p1')])
+
+        profile = self.fellow_aiden.create_profile(dict(PROFILE))
+        self.assertEqual(profile['id'], 'p1')
+        mock_post.assert_called_once()
+        self.assertEqual(len(self.fellow_aiden.get_profiles()), 2)
+
+    @patch('fellow_aiden.time.sleep')
+    @patch('fellow_aiden.requests.Session.get')
+    @patch('fellow_aiden.requests.Session.post')
+    def test_lost_write_resent_with_same_key(self, mock_post, mock_get, mock_sleep):
+        mock_post.side_effect = [
+            make_response(503, {'message': 'Service Unavailable'}),
+            make_response(200, dict(PROFILE, id='p1')),
+        ]
+        mock_get.return_value = make_response(200, [dict(PROFILE, id='p0')])
+
+        profile = self.fellow_aiden.create_profile(dict(PROFILE))
+        self.assertEqual(profile['id'], 'p1')
+        self.assertEqual(mock_post.call_count, 2)
+        keys = {call[1]['headers'][FellowAiden.IDEMPOTENCY_HEADER] for call in mock_post.call_args_list}
+        self.assertEqual(len(keys), 1)
+
+    @patch('fellow_aiden.time.sleep')
+    @patch('fellow_aiden.requests.Session.get')
+    @patch('fellow_aiden.requests.Session.post')
+    def test_uncached_profiles_never_matched(self, mock_post, mock_get, mock_sleep):
+        # An identical profile the user already had must not pass for the new one
+        self.fellow_aiden._profiles = None
+        mock_post.side_effect = [
+            make_response(503, {'message': 'Service Unavailable'}),
+            make_response(200, dict(PROFILE, id='p1')),
+        ]
+        mock_get.return_value = make_response(200, [dict(PROFILE, id='p0')])
+
+        profile = self.fellow_aiden.create_profile(dict(PROFILE))
+        self.assertEqual(profile['id'], 'p1')
+        self.assertEqual(mock_post.call_count, 2)
+        mock_get.assert_not_called()
+
+    @patch('fellow_aiden.time.sleep')
+    @patch('fellow_aiden.requests.Session.patch')
+    def test_patch_retried_after_dropped_connection(self, mock_patch, mock_sleep):
+        mock_patch.side_effect = [requests.ConnectionError('connection reset'), make_response(200, {})]
+        self.assertTrue(self.fellow_aiden.update_profile('p0', dict(PROFILE, ratio=17)))
+        self.assertEqual(mock_patch.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import json
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden
+
+
+def make_response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = {}
+    return response
+
+
+def fake_get(url, **kwargs):
+    if url.endswith('/devices'):
+        return make_response(200, [{'id': 'test_brewer_id', 'displayName': 'Test Brewer'}])
+    if url.endswith('/profiles'):
+        return make_response(200, [{'id': 'p0', 'title': 'Test Profile'}])
+    if url.endswith('/schedules'):
+        return make_response(200, [{'id': 's0'}])
+    return make_response(404, {})
+
+
+class TestLazyClient(unittest.TestCase):
+
+    @patch('fellow_aiden.requests.Session.get', side_effect=fake_get)
+    @patch('fellow_aiden.requests.Session.post')
+    def test_no_requests_until_first_use(self, mock_post, mock_get):
+        mock_post.return_value = make_response(200, {'accessToken': 'token', 'refreshToken': 'refresh'})
+        aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        mock_post.assert_not_called()
+        mock_get.assert_not_called()
+
+        self.assertEqual(aiden.get_display_name(), 'Test Brewer')
+        self.assertEqual(aiden.get_profiles()[0]['id'], 'p0')
+        mock_post.assert_called_once()
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('fellow_aiden.requests.Session.get', side_effect=fake_get)
+    @patch('fellow_aiden.requests.Session.post')
+    def test_warmup(self, mock_post, mock_get):
+        mock_post.return_value = make_response(200, {'accessToken': 'token', 'refreshToken': 'refresh'})
+        aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        self.assertIs(aiden.warmup().result(timeout=5), aiden)
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(aiden.get_schedules(), [{'id': 's0'}])
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch('fellow_aiden.requests.Session.post')
+    def test_warmup_surfaces_login_errors(self, mock_post):
+        mock_post.return_value = make_response(401, {'message': 'Unauthorized'})
+        aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        with self.assertRaises(Exception):
+            aiden.warmup().result(timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
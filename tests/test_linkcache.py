@@ -0,0 +1,77 @@
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden
+from fellow_aiden.linkcache import SharedProfileCache
+
+
+SHARED = {'id': 'shared-1', 'title': 'Shared Profile', 'ratio': 16, 'createdAt': 1}
+
+
+def make_response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = {}
+    return response
+
+
+class TestSharedProfileCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = SharedProfileCache(maxsize=2)
+        cache.put('a', {'title': 'A'})
+        cache.put('b', {'title': 'B'})
+        cache.get('a')
+        cache.put('c', {'title': 'C'})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), {'title': 'A'})
+        self.assertEqual(len(cache), 2)
+
+    def test_disk_layer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            SharedProfileCache(path=directory).put('abc123', {'title': 'A'})
+            self.assertTrue(os.path.exists(os.path.join(directory, 'abc123.json')))
+            self.assertEqual(SharedProfileCache(path=directory).get('abc123'), {'title': 'A'})
+
+
+class TestBrewLinks(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False,
+                                        link_cache=SharedProfileCache())
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+
+    @patch('fellow_aiden.requests.Session.get')
+    def test_link_fetched_once(self, mock_get):
+        mock_get.side_effect = lambda *args, **kwargs: make_response(200, SHARED)
+        first = self.fellow_aiden.parse_brewlink_url('https://brew.link/p/abc123')
+        self.assertNotIn('id', first)
+        first['title'] = 'Edited'
+        second = self.fellow_aiden.parse_brewlink_url('abc123')
+        self.assertEqual(second['title'], 'Shared Profile')
+        mock_get.assert_called_once()
+
+    @patch('fellow_aiden.requests.Session.get')
+    def test_batch_resolver(self, mock_get):
+        def get(url, **kwargs):
+            if url.endswith('/missing'):
+                return make_response(404, {'message': 'Not found'})
+            return make_response(200, dict(SHARED, title=url.rsplit('/', 1)[1]))
+        mock_get.side_effect = get
+
+        results = self.fellow_aiden.parse_brewlink_urls(
+            ['https://brew.link/p/one', 'two', 'missing', 'https://brew.link/p/two/'])
+        self.assertEqual(results[0]['title'], 'one')
+        self.assertEqual(results[1]['title'], 'two')
+        self.assertIsInstance(results[2], ValueError)
+        self.assertEqual(results[3]['title'], 'two')
+        self.assertEqual(mock_get.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import requests
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden
+from fellow_aiden.breaker import CircuitBreaker
+from fellow_aiden.exceptions import OutboxConflict
+from fellow_aiden.outbox import Outbox, CREATE_PROFILE, PATCH_PROFILE, DELETE_PROFILE, CREATE_SCHEDULE, SETTINGS
+
+
+PROFILE = {
+    "profileType": 0,
+    "title": "Test Profile",
+    "ratio": 16,
+    "bloomEnabled": True,
+    "bloomRatio": 2,
+    "bloomDuration": 30,
+    "bloomTemperature": 96,
+    "ssPulsesEnabled": True,
+    "ssPulsesNumber": 3,
+    "ssPulsesInterval": 23,
+    "ssPulseTemperatures": [96, 97, 98],
+    "batchPulsesEnabled": True,
+    "batchPulsesNumber": 2,
+    "batchPulsesInterval": 30,
+    "batchPulseTemperatures": [96, 97]
+}
+
+SCHEDULE = {
+    "days": [True, False, True, False, True, False, True],
+    "secondFromStartOfTheDay": 28800,
+    "enabled": True,
+    "amountOfWater": 950,
+    "profileId": "p0"
+}
+
+
+
+def make_response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = {}
+    return response
+
+
+class TestOutbox(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'outbox.db')
+        self.outbox = Outbox(self.path)
+
+    def tearDown(self):
+        self.outbox.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_edits_to_one_profile_are_merged(self):
+        for ratio in range(10, 20):
+            self.outbox.add('b1', PATCH_PROFILE, 'p0', {'ratio': ratio})
+        self.outbox.add('b1', PATCH_PROFILE, 'p0', {'title': 'Evening'})
+        self.outbox.add('b1', SETTINGS, None, {'clockMode': 24})
+        self.outbox.add('b1', SETTINGS, None, {'language': 'de'})
+        pending = self.outbox.pending('b1')
+        self.assertEqual([op.kind for op in pending], [PATCH_PROFILE, SETTINGS])
+        self.assertEqual(pending[0].payload, {'ratio': 19, 'title': 'Evening'})
+        self.assertEqual(pending[1].payload, {'clockMode': 24, 'language': 'de'})
+
+    def test_delete_supersedes_queued_writes(self):
+        self.outbox.add('b1', PATCH_PROFILE, 'p0', {'ratio': 17})
+        self.outbox.add('b1', DELETE_PROFILE, 'p0')
+        self.outbox.add('b1', CREATE_PROFILE, 'queued-1', PROFILE)
+        self.outbox.add('b1', PATCH_PROFILE, 'queued-1', {'ratio': 17})
+        self.outbox.add('b1', DELETE_PROFILE, 'queued-1')
+        self.assertEqual([(op.kind, op.target) for op in self.outbox.pending()], [(DELETE_PROFILE, 'p0')])
+
+    def test_delete_cancels_schedules_for_profile(self):
+        self.outbox.add('b1', CREATE_PROFILE, 'queued-1', PROFILE)
+        self.outbox.add('b1', CREATE_SCHEDULE, 'queued-2', dict(SCHEDULE, profileId='queued-1'))
+        self.outbox.add('b1', CREATE_SCHEDULE, 'queued-3', dict(SCHEDULE, profileId='p0'))
+        self.outbox.add('b1', DELETE_PROFILE, 'queued-1')
+        self.assertEqual([op.target for op in self.outbox.pending()], ['queued-3'])
+
+    def test_survives_reopen(self):
+        self.outbox.add('b1', CREATE_PROFILE, 'queued-1', PROFILE)
+        self.outbox.add('b2', PATCH_PROFILE, 'p0', {'ratio': 17})
+        self.outbox.close()
+        self.outbox = Outbox(self.path)
+        self.assertEqual(len(self.outbox), 2)
+        self.assertEqual(self.outbox.peek('b1').payload, PROFILE)
+        self.outbox.resolve('b1', 'queued-1', 'p9')
+        self.assertEqual(self.outbox.pending('b1')[0].target, 'p9')
+        self.assertEqual(self.outbox.real_id('b1', 'queued-1'), 'p9')
+
+
+class TestWriteBehind(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.outbox = Outbox(os.path.join(self.tmpdir, 'outbox.db'))
+        self.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=3600)
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False,
+                                        circuit_breaker=self.breaker, outbox=self.outbox)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+        self.fellow_aiden._profiles = [dict(PROFILE, id='p0')]
+        self.fellow_aiden._schedules = [{'id': 's0', 'enabled': True}]
+
+    def tearDown(self):
+        self.breaker.close()
+        self.outbox.close()
+        shutil.rmtree(self.tmpdir)
+
+    @patch('fellow_aiden.requests.Session.post')
+    @patch('fellow_aiden.requests.Session.patch')
+    def test_writes_queued_while_open_and_replayed_coalesced(self, mock_patch, mock_post):
+        # Trip the breaker so nothing can be sent
+        self.breaker.record_failure()
+        created = self.fellow_aiden.create_profile(dict(PROFILE, title='New'))
+        self.assertTrue(created['id'].startswith(FellowAiden.PROVISIONAL_PREFIX))
+        self.assertTrue(self.fellow_aiden.update_profile(created['id'], dict(PROFILE, title='Newer')))
+        for ratio in (15, 16, 17):
+            self.assertTrue(self.fellow_aiden.patch_profile('p0', {'ratio': ratio}))
+        self.assertIsNone(self.fellow_aiden.toggle_schedule('s0', False))
+        mock_post.assert_not_called()
+        mock_patch.assert_not_called()
+        self.assertEqual(len(self.outbox), 3)
+
+        self.breaker.close()
+        mock_post.return_value = make_response(200, dict(PROFILE, title='Newer', id='p1'))
+        mock_patch.return_value = make_response(200, {})
+        self.assertEqual(self.fellow_aiden.replay_outbox(), 3)
+        mock_post.assert_called_once()
+        self.assertEqual(json.loads(mock_post.call_args[1]['data'])['title'], 'Newer')
+        self.assertEqual(mock_patch.call_count, 2)
+        self.assertEqual(json.loads(mock_patch.call_args_list[0][1]['data']), {'ratio': 17})
+        self.assertEqual(len(self.outbox), 0)
+        self.assertEqual(self.fellow_aiden.get_profile_by_id('p0')['ratio'], 17)
+        # The provisional ID keeps working after its create was sent
+        self.fellow_aiden.patch_profile(created['id'], {'ratio': 15})
+        self.assertTrue(mock_patch.call_args[0][0].endswith('/p1'))
+
+    @patch('fellow_aiden.requests.Session.post')
+    def test_schedule_for_queued_profile(self, mock_post):
+        self.breaker.record_failure()
+        created = self.fellow_aiden.create_profile(dict(PROFILE, title='New'))
+        schedule = self.fellow_aiden.create_schedule(dict(SCHEDULE, profileId=created['id']))
+        self.assertTrue(schedule['id'].startswith(FellowAiden.PROVISIONAL_PREFIX))
+        self.assertEqual(len(self.outbox), 2)
+        mock_post.assert_not_called()
+
+        self.breaker.close()
+        mock_post.side_effect = [make_response(200, dict(PROFILE, title='New', id='p1')),
+                                 make_response(200, dict(SCHEDULE, profileId='p1', id='s1'))]
+        self.assertEqual(self.fellow_aiden.replay_outbox(), 2)
+        self.assertEqual(json.loads(mock_post.call_args[1]['data'])['profileId'], 'p1')
+        self.assertEqual(len(self.outbox), 0)
+
+    @patch('fellow_aiden.requests.Session.patch')
+    @patch('fellow_aiden.requests.Session.delete')
+    def test_replay_stops_on_rejected_delete(self, mock_delete, mock_patch):
+        self.outbox.add('test_brewer_id', DELETE_PROFILE, 'p0')
+        self.outbox.add('test_brewer_id', SETTINGS, None, {'clockMode': 24})
+        mock_delete.return_value = make_response(409, {'message': 'Profile is in use'})
+        with self.assertRaises(OutboxConflict) as raised:
+            self.fellow_aiden.replay_outbox()
+        self.assertEqual(raised.exception.operation.kind, DELETE_PROFILE)
+        mock_patch.assert_not_called()
+        self.assertEqual(len(self.outbox), 2)
+        self.assertEqual(self.fellow_aiden.get_profile_by_id('p0')['id'], 'p0')
+
+    @patch('fellow_aiden.requests.Session.post')
+    def test_replay_stops_on_unresolvable_profile(self, mock_post):
+        self.outbox.add('test_brewer_id', CREATE_SCHEDULE, 'queued-2', dict(SCHEDULE, profileId='queued-1'))
+        with self.assertRaises(OutboxConflict) as raised:
+            self.fellow_aiden.replay_outbox()
+        self.assertEqual(raised.exception.operation.target, 'queued-2')
+        mock_post.assert_not_called()
+        self.assertEqual(len(self.outbox), 1)
+
+    @patch('fellow_aiden.time.sleep')
+    @patch('fellow_aiden.requests.Session.patch')
+    def test_connection_error_queues_write(self, mock_patch, mock_sleep):
+        mock_patch.side_effect = requests.ConnectionError("offline")
+        self.assertTrue(self.fellow_aiden.patch_profile('p0', {'ratio': 17}))
+        self.assertEqual(self.outbox.peek('test_brewer_id').payload, {'ratio': 17})
+
+    @patch('fellow_aiden.requests.Session.patch')
+    def test_replay_stops_on_conflict(self, mock_patch):
+        self.outbox.add('test_brewer_id', PATCH_PROFILE, 'p0', {'ratio': 17})
+        self.outbox.add('test_brewer_id', SETTINGS, None, {'clockMode': 24})
+        mock_patch.return_value = make_response(404, {'message': 'Profile not found'})
+        with self.assertRaises(OutboxConflict) as raised:
+            self.fellow_aiden.replay_outbox()
+        self.assertEqual(raised.exception.operation.target, 'p0')
+        mock_patch.assert_called_once()
+        self.assertEqual(len(self.outbox), 2)
+
+        # Later writes wait behind the conflict instead of overtaking it
+        self.assertTrue(self.fellow_aiden.patch_profile('p0', {'ratio': 18}))
+        self.assertEqual(len(self.outbox), 2)
+        self.assertEqual(self.outbox.peek('test_brewer_id').payload, {'ratio': 18})
+
+
+if __name__ == '__main__':
+    unittest.main()
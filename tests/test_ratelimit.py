@@ -0,0 +1,82 @@
+import unittest
+import json
+from email.utils import formatdate
+import time
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden
+from fellow_aiden.ratelimit import RateLimiter, parse_retry_after
+
+
+def make_response(status_code, body, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = headers or {}
+    return response
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_burst_then_paced(self):
+        limiter = RateLimiter(rate=2, burst=3)
+        waits = [limiter.reserve() for _ in range(4)]
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 0.5, places=2)
+        self.assertIsNone(limiter.reserve(max_wait=0.1))
+
+    def test_retry_after_pauses_bucket(self):
+        limiter = RateLimiter(rate=10, burst=10)
+        limiter.feedback(429, retry_after=2)
+        self.assertGreater(limiter.reserve(), 1.9)
+
+    def test_rate_adapts(self):
+        limiter = RateLimiter(rate=4, burst=4, min_rate=1)
+        limiter.feedback(503)
+        limiter.feedback(503)
+        self.assertEqual(limiter.rate, 2)
+        limiter.feedback(200)
+        self.assertAlmostEqual(limiter.rate, 2 + RateLimiter.INCREASE)
+        for _ in range(100):
+            limiter.feedback(200)
+        self.assertEqual(limiter.rate, 4)
+
+    def test_shared_per_account(self):
+        self.assertIs(RateLimiter.shared('a@example.com'), RateLimiter.shared('a@example.com'))
+        self.assertIsNot(RateLimiter.shared('a@example.com'), RateLimiter.shared('b@example.com'))
+        aiden = FellowAiden('a@example.com', 'password', lazy=True, circuit_breaker=False)
+        self.assertIs(aiden._limiter, RateLimiter.shared('a@example.com'))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('3'), 3.0)
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 30, usegmt=True)), 30, delta=2)
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertIsNone(parse_retry_after(None))
+
+
+class TestThrottledRequests(unittest.TestCase):
+
+    def setUp(self):
+        self.limiter = RateLimiter(rate=100, burst=100)
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True,
+                                        rate_limiter=self.limiter, circuit_breaker=False)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+
+    @patch('fellow_aiden.time.sleep')
+    @patch('fellow_aiden.requests.Session.post')
+    def test_post_retried_after_429(self, mock_post, mock_sleep):
+        mock_post.side_effect = [
+            make_response(429, {}, {'Retry-After': '2'}),
+            make_response(200, {'id': 's1', 'enabled': True}),
+        ]
+        with patch.object(self.limiter, 'reserve', return_value=0.0):
+            self.fellow_aiden._FellowAiden__request('POST', FellowAiden.API_SCHEDULES, json={})
+        self.assertEqual(mock_post.call_count, 2)
+        mock_sleep.assert_called_once_with(2.0)
+        self.assertEqual(self.limiter.rate, 50 + RateLimiter.INCREASE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+import json
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden, reconcile
+
+
+PROFILE = {
+    "profileType": 0,
+    "title": "Test Profile",
+    "ratio": 16,
+    "bloomEnabled": True,
+    "bloomRatio": 2,
+    "bloomDuration": 30,
+    "bloomTemperature": 96,
+    "ssPulsesEnabled": True,
+    "ssPulsesNumber": 3,
+    "ssPulsesInterval": 23,
+    "ssPulseTemperatures": [96, 97, 98],
+    "batchPulsesEnabled": True,
+    "batchPulsesNumber": 2,
+    "batchPulsesInterval": 30,
+    "batchPulseTemperatures": [96, 97]
+}
+
+SCHEDULE = {
+    "days": [True, True, True, True, True, False, False],
+    "secondFromStartOfTheDay": 25200,
+    "enabled": True,
+    "amountOfWater": 500,
+    "profileId": "p0",
+}
+
+
+def make_response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = {}
+    return response
+
+
+class TestReconcile(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+        self.fellow_aiden._profiles = [
+            dict(PROFILE, id='p0', title='Morning'),
+            dict(PROFILE, id='p1', title='Evening', ratio=17),
+            dict(PROFILE, id='p2', title='Old'),
+        ]
+        self.fellow_aiden._schedules = [dict(SCHEDULE, id='s0', enabled=False)]
+        self.desired_profiles = [
+            dict(PROFILE, title='Morning'),
+            dict(PROFILE, title='Evening', ratio=18),
+            dict(PROFILE, title='New'),
+        ]
+        self.desired_schedules = [
+            dict(SCHEDULE, profileTitle='morning'),
+            dict(SCHEDULE, secondFromStartOfTheDay=61200, profileTitle='New'),
+        ]
+
+    def test_plan(self):
+        changes = reconcile.plan(self.fellow_aiden, self.desired_profiles,
+                                 self.desired_schedules, prune=True)
+        self.assertEqual([(c.resource, c.action, c.target_id) for c in changes], [
+            ('profile', 'patch', 'p1'),
+            ('profile', 'create', None),
+            ('profile', 'delete', 'p2'),
+            ('schedule', 'toggle', 's0'),
+            ('schedule', 'create', None),
+        ])
+        self.assertEqual(changes.changes[0].fields, {'ratio': 18})
+        self.assertEqual(changes.counts(), {'patch': 1, 'create': 2, 'delete': 1, 'toggle': 1})
+        self.assertEqual(str(reconcile.plan(self.fellow_aiden, self.fellow_aiden.get_profiles())),
+                         "No changes.")
+
+    @patch('fellow_aiden.requests.Session.delete')
+    @patch('fellow_aiden.requests.Session.patch')
+    @patch('fellow_aiden.requests.Session.post')
+    def test_apply(self, mock_post, mock_patch, mock_delete):
+        mock_post.side_effect = lambda url, data=None, **kwargs: make_response(
+            200, dict(json.loads(data), id='p3' if url.endswith('/profiles') else 's1'))
+        mock_patch.return_value = make_response(200, {})
+        mock_delete.return_value = make_response(200, {})
+
+        changes = reconcile.plan(self.fellow_aiden, self.desired_profiles,
+                                 self.desired_schedules, prune=True)
+        results = reconcile.apply(self.fellow_aiden, changes)
+        self.assertTrue(all(result.ok for result in results), results)
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(mock_delete.call_count, 1)
+        patches = [json.loads(c[1]['data']) for c in mock_patch.call_args_list]
+        self.assertIn({'ratio': 18}, patches)
+        self.assertEqual(json.loads(mock_post.call_args_list[-1][1]['data'])['profileId'], 'p3')
+        self.assertFalse(reconcile.plan(self.fellow_aiden, self.desired_profiles,
+                                        self.desired_schedules, prune=True))
+
+    @patch('fellow_aiden.time.sleep')
+    @patch('fellow_aiden.requests.Session.patch')
+    @patch('fellow_aiden.requests.Session.delete')
+    def test_rejected_changes_not_ok(self, mock_delete, mock_patch, mock_sleep):
+        mock_delete.side_effect = lambda url, **kwargs: make_response(
+            404 if url.endswith('/p1') else 500, {'message': 'Rejected'})
+        mock_patch.return_value = make_response(400, {'message': 'Rejected'})
+        changes = reconcile.plan(self.fellow_aiden, [dict(PROFILE, title='Morning')],
+                                 [dict(SCHEDULE, enabled=True)], prune=True)
+        results = reconcile.apply(self.fellow_aiden, changes)
+        self.assertEqual([str(r.change)[0] for r in results], ['-', '-', '~'])
+        self.assertFalse(any(result.ok for result in results), results)
+
+    @patch('fellow_aiden.requests.Session.post')
+    def test_invalid_change_not_ok(self, mock_post):
+        change = reconcile.Change(reconcile.PROFILE, reconcile.CREATE, 'Bad', fields={'title': 'Bad'})
+        results = reconcile.apply(self.fellow_aiden, reconcile.Plan([change]))
+        self.assertFalse(results[0].ok)
+        mock_post.assert_not_called()
+
+    def test_rejects_over_capacity(self):
+        desired = [dict(PROFILE, title='P%d' % i) for i in range(15)]
+        with self.assertRaises(Exception):
+            reconcile.plan(self.fellow_aiden, desired)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import sys
+import threading
+from fellow_aiden import FellowAiden
+from fellow_aiden.search import TitleIndex, trigrams
+
+
+class TestTitleIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.profiles = [
+            {'id': 'p0', 'title': 'Ethiopia Light'},
+            {'id': 'p1', 'title': 'Ethiopia Light Roast'},
+            {'id': 'p2', 'title': 'Colombia Medium'},
+        ]
+        self.index = TitleIndex(self.profiles)
+
+    def test_trigrams(self):
+        self.assertIn('  a', trigrams('ab'))
+        self.assertIn('ab ', trigrams('ab'))
+
+    def test_best_match_not_first(self):
+        self.assertEqual(self.index.best('ethiopia light roas')['id'], 'p1')
+        self.assertEqual(self.index.best('colombia med')['id'], 'p2')
+
+    def test_ranked_results(self):
+        matches = self.index.search('Ethiopia Light', limit=5)
+        self.assertEqual([item['id'] for item, score in matches], ['p0', 'p1'])
+        self.assertEqual(matches[0][1], 1.0)
+        self.assertGreater(matches[0][1], matches[1][1])
+
+    def test_no_match(self):
+        self.assertIsNone(self.index.best('Kenya'))
+
+    def test_remove_and_replace(self):
+        self.index.remove('p1')
+        self.assertNotIn('p1', self.index)
+        self.assertEqual(len(self.index), 2)
+        self.index.add('p0', 'Kenya Bright', {'id': 'p0', 'title': 'Kenya Bright'})
+        self.assertEqual(self.index.best('kenya brite')['id'], 'p0')
+        self.assertIsNone(self.index.best('Ethiopia Light'))
+
+
+class TestConcurrentSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False,
+                                        circuit_breaker=False)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+        self.fellow_aiden._profiles = [{'id': 'p%d' % i, 'title': 'Ethiopia Light %d' % i} for i in range(500)]
+        # Switch threads often so a reader lands in the middle of a write
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def test_search_while_profiles_change(self):
+        done = threading.Event()
+        errors = []
+
+        def write():
+            try:
+                for n in range(100):
+                    self.fellow_aiden._FellowAiden__patch_cached_profile('p%d' % n, {'title': 'Kenya %d' % n})
+                    self.fellow_aiden._FellowAiden__cache_profile({'id': 'n%d' % n, 'title': 'Ethiopia %d' % n})
+            except Exception as err:
+                errors.append(err)
+            finally:
+                done.set()
+        writer = threading.Thread(target=write)
+        writer.start()
+        while not done.is_set():
+            try:
+                self.fellow_aiden.search_profiles('ethiopia light', limit=10)
+                self.fellow_aiden.get_profile_by_title('kenya', fuzzy=True)
+            except Exception as err:
+                errors.append(err)
+                break
+        writer.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.fellow_aiden.search_profiles('Kenya 99')[0]['id'], 'p99')
+
+
+if __name__ == '__main__':
+    unittest.main()
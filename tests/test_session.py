@@ -0,0 +1,31 @@
+import unittest
+from fellow_aiden import FellowAiden
+
+
+class TestSessionIsolation(unittest.TestCase):
+
+    def make_client(self, **kwargs):
+        return FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False, **kwargs)
+
+    def test_sessions_are_per_instance(self):
+        first = self.make_client()
+        second = self.make_client()
+        first._FellowAiden__set_tokens({'accessToken': 'first_token'})
+        second._FellowAiden__set_tokens({'accessToken': 'second_token'})
+        self.assertIsNot(first._session, second._session)
+        self.assertEqual(first._session.headers['Authorization'], 'Bearer first_token')
+        self.assertEqual(second._session.headers['Authorization'], 'Bearer second_token')
+
+    def test_shared_adapter(self):
+        adapter = FellowAiden.build_adapter(pool_maxsize=32, max_retries=1)
+        first = self.make_client(adapter=adapter)
+        second = self.make_client(adapter=adapter, keep_alive=False)
+        self.assertIs(first._session.get_adapter(FellowAiden.BASE_URL), adapter)
+        self.assertIs(second._session.get_adapter(FellowAiden.BASE_URL), adapter)
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertEqual(adapter.max_retries.total, 1)
+        self.assertEqual(second._session.headers['Connection'], 'close')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import json
+import os
+import stat
+import tempfile
+import time
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden, SessionStore
+
+
+def make_response(status_code, body, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = headers or {}
+    return response
+
+
+class TestSessionStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'session.json')
+        self.store = SessionStore(self.path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_is_private(self):
+        self.store.save('test@example.com', {'token': 'test_access_token'})
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+        self.assertEqual(self.store.load('test@example.com')['token'], 'test_access_token')
+        self.assertIsNone(self.store.load('other@example.com'))
+        self.store.clear('test@example.com')
+        self.assertIsNone(self.store.load('test@example.com'))
+
+    def test_ignores_world_readable_file(self):
+        self.store.save('test@example.com', {'token': 'test_access_token'})
+        os.chmod(self.path, 0o644)
+        self.assertIsNone(self.store.load('test@example.com'))
+
+    def test_max_age(self):
+        self.store.save('test@example.com', {'token': 'test_access_token'})
+        store = SessionStore(self.path, max_age=60)
+        with patch('fellow_aiden.session_store.time.time', return_value=time.time() + 120):
+            self.assertIsNone(store.load('test@example.com'))
+
+    @patch('fellow_aiden.requests.Session.get')
+    @patch('fellow_aiden.requests.Session.post')
+    def test_warm_restart(self, mock_post, mock_get):
+        self.store.save('test@example.com', {
+            'token': 'test_access_token',
+            'refresh': 'test_refresh_token',
+            'device_config': {'id': 'test_brewer_id', 'displayName': 'Test Brewer'},
+            'profiles': [{'id': 'p0', 'title': 'Test Profile'}],
+            'schedules': None,
+            'cache': {'profiles': {'etag': '"v1"', 'last_modified': None,
+                                   'digest': None, 'fetched_at': time.time() - 600}},
+        })
+        mock_get.return_value = make_response(304, None)
+
+        aiden = FellowAiden("test@example.com", "password", session_store=self.store, rate_limiter=False, circuit_breaker=False)
+        mock_post.assert_not_called()
+        self.assertEqual(aiden.get_display_name(), 'Test Brewer')
+        self.assertEqual(aiden.get_profile_by_title('test profile')['id'], 'p0')
+        self.assertEqual(aiden._session.headers['Authorization'], 'Bearer test_access_token')
+        # Let the background revalidation finish while the API is still mocked
+        deadline = time.time() + 5
+        while aiden._revalidating and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(aiden._revalidating, set())
+        profile_calls = [c for c in mock_get.call_args_list if c[0][0].endswith('/profiles')]
+        self.assertEqual(profile_calls[0][1]['headers']['If-None-Match'], '"v1"')
+
+
+if __name__ == '__main__':
+    unittest.main()
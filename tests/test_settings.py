@@ -0,0 +1,71 @@
+import unittest
+import json
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden
+
+
+DEVICE = {'id': 'test_brewer_id', 'displayName': 'Test Brewer', 'clockMode': 12,
+          'timezone': 'UTC', 'language': 'en'}
+
+
+def make_response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = {}
+    return response
+
+
+class TestAdjustSettings(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+        self.fellow_aiden._device_config = dict(DEVICE)
+
+    @patch('fellow_aiden.requests.Session.patch')
+    def test_one_patch_with_changed_settings(self, mock_patch):
+        mock_patch.return_value = make_response(200, {})
+        config = self.fellow_aiden.adjust_settings({'clockMode': 24, 'timezone': 'UTC', 'language': 'de'})
+        mock_patch.assert_called_once()
+        self.assertEqual(json.loads(mock_patch.call_args[1]['data']), {'clockMode': 24, 'language': 'de'})
+        self.assertEqual(config['clockMode'], 24)
+        self.assertEqual(self.fellow_aiden.get_device_config()['language'], 'de')
+
+        self.fellow_aiden.adjust_settings({'clockMode': 24})
+        mock_patch.assert_called_once()
+
+    @patch('fellow_aiden.requests.Session.patch')
+    def test_single_setting_updates_cached_config(self, mock_patch):
+        mock_patch.return_value = make_response(200, {})
+        self.fellow_aiden.adjust_setting('language', 'de')
+        self.assertEqual(self.fellow_aiden.get_device_config()['language'], 'de')
+        self.fellow_aiden.adjust_settings({'language': 'en'})
+        self.assertEqual(mock_patch.call_count, 2)
+        self.assertEqual(json.loads(mock_patch.call_args[1]['data']), {'language': 'en'})
+
+    @patch('fellow_aiden.requests.Session.patch')
+    def test_unknown_setting_rejected(self, mock_patch):
+        with self.assertRaises(Exception):
+            self.fellow_aiden.adjust_settings({'clockMode': 24, 'volume': 11})
+        mock_patch.assert_not_called()
+
+    @patch('fellow_aiden.requests.Session.patch')
+    def test_queued_settings_are_merged(self, mock_patch):
+        mock_patch.return_value = make_response(200, dict(DEVICE, clockMode=24, timezone='Europe/Berlin'))
+        first = self.fellow_aiden.queue_settings({'clockMode': 24, 'timezone': 'America/Denver'})
+        second = self.fellow_aiden.queue_settings({'timezone': 'Europe/Berlin'})
+        self.assertIs(first, second)
+        config = first.result(timeout=2)
+        mock_patch.assert_called_once()
+        self.assertEqual(json.loads(mock_patch.call_args[1]['data']),
+                         {'clockMode': 24, 'timezone': 'Europe/Berlin'})
+        self.assertEqual(config['timezone'], 'Europe/Berlin')
+        self.assertIsNone(self.fellow_aiden.flush_settings())
+
+
+if __name__ == '__main__':
+    unittest.main()
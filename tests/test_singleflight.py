@@ -0,0 +1,79 @@
+import unittest
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden
+from fellow_aiden.singleflight import SingleFlight
+
+
+def make_response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = {}
+    return response
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_calls_share_one_run(self):
+        flights = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def load():
+            calls.append(1)
+            release.wait(1)
+            return 'value'
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = [pool.submit(flights.do, 'key', load) for _ in range(4)]
+            while not flights.in_flight('key'):
+                time.sleep(0.001)
+            time.sleep(0.05)
+            release.set()
+            self.assertEqual([r.result() for r in results], ['value'] * 4)
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(flights.in_flight('key'))
+
+    def test_errors_reach_every_caller(self):
+        flights = SingleFlight()
+        with self.assertRaises(ValueError):
+            flights.do('key', lambda: int('x'))
+        self.assertEqual(flights.do('key', lambda: 2), 2)
+
+
+class TestConcurrentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+
+    @patch('fellow_aiden.requests.Session.get')
+    def test_concurrent_misses_issue_one_request(self, mock_get):
+        def slow_get(*args, **kwargs):
+            time.sleep(0.1)
+            return make_response(200, [{'id': 'p0', 'title': 'Morning'}])
+        mock_get.side_effect = slow_get
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: self.fellow_aiden.get_profiles(), range(8)))
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertTrue(all(r is results[0] for r in results))
+
+    def test_patch_does_not_touch_list_held_by_readers(self):
+        self.fellow_aiden._profiles = [{'id': 'p0', 'title': 'Morning'}]
+        held = self.fellow_aiden.get_profiles()
+        self.fellow_aiden._FellowAiden__patch_cached_profile('p0', {'title': 'Evening'})
+        self.assertEqual(held[0]['title'], 'Morning')
+        self.assertEqual(self.fellow_aiden.get_profile_by_title('Evening')['id'], 'p0')
+        self.assertIsNone(self.fellow_aiden.get_profile_by_title('Morning'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import json
+import threading
+from dataclasses import FrozenInstanceError
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden, BrewerState
+
+
+DEVICE = {'id': 'test_brewer_id', 'displayName': 'Test Brewer'}
+PROFILES = [{'id': 'p0', 'title': 'Morning'}]
+SCHEDULES = [{'id': 's0', 'enabled': True}]
+
+
+def make_response(status_code, body, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.content = json.dumps(body).encode('utf-8')
+    response.headers = headers or {}
+    return response
+
+
+def route(url):
+    if url.endswith('/profiles'):
+        return make_response(200, PROFILES)
+    if url.endswith('/schedules'):
+        return make_response(200, SCHEDULES)
+    return make_response(200, [DEVICE])
+
+
+class TestGetState(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+
+    @patch('fellow_aiden.requests.Session.get')
+    def test_refresh_all_fetches_in_parallel(self, mock_get):
+        self.fellow_aiden._brewer_id = 'test_brewer_id'
+        # Only returns if all three requests are in flight at once
+        barrier = threading.Barrier(3, timeout=2)
+
+        def get(url, **kwargs):
+            barrier.wait()
+            return route(url)
+        mock_get.side_effect = get
+
+        state = self.fellow_aiden.refresh_all()
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(state.brewer_id, 'test_brewer_id')
+        self.assertEqual(state.display_name, 'Test Brewer')
+        self.assertEqual(state.profiles, tuple(PROFILES))
+        self.assertEqual(state.schedules, tuple(SCHEDULES))
+
+    @patch('fellow_aiden.requests.Session.get')
+    def test_get_state_fills_and_uses_cache(self, mock_get):
+        mock_get.side_effect = lambda url, **kwargs: route(url)
+        state = self.fellow_aiden.get_state()
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(self.fellow_aiden.get_profiles(), PROFILES)
+
+        cached = self.fellow_aiden.get_state()
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertIsInstance(cached, BrewerState)
+        self.assertEqual((cached.device_config, cached.profiles, cached.schedules),
+                         (state.device_config, state.profiles, state.schedules))
+        with self.assertRaises(FrozenInstanceError):
+            state.profiles = ()
+
+
+if __name__ == '__main__':
+    unittest.main()
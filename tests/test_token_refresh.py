@@ -0,0 +1,70 @@
+import unittest
+import base64
+import json
+import time
+from unittest.mock import patch, MagicMock
+from fellow_aiden import FellowAiden, token_expiry
+
+
+def make_token(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({'exp': exp}).encode()).rstrip(b'=')
+    return 'header.%s.signature' % payload.decode()
+
+
+def make_response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = json.dumps(body).encode('utf-8')
+    return response
+
+
+class TestTokenRefresh(unittest.TestCase):
+
+    def setUp(self):
+        self.fellow_aiden = FellowAiden("test@example.com", "password", lazy=True, rate_limiter=False, circuit_breaker=False)
+        self.fellow_aiden._auth = True
+        self.fellow_aiden._token = 'test_access_token'
+        self.fellow_aiden._refresh = 'test_refresh_token'
+
+    def test_token_expiry(self):
+        self.assertEqual(token_expiry(make_token(1700000000)), 1700000000)
+        self.assertIsNone(token_expiry('not-a-jwt'))
+        self.assertIsNone(token_expiry(None))
+
+    @patch('fellow_aiden.requests.Session.post')
+    def test_reauth_uses_refresh_token(self, mock_post):
+        new_token = make_token(time.time() + 3600)
+        mock_post.return_value = make_response(200, {'accessToken': new_token})
+
+        self.fellow_aiden._FellowAiden__reauth()
+        url = mock_post.call_args[0][0]
+        self.assertTrue(url.endswith(FellowAiden.API_REFRESH))
+        self.assertEqual(self.fellow_aiden._token, new_token)
+        self.assertEqual(self.fellow_aiden._refresh, 'test_refresh_token')
+
+    @patch('fellow_aiden.requests.Session.post')
+    def test_reauth_falls_back_to_login(self, mock_post):
+        new_token = make_token(time.time() + 3600)
+        mock_post.side_effect = [
+            make_response(401, {'message': 'Refresh token expired'}),
+            make_response(200, {'accessToken': new_token, 'refreshToken': 'new_refresh'}),
+        ]
+
+        self.fellow_aiden._FellowAiden__reauth()
+        self.assertTrue(mock_post.call_args[0][0].endswith(FellowAiden.API_AUTH))
+        self.assertEqual(self.fellow_aiden._refresh, 'new_refresh')
+
+    @patch('fellow_aiden.requests.Session.post')
+    def test_renews_before_expiry(self, mock_post):
+        self.fellow_aiden._token = make_token(time.time() + 10)
+        self.fellow_aiden._token_expiry = token_expiry(self.fellow_aiden._token)
+        mock_post.return_value = make_response(200, {'accessToken': make_token(time.time() + 3600)})
+
+        self.fellow_aiden._FellowAiden__ensure_token()
+        mock_post.assert_called_once()
+        self.fellow_aiden._FellowAiden__ensure_token()
+        mock_post.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+from pydantic import ValidationError
+from fellow_aiden.profile import (CoffeeProfile, validate_profiles, BLOOM_DURATION_ENUM,
+                                  PULSE_TEMPERATURE_ENUM, RATIO_ENUM)
+from fellow_aiden.schedule import validate_schedules
+
+
+PROFILE = {
+    "profileType": 0,
+    "title": "Test Profile",
+    "ratio": 16,
+    "bloomEnabled": True,
+    "bloomRatio": 2,
+    "bloomDuration": 30,
+    "bloomTemperature": 96,
+    "ssPulsesEnabled": True,
+    "ssPulsesNumber": 3,
+    "ssPulsesInterval": 23,
+    "ssPulseTemperatures": [96, 97, 98],
+    "batchPulsesEnabled": True,
+    "batchPulsesNumber": 2,
+    "batchPulsesInterval": 30,
+    "batchPulseTemperatures": [96, 97]
+}
+
+SCHEDULE = {
+    "days": [True, False, False, False, False, False, True],
+    "secondFromStartOfTheDay": 25200,
+    "enabled": True,
+    "amountOfWater": 500,
+    "profileId": "p0"
+}
+
+
+class TestProfileRanges(unittest.TestCase):
+
+    def test_every_listed_value_accepted(self):
+        for ratio in RATIO_ENUM:
+            CoffeeProfile.model_validate(dict(PROFILE, ratio=ratio))
+        for duration in BLOOM_DURATION_ENUM:
+            CoffeeProfile.model_validate(dict(PROFILE, bloomDuration=duration))
+        CoffeeProfile.model_validate(dict(PROFILE, ssPulseTemperatures=PULSE_TEMPERATURE_ENUM,
+                                          bloomTemperature=PULSE_TEMPERATURE_ENUM[-1]))
+
+    def test_off_step_and_out_of_range_rejected(self):
+        for field, value in (('ratio', 16.25), ('ratio', 20.5), ('bloomRatio', 3.5), ('bloomDuration', 0),
+                             ('bloomTemperature', 49.5), ('ssPulsesNumber', 11), ('batchPulsesInterval', 4),
+                             ('batchPulseTemperatures', [96, 99.5])):
+            with self.assertRaises(ValidationError, msg=field):
+                CoffeeProfile.model_validate(dict(PROFILE, **{field: value}))
+
+    def test_error_message_is_short(self):
+        with self.assertRaises(ValidationError) as raised:
+            CoffeeProfile.model_validate(dict(PROFILE, bloomTemperature=120))
+        message = raised.exception.errors()[0]['msg']
+        self.assertIn("from 50 to 99 in steps of 0.5. Got 120", message)
+        self.assertLess(len(message), 120)
+
+
+class TestBatchValidation(unittest.TestCase):
+
+    def test_profiles_by_position(self):
+        profiles = [PROFILE, dict(PROFILE, ratio=13), dict(PROFILE, title='Bad~Title', bloomDuration=500)]
+        errors = validate_profiles(profiles)
+        self.assertEqual(sorted(errors), [1, 2])
+        self.assertIn('ratio', errors[1])
+        self.assertIn('title', errors[2])
+        self.assertIn('bloomDuration', errors[2])
+        self.assertEqual(validate_profiles([PROFILE] * 100), {})
+
+    def test_schedules_by_position(self):
+        errors = validate_schedules([SCHEDULE, dict(SCHEDULE, amountOfWater=50)])
+        self.assertEqual(list(errors), [1])
+        self.assertIn('amountOfWater', errors[1])
+
+
+if __name__ == '__main__':
+    unittest.main()